@@ -1,50 +1,485 @@
+import atexit
 import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, cast
+from urllib.parse import quote
 
 import requests
 
+from metrics import cache_lookup, registry
+from rate_limiter import (
+    RateLimiter,
+    parse_retry_after,
+    request_category,
+)
+
+# Listagens com total contado pelo cliente: nome -> método que busca a lista
+COUNTED = {"ingredients": "get_ingredients", "recipes": "get_recipes"}
+# Por quanto tempo os totais são reaproveitados sem consultar o endpoint /stats
+STATS_REFRESH = 10.0
+# Validade dos totais obtidos das listagens (ajustados pelas escritas deste cliente)
+COUNTS_MAX_AGE = 300.0
+
+# Cache das listagens da instância global (stale-while-revalidate): até SOFT_TTL
+# o valor é servido direto; até HARD_TTL é servido e atualizado em segundo plano;
+# depois disso a leitura espera uma nova busca
+SOFT_TTL = 30.0
+HARD_TTL = 300.0
+
+# Listagem resumida das receitas: a API recebe `fields` e, se o ignorar, a
+# resposta é reduzida a esses campos aqui mesmo
+SUMMARY_FIELDS = ("id", "name")
+RECIPE_SUMMARIES = f"/recipes/?fields={','.join(SUMMARY_FIELDS)}"
+# Receitas completas buscadas sob demanda (get_recipe_details): entradas no LRU
+DETAIL_CACHE_SIZE = 256
+
+# Sessões HTTP reaproveitadas entre as threads (veja SessionPool): requisições
+# simultâneas aceitas e tempo máximo de espera por uma sessão livre
+POOL_SIZE = 10
+POOL_TIMEOUT = 30.0
+
+# Novas tentativas após respostas 429 (Too Many Requests), respeitando Retry-After
+THROTTLE_RETRIES = 2
+
+# Trechos fixos das rotas; os demais (ids, nomes) viram "*" nos rótulos das métricas
+ROUTE_SEGMENTS = {"bulk", "id", "invoke", "stream-sse"}
+
+api_requests = registry.counter(
+    "menu_mvp_api_requests_total",
+    "Requisições do MenuMVPAPIClient por método, rota e status (error: sem resposta)",
+    ["method", "route", "status"],
+)
+api_latency = registry.histogram(
+    "menu_mvp_api_request_duration_seconds",
+    "Duração das requisições do MenuMVPAPIClient, sem a espera na fila do limite",
+    ["method", "route"],
+)
+
+
+def route_label(endpoint: str) -> str:
+    """Rota de um endpoint para as métricas, sem ids e nomes (`/recipes/id/*`)"""
+    parts = [part for part in endpoint.split("?")[0].split("/") if part]
+    if not parts:
+        return "/"
+    return "/" + "/".join(
+        parts[:1] + [part if part in ROUTE_SEGMENTS else "*" for part in parts[1:]]
+    )
+
+
+class SessionPool:
+    """Sessões HTTP compartilhadas pelas threads, uma por requisição em andamento
+
+    `requests.Session` não é garantidamente thread-safe, e uma sessão única
+    usada por várias threads descarta conexões quando o pool do urllib3 enche.
+    Aqui cada requisição pega uma sessão livre, com a conexão keep-alive já
+    aberta, e a devolve ao terminar; a última devolvida é a próxima usada. No
+    máximo `size` sessões são criadas: além disso, a requisição espera uma
+    sessão livre por até `timeout` segundos.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[requests.Session] = []
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Métricas de utilização
+        self._requests = 0
+        self._peak_in_use = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    def _acquire(self) -> requests.Session:
+        started = time.monotonic()
+        with self._condition:
+            waited = False
+            while not self._idle and self._created >= self.size:
+                if self._closed:
+                    break
+                waited = True
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise requests.exceptions.ConnectionError(
+                        f"Nenhuma sessão HTTP livre em {self.timeout:.0f}s"
+                    )
+            if self._closed:
+                raise requests.exceptions.ConnectionError("Pool de sessões encerrado")
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                session = requests.Session()
+                self._created += 1
+            self._in_use += 1
+            self._requests += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            if waited:
+                self._waits += 1
+                self._wait_time += time.monotonic() - started
+            return session
+
+    def _release(self, session: requests.Session) -> None:
+        with self._condition:
+            self._in_use -= 1
+            if self._closed:
+                session.close()
+                self._created -= 1
+            else:
+                self._idle.append(session)
+            self._condition.notify()
+
+    @contextmanager
+    def session(self) -> Iterator[requests.Session]:
+        """Sessão exclusiva durante o bloco"""
+        session = self._acquire()
+        try:
+            yield session
+        finally:
+            self._release(session)
+
+    def close(self) -> None:
+        """Fecha as sessões livres; as em uso são fechadas ao serem devolvidas"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._condition.notify_all()
+        for session in idle:
+            session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Utilização do pool desde a criação"""
+        with self._condition:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "peak_in_use": self._peak_in_use,
+                "requests": self._requests,
+                "waits": self._waits,
+                "wait_time": self._wait_time,
+                "closed": self._closed,
+            }
+
 
 class MenuMVPAPIClient:
     """Cliente para a API do Menu MVP"""
 
-    def __init__(self, base_url: str = "https://menu-mvp-api.onrender.com"):
+    def __init__(
+        self,
+        base_url: str = "https://menu-mvp-api.onrender.com",
+        session: Optional[requests.Session] = None,
+        soft_ttl: Optional[float] = None,
+        hard_ttl: Optional[float] = None,
+        pool_size: int = POOL_SIZE,
+        limiter: Optional[RateLimiter] = None,
+        detail_cache_size: int = DETAIL_CACHE_SIZE,
+    ):
         self.base_url = base_url.rstrip("/")
-        self.session = requests.Session()
+        # Uma sessão fornecida é usada em todas as requisições (quem a criou a
+        # gerencia); sem ela, cada requisição usa uma sessão do pool
+        self.session = session
+        self.pool = SessionPool(pool_size) if session is None else None
+        # Limite de requisições por categoria (None: sem limite)
+        self.limiter = limiter
+        # Sem `soft_ttl`, as listagens não usam cache (e `hard_ttl` não é usado)
+        self.soft_ttl = soft_ttl
+        self.hard_ttl: float = (soft_ttl if hard_ttl is None else hard_ttl) or 0.0
+        # Listagens em cache: endpoint -> (momento da busca, resposta)
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        # Receitas completas, da menos para a mais recentemente usada
+        self.detail_cache_size = detail_cache_size
+        self._details: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        # Buscas em andamento, esperadas por leituras simultâneas do mesmo endpoint
+        self._loading: Dict[str, Future] = {}
+        self._cache_lock = threading.Lock()
+        # Incrementada a cada escrita: buscas iniciadas antes dela não são guardadas
+        self._cache_version = 0
+        # Totais conhecidos: nome -> (momento da contagem, total)
+        self._counts: Dict[str, Tuple[float, int]] = {}
+        self._counts_lock = threading.Lock()
+        # Sem o endpoint /stats (ou com falha), só tenta de novo após este momento
+        self._stats_retry_at = 0.0
 
     def _make_request(
         self, method: str, endpoint: str, data: Optional[Dict] = None
     ) -> Dict:
-        """Faz uma requisição para a API"""
+        """Faz uma requisição para a API
+
+        Com `limiter`, a requisição espera sua vez antes de ocupar uma sessão
+        HTTP, e respostas 429 pausam a categoria pelo tempo de Retry-After antes
+        de uma nova tentativa.
+        """
         url = f"{self.base_url}{endpoint}"
+        category = request_category(method, endpoint)
+
+        for attempt in range(THROTTLE_RETRIES + 1):
+            if self.limiter is not None:
+                self.limiter.acquire(category)
+            try:
+                with self._session() as session:
+                    response = self._send(session, method, url, endpoint, data)
+                    if (
+                        response.status_code == 429
+                        and self.limiter is not None
+                        and attempt < THROTTLE_RETRIES
+                    ):
+                        self.limiter.throttle(
+                            category,
+                            parse_retry_after(response.headers.get("Retry-After")),
+                        )
+                        continue
+                    response.raise_for_status()
+                    return response.json()
 
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Erro na requisição para {url}: {str(e)}")
+        # A última tentativa sempre retorna ou levanta a exceção acima
+        raise Exception(f"Erro na requisição para {url}: tentativas esgotadas")
+
+    def _send(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        endpoint: str,
+        data: Optional[Dict],
+    ) -> requests.Response:
+        """Envia uma tentativa da requisição e registra contagem e duração"""
+        method = method.upper()
+        labels: Dict[str, Any] = {"method": method, "route": route_label(endpoint)}
+        started = time.perf_counter()
         try:
-            if method.upper() == "GET":
-                response = self.session.get(url)
-            elif method.upper() == "POST":
-                response = self.session.post(url, json=data)
-            elif method.upper() == "PUT":
-                response = self.session.put(url, json=data)
-            elif method.upper() == "DELETE":
-                response = self.session.delete(url)
+            if method == "GET":
+                response = session.get(url)
+            elif method == "POST":
+                response = session.post(url, json=data)
+            elif method == "PUT":
+                response = session.put(url, json=data)
+            elif method == "DELETE":
+                response = session.delete(url)
             else:
                 raise ValueError(f"Método HTTP não suportado: {method}")
+        except requests.exceptions.RequestException:
+            api_requests.inc(status="error", **labels)
+            raise
+        finally:
+            api_latency.observe(time.perf_counter() - started, **labels)
+        api_requests.inc(status=str(response.status_code), **labels)
+        return response
+
+    @contextmanager
+    def _session(self) -> Iterator[requests.Session]:
+        if self.pool is None:
+            yield cast(requests.Session, self.session)
+        else:
+            with self.pool.session() as session:
+                yield session
+
+    def pool_stats(self) -> Optional[Dict[str, Any]]:
+        """Utilização do pool de sessões HTTP (None com sessão fornecida)"""
+        return None if self.pool is None else self.pool.stats()
+
+    def limiter_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Uso dos limites de requisição, com o tempo de espera na fila"""
+        return None if self.limiter is None else self.limiter.stats()
+
+    def close(self) -> None:
+        """Fecha as sessões do pool (uma sessão fornecida fica com quem a criou)"""
+        if self.pool is not None:
+            self.pool.close()
+
+    # Cache das listagens
+    def _read(self, endpoint: str, count: Optional[str] = None) -> Any:
+        """GET de uma listagem com cache stale-while-revalidate
+
+        Dentro de `soft_ttl` a resposta em cache é retornada direto. Até
+        `hard_ttl` ela ainda é retornada na hora, enquanto uma nova busca roda em
+        segundo plano; depois disso (ou sem cache) a leitura espera a busca.
+        Leituras simultâneas do mesmo endpoint compartilham a busca em andamento.
+        `count` nomeia o total do catálogo atualizado pela resposta.
+        """
+        if self.soft_ttl is None:
+            value = self._fetch(endpoint)
+            self._record_count(count, value)
+            return value
 
-            response.raise_for_status()
-            return response.json()
+        with self._cache_lock:
+            entry = self._cache.get(endpoint)
+            age = math.inf if entry is None else time.monotonic() - entry[0]
+            if entry is not None and age <= self.hard_ttl:
+                stale = age > self.soft_ttl
+                cache_lookup("api", "stale" if stale else "hit")
+                if stale and endpoint not in self._loading:
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(endpoint, count, *self._begin_load(endpoint)),
+                        name="api-refresh",
+                        daemon=True,
+                    ).start()
+                return entry[1]
+            cache_lookup("api", "miss")
+            future = self._loading.get(endpoint)
+            if future is None:
+                load = self._begin_load(endpoint)
 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Erro na requisição para {url}: {str(e)}")
+        if future is not None:
+            return future.result()
+        return self._complete_load(endpoint, count, *load)
+
+    def _begin_load(self, endpoint: str) -> Tuple[Future, int]:
+        """Registra uma busca em andamento (chamado com o lock do cache)"""
+        future: Future = Future()
+        self._loading[endpoint] = future
+        return future, self._cache_version
+
+    def _fetch(self, endpoint: str) -> Any:
+        """GET de uma listagem, reduzindo a resumida aos campos pedidos"""
+        value = self._make_request("GET", endpoint)
+        if endpoint == RECIPE_SUMMARIES and isinstance(value, list):
+            value = [
+                {field: item.get(field) for field in SUMMARY_FIELDS} for item in value
+            ]
+        return value
+
+    def _complete_load(
+        self,
+        endpoint: str,
+        count: Optional[str],
+        future: Future,
+        version: int,
+        detail: bool = False,
+    ) -> Any:
+        """Faz a busca registrada e guarda a resposta se não houve escrita no meio
+
+        Com `detail`, a resposta vai para o LRU de receitas completas.
+        """
+        try:
+            value = self._fetch(endpoint)
+        except BaseException as e:
+            with self._cache_lock:
+                if self._loading.get(endpoint) is future:
+                    del self._loading[endpoint]
+            future.set_exception(e)
+            raise
+        with self._cache_lock:
+            if self._loading.get(endpoint) is future:
+                del self._loading[endpoint]
+            if version == self._cache_version and detail:
+                self._details[endpoint] = (time.monotonic(), value)
+                while len(self._details) > self.detail_cache_size:
+                    self._details.popitem(last=False)
+            elif version == self._cache_version:
+                self._cache[endpoint] = (time.monotonic(), value)
+                self._record_count(count, value)
+        future.set_result(value)
+        return value
+
+    def _refresh(self, *load) -> None:
+        """Atualização em segundo plano: em caso de falha, o valor antigo continua"""
+        try:
+            self._complete_load(*load)
+        except Exception:
+            pass
+
+    def _invalidate(self, *prefixes: str) -> None:
+        """Descarta as listagens afetadas por uma escrita"""
+        with self._cache_lock:
+            self._cache_version += 1
+            for endpoint in [key for key in self._cache if key.startswith(prefixes)]:
+                del self._cache[endpoint]
+            for endpoint in [key for key in self._details if key.startswith(prefixes)]:
+                del self._details[endpoint]
+            for endpoint in [key for key in self._loading if key.startswith(prefixes)]:
+                del self._loading[endpoint]
+
+    # Totais do catálogo
+    def _record_count(self, name: Optional[str], value: Any) -> None:
+        if name is not None and isinstance(value, list):
+            self._set_count(name, len(value))
+
+    def _set_count(self, name: str, total: int) -> None:
+        with self._counts_lock:
+            self._counts[name] = (time.monotonic(), total)
+
+    def _adjust_count(self, name: str, delta: int) -> None:
+        """Ajusta um total conhecido após uma escrita, mantendo o momento da contagem"""
+        with self._counts_lock:
+            entry = self._counts.get(name)
+            if entry is not None:
+                self._counts[name] = (entry[0], max(entry[1] + delta, 0))
+
+    def _forget_count(self, name: str) -> None:
+        with self._counts_lock:
+            self._counts.pop(name, None)
+
+    def _known_counts(self, max_age: float) -> Dict[str, int]:
+        now = time.monotonic()
+        with self._counts_lock:
+            return {
+                name: total
+                for name, (counted_at, total) in self._counts.items()
+                if now - counted_at <= max_age
+            }
+
+    def get_stats(self) -> Dict:
+        """Busca os totais do catálogo no endpoint de estatísticas"""
+        return self._make_request("GET", "/stats")
+
+    def get_counts(
+        self, fetch_missing: bool = True, max_age: float = COUNTS_MAX_AGE
+    ) -> Dict[str, int]:
+        """Totais de ingredientes e receitas sem baixar as listas a cada consulta
+
+        Usa o endpoint /stats quando a API o oferece. Sem ele, usa os totais da
+        última listagem, ajustados pelas escritas feitas por este cliente, por até
+        `max_age` segundos; os que faltam são buscados pela listagem quando
+        `fetch_missing`, ou ficam de fora do resultado.
+        """
+        counts = self._known_counts(STATS_REFRESH)
+        if len(counts) == len(COUNTED):
+            return counts
+
+        now = time.monotonic()
+        if now >= self._stats_retry_at:
+            try:
+                stats = self.get_stats()
+                counts = {name: int(stats[name]) for name in COUNTED}
+            except Exception:
+                self._stats_retry_at = now + max_age
+            else:
+                for name, total in counts.items():
+                    self._set_count(name, total)
+                return counts
+
+        counts = self._known_counts(max_age)
+        if fetch_missing:
+            for name, method in COUNTED.items():
+                if name not in counts:
+                    counts[name] = len(getattr(self, method)())
+        return counts
 
     # Métodos para Ingredientes
     def get_ingredients(self) -> List[Dict]:
         """Busca todos os ingredientes"""
-        return self._make_request("GET", "/ingredients/")
+        return self._read("/ingredients/", count="ingredients")
 
     def create_ingredient(self, name: str) -> Dict:
         """Cria um novo ingrediente"""
         data = {"name": name}
-        return self._make_request("POST", "/ingredients/", data)
+        result = self._make_request("POST", "/ingredients/", data)
+        self._invalidate("/ingredients/")
+        self._adjust_count("ingredients", 1)
+        return result
 
     def get_ingredient(self, ingredient_id: int) -> Dict:
         """Busca um ingrediente específico"""
@@ -53,35 +488,92 @@ class MenuMVPAPIClient:
     def update_ingredient(self, ingredient_id: int, name: str) -> Dict:
         """Atualiza um ingrediente"""
         data = {"name": name}
-        return self._make_request("PUT", f"/ingredients/{ingredient_id}", data)
+        result = self._make_request("PUT", f"/ingredients/{ingredient_id}", data)
+        # As receitas trazem os nomes dos ingredientes
+        self._invalidate("/ingredients/", "/recipes/")
+        return result
 
     def delete_ingredient(self, ingredient_id: int) -> Dict:
         """Deleta um ingrediente"""
-        return self._make_request("DELETE", f"/ingredients/{ingredient_id}")
+        result = self._make_request("DELETE", f"/ingredients/{ingredient_id}")
+        self._invalidate("/ingredients/", "/recipes/")
+        self._adjust_count("ingredients", -1)
+        return result
 
     # Métodos para Receitas
     def get_recipes(self) -> List[Dict]:
         """Busca todas as receitas"""
-        return self._make_request("GET", "/recipes/")
+        return self._read("/recipes/", count="recipes")
+
+    def get_recipe_summaries(self) -> List[Dict]:
+        """Busca todas as receitas só com id e nome (listas e seletores)"""
+        return self._read(RECIPE_SUMMARIES, count="recipes")
 
     def get_recipe_by_name(self, recipe_name: str) -> Dict:
         """Busca uma receita pelo nome"""
         return self._make_request("GET", f"/recipes/{recipe_name}")
 
+    def get_recipe_details(self, recipe_name: str) -> Dict:
+        """Receita completa pelo nome, guardada em um LRU limitado
+
+        As entradas valem até `hard_ttl` e saem com qualquer escrita em receitas;
+        pedidos simultâneos da mesma receita compartilham a busca. Sem cache
+        (`soft_ttl` None), equivale a `get_recipe_by_name`.
+        """
+        endpoint = f"/recipes/{quote(recipe_name, safe='')}"
+        if self.soft_ttl is None:
+            return self._make_request("GET", endpoint)
+
+        with self._cache_lock:
+            entry = self._details.get(endpoint)
+            if entry is not None and time.monotonic() - entry[0] <= self.hard_ttl:
+                self._details.move_to_end(endpoint)
+                cache_lookup("details", "hit")
+                return entry[1]
+            cache_lookup("details", "miss")
+            future = self._loading.get(endpoint)
+            if future is None:
+                load = self._begin_load(endpoint)
+
+        if future is not None:
+            return future.result()
+        return self._complete_load(endpoint, None, *load, detail=True)
+
+    def cached_recipe_details(self, recipe_name: str) -> bool:
+        """Se a receita completa já está no LRU ou sendo buscada"""
+        endpoint = f"/recipes/{quote(recipe_name, safe='')}"
+        with self._cache_lock:
+            entry = self._details.get(endpoint)
+            fresh = entry is not None and time.monotonic() - entry[0] <= self.hard_ttl
+            return fresh or endpoint in self._loading
+
     def create_recipe(
         self, name: str, instructions: str, ingredients: List[Dict]
     ) -> Dict:
         """Cria uma nova receita"""
         data = {"name": name, "instructions": instructions, "ingredients": ingredients}
-        return self._make_request("POST", "/recipes/", data)
+        result = self._make_request("POST", "/recipes/", data)
+        self._recipes_created(1)
+        return result
 
     def create_recipes_bulk(self, recipes: List[Dict]) -> List[Dict]:
         """Cria múltiplas receitas de uma vez"""
-        return self._make_request("POST", "/recipes/bulk", recipes)
+        result = self._make_request("POST", "/recipes/bulk", recipes)
+        self._recipes_created(len(result) if isinstance(result, list) else len(recipes))
+        return result
+
+    def _recipes_created(self, total: int) -> None:
+        self._invalidate("/recipes/", "/ingredients/")
+        self._adjust_count("recipes", total)
+        # A API cria os ingredientes novos das receitas: o total precisa ser recontado
+        self._forget_count("ingredients")
 
     def delete_recipe(self, recipe_id: int) -> Dict:
         """Deleta uma receita"""
-        return self._make_request("DELETE", f"/recipes/id/{recipe_id}")
+        result = self._make_request("DELETE", f"/recipes/id/{recipe_id}")
+        self._invalidate("/recipes/")
+        self._adjust_count("recipes", -1)
+        return result
 
     # Métodos para Chat/AI
     def chat(self, message: str, thread_id: str) -> Dict:
@@ -99,5 +591,27 @@ class MenuMVPAPIClient:
         return self._make_request("GET", "/")
 
 
-# Instância global do cliente
-api_client = MenuMVPAPIClient()
+# Instância global do cliente (MENU_MVP_API_URL aponta para outra API, como a simulada),
+# compartilhada pelas sessões: as listagens usam o cache stale-while-revalidate e
+# as requisições passam pelos limites por categoria, com fila justa entre sessões
+api_client = MenuMVPAPIClient(
+    os.environ.get("MENU_MVP_API_URL", "https://menu-mvp-api.onrender.com"),
+    soft_ttl=SOFT_TTL,
+    hard_ttl=HARD_TTL,
+    limiter=RateLimiter(),
+)
+atexit.register(api_client.close)
+
+
+def _limiter_wait_samples() -> List[Tuple[Dict[str, str], float]]:
+    stats = api_client.limiter_stats() or {}
+    return [
+        ({"category": category}, item["wait_time"]) for category, item in stats.items()
+    ]
+
+
+registry.counter_callback(
+    "menu_mvp_rate_limit_wait_seconds_total",
+    "Tempo total de espera na fila do limite de requisições, por categoria",
+    _limiter_wait_samples,
+)
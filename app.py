@@ -1,16 +1,35 @@
-import os
-import sys
+from typing import Any, Dict
 
 import streamlit as st
 
-# Adiciona o diretório raiz ao path para importar o api_client
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 from api_client import api_client
+from page_profiler import finish_page, start_page
+from repository import catalog
 
 st.set_page_config(
     page_title="Menu MVP - Sistema de Gerenciamento", page_icon="🍽️", layout="wide"
 )
+profiler = start_page("inicio")
+
+# Dados das outras páginas (catálogo, DataFrames e índices) são preparados em
+# segundo plano enquanto esta página é montada
+prefetch = catalog.start_prefetch()
+
+
+def counts_known():
+    """Indica se os totais de receitas e ingredientes já são conhecidos"""
+    counts = catalog.counts()
+    return "ingredients" in counts and "recipes" in counts
+
+
+# Espera a busca em segundo plano sem bloquear a página
+@st.fragment(run_every=0.5)
+def prefetch_status(job):
+    """Mostra o carregamento e recarrega a página quando os dados chegam"""
+    if job.done() or counts_known():
+        st.rerun()
+    st.caption("⏳ Carregando o catálogo em segundo plano...")
+
 
 st.title("🍽️ Menu MVP - Sistema de Gerenciamento")
 st.markdown("---")
@@ -34,7 +53,7 @@ with col1:
     - Cadastre e gerencie seus ingredientes
     - Integração com API externa
     - Busca e filtros
-    - Exportação para CSV
+    - Exportação para CSV, Parquet e Excel
     """
     )
 
@@ -56,7 +75,7 @@ with col3:
     - Planeje suas refeições semanais
     - Gere listas de compras automaticamente
     - Visualização por dia da semana
-    - Exporte dados para CSV
+    - Exporte dados para CSV, Parquet e Excel
     """
     )
 
@@ -102,43 +121,39 @@ with col_status2:
 st.markdown("---")
 st.header("📊 Estatísticas Gerais")
 
-# Carregar dados da API
-try:
-    ingredients = api_client.get_ingredients()
-    recipes = api_client.get_recipes()
-    total_ingredients = len(ingredients)
-    total_recipes = len(recipes)
-except Exception as e:
-    total_ingredients = 0
-    total_recipes = 0
-    st.warning(f"Não foi possível carregar dados da API: {str(e)}")
-
-# Verificar dados locais de planejamento
-total_planned_meals = sum(
-    len(meals)
-    for day_plan in st.session_state.get("meal_plan", {}).values()
-    for meals in day_plan.values()
-)
+# Totais do catálogo: endpoint de estatísticas ou totais já conhecidos, sem
+# baixar as listas de ingredientes e receitas a cada visita
+with profiler.section("fetch"):
+    counts: Dict[str, Any] = catalog.counts()
+missing = [name for name in ("ingredients", "recipes") if name not in counts]
+if missing and prefetch is not None and not prefetch.done():
+    counts = {"ingredients": "…", "recipes": "…", **counts}
+    prefetch_status(prefetch)
+elif missing:
+    with profiler.section("fetch"):
+        try:
+            for name in missing:
+                counts[name] = len(catalog.get(name))
+        except Exception as e:
+            counts = {"ingredients": 0, "recipes": 0}
+            st.warning(f"Não foi possível carregar dados da API: {str(e)}")
+
+# Totais do planejamento, atualizados pela página de planejamento a cada alteração
+plan_stats = st.session_state.get("plan_stats", {})
 
 col_stats1, col_stats2, col_stats3, col_stats4 = st.columns(4)
 
 with col_stats1:
-    st.metric("🥕 Ingredientes", total_ingredients)
+    st.metric("🥕 Ingredientes", counts["ingredients"])
 
 with col_stats2:
-    st.metric("👨‍🍳 Receitas", total_recipes)
+    st.metric("👨‍🍳 Receitas", counts["recipes"])
 
 with col_stats3:
-    st.metric("📅 Refeições Planejadas", total_planned_meals)
+    st.metric("📅 Refeições Planejadas", plan_stats.get("meals", 0))
 
 with col_stats4:
-    if "shopping_list" in st.session_state:
-        unique_items = len(
-            set(item["ingrediente"] for item in st.session_state.shopping_list)
-        )
-        st.metric("🛒 Itens na Lista", unique_items)
-    else:
-        st.metric("🛒 Itens na Lista", 0)
+    st.metric("🛒 Itens na Lista", plan_stats.get("items", 0))
 
 # Dicas de uso
 st.markdown("---")
@@ -170,7 +185,7 @@ with st.expander("ℹ️ Informações Técnicas"):
     - Integração com API externa
     - Chat AI para assistência
     - Armazenamento em sessão (planejamento)
-    - Exportação para CSV
+    - Exportação para CSV, Parquet e Excel
     - Filtros e buscas
     - Interface responsiva
     
@@ -185,3 +200,5 @@ with st.expander("ℹ️ Informações Técnicas"):
 # Footer
 st.markdown("---")
 st.markdown("*Desenvolvido com ❤️ usando Streamlit e integrado com API externa*")
+
+finish_page(profiler)
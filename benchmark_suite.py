@@ -0,0 +1,391 @@
+"""Benchmarks dos caminhos críticos do app, com baselines em JSON
+
+Uso:
+    python benchmark_suite.py run --output benchmarks/current.json
+    python benchmark_suite.py compare benchmarks/baseline.json benchmarks/current.json
+    python benchmark_suite.py compare benchmarks/baseline.json   # roda e compara
+
+O comando compare termina com código 1 quando algum benchmark fica mais lento
+que a baseline além do limite (`--threshold`, 25% por padrão).
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from api_client import MenuMVPAPIClient
+from dedup import find_duplicates, recipe_usage
+from export_service import available_formats, serialize
+from ingredient_parser import parse_lines
+from ingredient_resolver import IngredientResolver
+from meal_planner import MEAL_TYPES, get_week_days, shopping_list
+from stub_server import StubAPI, StubServer
+from synthetic_data import generate_catalog
+
+DEFAULT_SIZES = [1_000, 10_000]
+DEFAULT_THRESHOLD = 0.25
+BASELINE_PATH = "benchmarks/baseline.json"
+
+# Cada medição roda a função várias vezes até somar ao menos MIN_TIME segundos
+REPEAT = 5
+MIN_TIME = 0.05
+
+# nome -> função de preparo: recebe o BenchContext e retorna a chamada a ser medida
+BENCHMARKS: Dict[str, Callable] = {}
+_SIZED: Dict[str, bool] = {}
+
+
+def benchmark(name: str, sized: bool = True):
+    """Registra um benchmark"""
+
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS[name] = setup
+        _SIZED[name] = sized
+        return setup
+
+    return register
+
+
+class BenchContext:
+    """Dados sintéticos e servidor local compartilhados pelos benchmarks de um tamanho"""
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.ingredients, self.recipes = generate_catalog(size, size, seed=seed)
+        self._server: Optional[StubServer] = None
+
+    @property
+    def client(self) -> MenuMVPAPIClient:
+        if self._server is None:
+            self._server = StubServer(StubAPI(self.ingredients, self.recipes)).start()
+        return MenuMVPAPIClient(self._server.url)
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+
+
+# Cliente da API (ida e volta HTTP + decodificação do JSON)
+@benchmark("client.get_ingredients")
+def _client_ingredients(ctx: BenchContext):
+    client = ctx.client
+    return client.get_ingredients
+
+
+@benchmark("client.get_recipes")
+def _client_recipes(ctx: BenchContext):
+    client = ctx.client
+    return client.get_recipes
+
+
+@benchmark("json.decode_recipes")
+def _decode_recipes(ctx: BenchContext):
+    payload = json.dumps(ctx.recipes).encode()
+    return lambda: json.loads(payload)
+
+
+# Páginas de ingredientes e receitas: DataFrame e busca por nome
+@benchmark("ingredients.dataframe")
+def _ingredients_dataframe(ctx: BenchContext):
+    return lambda: pd.DataFrame(ctx.ingredients)
+
+
+@benchmark("ingredients.search")
+def _ingredients_search(ctx: BenchContext):
+    df = pd.DataFrame(ctx.ingredients)
+    return lambda: df[df["name"].str.contains("tomate", case=False)]
+
+
+@benchmark("recipes.dataframe")
+def _recipes_dataframe(ctx: BenchContext):
+    return lambda: pd.DataFrame(ctx.recipes)
+
+
+@benchmark("recipes.search")
+def _recipes_search(ctx: BenchContext):
+    df = pd.DataFrame(ctx.recipes)
+    return lambda: df[df["name"].str.contains("bolo", case=False)]
+
+
+# Leitura das linhas de ingredientes (formulário e importação em lote)
+@benchmark("ingredients.parse_lines")
+def _parse_lines(ctx: BenchContext):
+    lines = [
+        f"{item['quantity']} {item['unit']} de {item['name']}"
+        for recipe in ctx.recipes
+        for item in recipe["ingredients"]
+    ]
+    return lambda: parse_lines(lines)
+
+
+# Associação de nomes digitados ao catálogo: variações dos nomes existentes
+# (plural, minúsculas) e nomes com erro de digitação
+@benchmark("ingredients.resolve_many")
+def _resolve_many(ctx: BenchContext):
+    resolver = IngredientResolver(ctx.ingredients)
+    names = [ingredient["name"] for ingredient in ctx.ingredients[:500]]
+    queries = [f"{name.lower()}s" for name in names[::2]] + [
+        name[:-1] + name[-1] * 2 for name in names[1::2]
+    ]
+    return lambda: resolver.resolve_many(queries, limit=1)
+
+
+# Busca de duplicados no catálogo inteiro (blocagem por vizinhança ordenada)
+@benchmark("ingredients.find_duplicates")
+def _find_duplicates(ctx: BenchContext):
+    usage = recipe_usage(ctx.recipes)
+    return lambda: find_duplicates(ctx.ingredients, usage)
+
+
+# Planejamento
+@benchmark("planning.get_week_days", sized=False)
+def _week_days(ctx: BenchContext):
+    return get_week_days
+
+
+@benchmark("planning.shopping_list")
+def _shopping_list(ctx: BenchContext):
+    names = [recipe["name"] for recipe in ctx.recipes]
+    meal_plan = {
+        day: {
+            meal_type: [{"recipe": names[(i * 7 + j) % len(names)]}]
+            for j, meal_type in enumerate(MEAL_TYPES)
+        }
+        for i, day in enumerate(get_week_days())
+    }
+    return lambda: shopping_list(meal_plan, ctx.recipes)
+
+
+# Exportação
+def _register_exports() -> None:
+    for export_format in available_formats():
+        name = f"export.{export_format.lower()}"
+
+        def setup(ctx: BenchContext, export_format=export_format):
+            return lambda: serialize(ctx.recipes, export_format)
+
+        benchmark(name)(setup)
+
+
+_register_exports()
+
+
+def measure(
+    function: Callable, repeat: int = REPEAT, min_time: float = MIN_TIME
+) -> Dict:
+    """Tempo por chamada (mínimo e mediana entre `repeat` medições), em segundos
+
+    Como no timeit, o coletor de lixo fica desligado durante a medição.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(function, repeat, min_time)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _measure(function: Callable, repeat: int, min_time: float) -> Dict:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "loops": number,
+    }
+
+
+def run(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    only: Optional[str] = None,
+    repeat: int = REPEAT,
+    min_time: float = MIN_TIME,
+    log: Callable[[str], None] = lambda line: None,
+) -> Dict:
+    """Roda os benchmarks e retorna o relatório no formato da baseline"""
+    results: Dict[str, Dict] = {}
+    sizes = list(sizes)
+    for position, size in enumerate(sizes):
+        ctx = BenchContext(size)
+        try:
+            for name, setup in BENCHMARKS.items():
+                if only and only not in name:
+                    continue
+                if not _SIZED[name] and position > 0:
+                    continue
+                key = f"{name}[{size}]" if _SIZED[name] else name
+                result = measure(setup(ctx), repeat, min_time)
+                results[key] = result
+                log(f"{key:<40} {result['min'] * 1000:>10.3f} ms")
+        finally:
+            ctx.close()
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict]:
+    """Compara dois relatórios pelo tempo mínimo de cada benchmark
+
+    Status: "regressão" (mais lento que a baseline além do limite), "melhoria"
+    (mais rápido além do limite), "ok", "novo" ou "removido".
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    current_results = current.get("results", {})
+    for name in sorted(set(base_results) | set(current_results)):
+        before = base_results.get(name, {}).get("min")
+        after = current_results.get(name, {}).get("min")
+        if before is None:
+            status, ratio = "novo", None
+        elif after is None:
+            status, ratio = "removido", None
+        else:
+            ratio = after / before if before else float("inf")
+            if ratio > 1 + threshold:
+                status = "regressão"
+            elif ratio < 1 / (1 + threshold):
+                status = "melhoria"
+            else:
+                status = "ok"
+        rows.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def format_report(rows: List[Dict]) -> str:
+    """Tabela de texto com a comparação"""
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.3f}"
+
+    lines = [
+        f"{'benchmark':<40} {'baseline ms':>12} {'atual ms':>12} {'razão':>7}  status"
+    ]
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        lines.append(
+            f"{row['name']:<40} {ms(row['baseline']):>12} {ms(row['current']):>12} "
+            f"{ratio:>7}  {row['status']}"
+        )
+    regressions = sum(row["status"] == "regressão" for row in rows)
+    lines.append(f"\n{regressions} regressão(ões) em {len(rows)} benchmarks")
+    return "\n".join(lines)
+
+
+def _load(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(report: Dict, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="roda os benchmarks")
+    run_parser.add_argument("--output", default=None, help="grava o relatório em JSON")
+
+    compare_parser = commands.add_parser("compare", help="compara com a baseline")
+    compare_parser.add_argument("baseline", nargs="?", default=BASELINE_PATH)
+    compare_parser.add_argument("current", nargs="?", default=None)
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    for sub in (run_parser, compare_parser):
+        sub.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+        sub.add_argument(
+            "--only", default=None, help="roda só os nomes que contêm o texto"
+        )
+
+    args = parser.parse_args(argv)
+
+    def log(line: str) -> None:
+        print(line, file=sys.stderr)
+
+    if args.command == "run":
+        report = run(args.sizes, args.only, log=log)
+        if args.output:
+            _save(report, args.output)
+        return 0
+
+    baseline = _load(args.baseline)
+    if args.current:
+        current = _load(args.current)
+    else:
+        current = run(args.sizes, args.only, log=log)
+        if args.only:
+            baseline["results"] = {
+                name: result
+                for name, result in baseline.get("results", {}).items()
+                if args.only in name
+            }
+    if baseline.get("meta", {}).get("platform") != current.get("meta", {}).get(
+        "platform"
+    ):
+        print("Aviso: baseline gerada em outra máquina/plataforma", file=sys.stderr)
+    rows = compare(baseline, current, args.threshold)
+    if not args.current:
+        # Medições isoladas oscilam: regressões são medidas de novo antes do relatório
+        for name in {
+            row["name"].split("[")[0] for row in rows if row["status"] == "regressão"
+        }:
+            log(f"Confirmando {name}...")
+            retry = run(args.sizes, name, log=log)["results"]
+            for key, result in retry.items():
+                if result["min"] < current["results"][key]["min"]:
+                    current["results"][key] = result
+        rows = compare(baseline, current, args.threshold)
+    print(format_report(rows))
+    return 1 if any(row["status"] == "regressão" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import hashlib
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sem acentos e espaços extras, sem memorizar o resultado
+
+    Para textos livres (mensagens do chat), que não devem ficar no cache de nomes.
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> str:
+    """Normaliza um nome para comparação (minúsculas, sem acentos e espaços extras)"""
+    return normalize_text(name)
+
+
+def ingredient_name(item: Dict) -> str:
+    """Extrai o nome de um ingrediente de receita, aceitando os formatos da API"""
+    name = item.get("name") or item.get("ingredient_name")
+    if not name and isinstance(item.get("ingredient"), dict):
+        name = item["ingredient"].get("name")
+    return name or ""
+
+
+def recipe_ingredient_names(recipe: Dict) -> List[str]:
+    """Lista os nomes (não vazios) dos ingredientes de uma receita"""
+    names = (ingredient_name(item) for item in recipe.get("ingredients") or [])
+    return [name for name in names if name]
+
+
+def catalog_fingerprint(recipes: Iterable[Dict]) -> str:
+    """Gera uma assinatura do catálogo que muda sempre que receitas ou ingredientes mudam"""
+    digest = hashlib.sha1()
+    for recipe in recipes:
+        digest.update(str(recipe.get("id")).encode())
+        digest.update(b"\x1f")
+        digest.update((recipe.get("name") or "").encode())
+        for name in recipe_ingredient_names(recipe):
+            digest.update(b"\x1e")
+            digest.update(name.encode())
+        digest.update(b"\x1d")
+    return digest.hexdigest()
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from catalog import normalize_text
+from chat_store import DATA_DIR
+from metrics import cache_lookup
+
+DEFAULT_TTL = 24 * 60 * 60
+MAX_ENTRIES = 500
+MAX_BYTES = 2 * 1024 * 1024
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normaliza a pergunta (caixa, acentos, espaços e pontuação final)"""
+    return normalize_text(prompt).strip(" \"'“”").rstrip(" ?!.").strip()
+
+
+class ChatResponseCache:
+    """Cache de respostas para perguntas que abrem uma conversa
+
+    Entradas expiram após `ttl` segundos e as menos usadas são descartadas quando
+    o cache passa de `max_entries` entradas ou `max_bytes` bytes. O conteúdo é
+    gravado em um arquivo JSON para sobreviver a reinícios do processo.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+    ):
+        self.path = (
+            path if path is not None else os.path.join(DATA_DIR, "chat_cache.json")
+        )
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Lê o arquivo do disco na primeira utilização"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, expires_at, answer in stored:
+            if expires_at > now:
+                self._store(key, expires_at, answer)
+
+    def _save(self) -> None:
+        """Grava o cache no disco (escrita atômica)"""
+        if not self.path:
+            return
+        entries = [
+            [key, expires_at, answer]
+            for key, (expires_at, answer) in self._entries.items()
+        ]
+        temporary = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(temporary, self.path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _size(key: str, answer: str) -> int:
+        return len(key.encode()) + len(answer.encode())
+
+    def _remove(self, key: str) -> None:
+        _, answer = self._entries.pop(key)
+        self.total_bytes -= self._size(key, answer)
+
+    def _store(self, key: str, expires_at: float, answer: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, answer)
+        self.total_bytes += self._size(key, answer)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Retorna a resposta em cache para a pergunta, se existir e não tiver expirado"""
+        key = normalize_prompt(prompt)
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                cache_lookup("chat", "miss")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            cache_lookup("chat", "hit")
+            return entry[1]
+
+    def put(self, prompt: str, answer: str) -> None:
+        """Guarda a resposta de uma pergunta"""
+        key = normalize_prompt(prompt)
+        if not key or not answer:
+            return
+        with self._lock:
+            self._load()
+            self._store(key, time.time() + self.ttl, answer)
+            self._save()
+
+    def clear(self) -> None:
+        """Esvazia o cache e zera as métricas"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self._loaded = True
+            self._save()
+
+    def stats(self) -> Dict:
+        """Métricas de uso do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
+
+
+# Instância global do cache de respostas
+chat_cache = ChatResponseCache()
@@ -0,0 +1,191 @@
+import socket
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from api_client import MenuMVPAPIClient
+from rate_limiter import current_session, session_scope
+
+MAX_WORKERS = 4
+MAX_PENDING = 8
+
+
+class ChatBusyError(Exception):
+    """Todas as vagas para requisições de chat estão ocupadas"""
+
+
+class _CancellableAdapter(HTTPAdapter):
+    """Adaptador que registra as conexões abertas para poder interrompê-las"""
+
+    def __init__(self, *args, **kwargs):
+        self.connections: "weakref.WeakSet" = weakref.WeakSet()
+        self.aborted = False
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        class TrackedHTTPConnection(HTTPConnection):
+            def connect(self):
+                super().connect()
+                adapter.track(self)
+
+        class TrackedHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                super().connect()
+                adapter.track(self)
+
+        class TrackedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = TrackedHTTPConnection
+
+        class TrackedHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = TrackedHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TrackedHTTPConnectionPool,
+            "https": TrackedHTTPSConnectionPool,
+        }
+
+    def track(self, connection: HTTPConnection) -> None:
+        """Registra uma conexão recém-aberta"""
+        self.connections.add(connection)
+        # Cancelamento pedido enquanto a conexão ainda estava sendo aberta
+        if self.aborted:
+            self._shutdown(connection)
+
+    def abort(self) -> None:
+        """Interrompe as conexões abertas, destravando leituras em andamento"""
+        self.aborted = True
+        for connection in list(self.connections):
+            self._shutdown(connection)
+
+    @staticmethod
+    def _shutdown(connection: HTTPConnection) -> None:
+        sock = getattr(connection, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class CancellableSession(requests.Session):
+    """Sessão HTTP cujas requisições em andamento podem ser canceladas"""
+
+    def __init__(self):
+        super().__init__()
+        self.adapter = _CancellableAdapter()
+        self.mount("http://", self.adapter)
+        self.mount("https://", self.adapter)
+
+    def cancel(self) -> None:
+        """Cancela as requisições em andamento e fecha a sessão"""
+        self.adapter.abort()
+        self.close()
+
+
+class ChatRequest:
+    """Requisição de chat em segundo plano, consultada a cada rerun da página"""
+
+    def __init__(self, message: str, thread_id: str, **metadata: Any):
+        self.message = message
+        self.thread_id = thread_id
+        self.metadata: Dict[str, Any] = metadata
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        self.session = CancellableSession()
+        self.future: Optional[Future] = None
+
+    def done(self) -> bool:
+        """Indica se a resposta já chegou (ou se a requisição falhou)"""
+        return self.future is not None and self.future.done()
+
+    def elapsed(self) -> float:
+        """Tempo decorrido desde o envio, em segundos"""
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def result(self) -> Dict:
+        """Resposta da API (lança a exceção da requisição, se houver)"""
+        assert self.future is not None
+        return self.future.result()
+
+    def cancel(self) -> None:
+        """Cancela a requisição, interrompendo a conexão HTTP em andamento"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+        self.session.cancel()
+
+
+class ChatExecutor:
+    """Executa chamadas de chat em um pool limitado de threads
+
+    Quando `max_pending` requisições já estão em andamento ou na fila, novas
+    chamadas são recusadas com ChatBusyError em vez de acumular threads.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_pending: int = MAX_PENDING):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="chat"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(
+        self,
+        client: MenuMVPAPIClient,
+        message: str,
+        thread_id: str,
+        prepare: Optional[Callable[[str], str]] = None,
+        **metadata: Any,
+    ) -> ChatRequest:
+        """Envia a mensagem em segundo plano e retorna a requisição pendente
+
+        `prepare`, quando informado, roda na thread de trabalho antes do envio e
+        pode reescrever a mensagem (por exemplo, para anexar contexto).
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ChatBusyError(
+                "Muitas conversas em andamento, tente novamente em instantes"
+            )
+
+        request = ChatRequest(message, thread_id, **metadata)
+        request_client = MenuMVPAPIClient(
+            client.base_url, session=request.session, limiter=client.limiter
+        )
+        # O limite de chat conta a requisição para a sessão que a enviou
+        session_key = current_session()
+
+        def run() -> Dict:
+            with session_scope(session_key):
+                text = prepare(message) if prepare is not None else message
+                return request_client.chat(text, thread_id)
+
+        def finish(_future: Future) -> None:
+            request.finished_at = time.monotonic()
+            request.session.close()
+            self._slots.release()
+
+        try:
+            request.future = self._executor.submit(run)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        request.future.add_done_callback(finish)
+        return request
+
+    def shutdown(self) -> None:
+        """Encerra o pool, cancelando o que ainda estiver na fila"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instância global do executor de chat
+chat_executor = ChatExecutor()
@@ -0,0 +1,255 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from catalog import ingredient_name, normalize_text
+
+# Orçamento do bloco de contexto (tokens estimados) e itens recuperados por mensagem
+DEFAULT_TOKEN_BUDGET = 400
+MAX_RESULTS = 6
+# Conjuntos do catálogo indexados (as escritas neles desatualizam o índice)
+CATALOG_DATASETS = frozenset({"recipes", "ingredients"})
+MAX_INSTRUCTIONS_CHARS = 160
+
+# Parâmetros do BM25
+_K1 = 1.2
+_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    """
+    a ao aos as com como da das de do dos e em eu me minha meu na nas no nos o os
+    ou para pela pelo por pra qual quais que se sem seu sua um uma umas uns voce
+    algo alguma algum fazer faco posso quero queria tenho tem sugira sugere sugestao
+    receita receitas ingrediente ingredientes prato pratos
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra o texto em termos normalizados, sem acentos e sem palavras vazias"""
+    return [
+        token
+        for token in _TOKEN.findall(normalize_text(text))
+        if len(token) > 1 and token not in _STOPWORDS
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens do modelo (cerca de 4 caracteres por token)"""
+    return math.ceil(len(text) / 4)
+
+
+def _recipe_ingredients(recipe: Dict) -> List[str]:
+    """Ingredientes da receita com quantidade e unidade, quando houver"""
+    items = []
+    for item in recipe.get("ingredients") or []:
+        name = ingredient_name(item)
+        if not name:
+            continue
+        amount = " ".join(
+            str(item[key]) for key in ("quantity", "unit") if item.get(key)
+        )
+        items.append(f"{amount} {name}" if amount else name)
+    return items
+
+
+def _recipe_document(recipe: Dict) -> Tuple[str, str]:
+    """Texto indexado e linha de contexto de uma receita"""
+    name = recipe.get("name") or ""
+    ingredients = _recipe_ingredients(recipe)
+    instructions = " ".join((recipe.get("instructions") or "").split())
+    # O nome conta em dobro na pontuação
+    text = " ".join([name, name, *ingredients, instructions])
+
+    line = f"- Receita: {name}"
+    if ingredients:
+        line += f" — ingredientes: {', '.join(ingredients)}"
+    if instructions:
+        if len(instructions) > MAX_INSTRUCTIONS_CHARS:
+            instructions = instructions[:MAX_INSTRUCTIONS_CHARS].rsplit(" ", 1)[0]
+            instructions += "..."
+        line += f" — preparo: {instructions}"
+    return text, line
+
+
+def _ingredient_document(ingredient: Dict) -> Tuple[str, str]:
+    """Texto indexado e linha de contexto de um ingrediente do catálogo"""
+    name = ingredient.get("name") or ""
+    return name, f"- Ingrediente: {name}"
+
+
+class CatalogRetriever:
+    """Índice lexical (BM25) sobre as receitas e ingredientes do catálogo
+
+    O índice é atualizado de forma incremental: a cada `update` apenas os itens
+    novos, alterados ou removidos mexem nas listas invertidas.
+    """
+
+    def __init__(self):
+        # chave do documento -> (texto indexado, linha de contexto, termos)
+        self._documents: Dict[Tuple[str, object], Tuple[str, str, Counter]] = {}
+        self._postings: Dict[str, Dict[Tuple[str, object], int]] = {}
+        self._lengths: Dict[Tuple[str, object], int] = {}
+        self._total_length = 0
+        # Pesos BM25 por termo, calculados sob demanda e descartados a cada mudança
+        self._weights: Dict[
+            str, Tuple[float, List[Tuple[Tuple[str, object], float]]]
+        ] = {}
+        self._lock = threading.Lock()
+        # Momento da busca dos dados usados no último `sync`
+        self.synced_at: Optional[float] = None
+        # Momento da última escrita no catálogo (veja `written`)
+        self.written_at: Optional[float] = None
+        self._sync_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _add(self, key: Tuple[str, object], text: str, line: str) -> None:
+        terms = Counter(tokenize(text))
+        self._documents[key] = (text, line, terms)
+        self._lengths[key] = sum(terms.values())
+        self._total_length += self._lengths[key]
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[key] = frequency
+
+    def _remove(self, key: Tuple[str, object]) -> None:
+        _, _, terms = self._documents.pop(key)
+        self._total_length -= self._lengths.pop(key)
+        for term in terms:
+            posting = self._postings[term]
+            del posting[key]
+            if not posting:
+                del self._postings[term]
+
+    def update(self, recipes: Iterable[Dict], ingredients: Iterable[Dict]) -> int:
+        """Sincroniza o índice com o catálogo, retornando quantos itens mudaram"""
+        documents = {}
+        for recipe in recipes:
+            documents[("recipe", recipe.get("id", recipe.get("name")))] = (
+                _recipe_document(recipe)
+            )
+        for ingredient in ingredients:
+            documents[("ingredient", ingredient.get("id", ingredient.get("name")))] = (
+                _ingredient_document(ingredient)
+            )
+
+        changes = 0
+        with self._lock:
+            for key in [key for key in self._documents if key not in documents]:
+                self._remove(key)
+                changes += 1
+            for key, (text, line) in documents.items():
+                current = self._documents.get(key)
+                if current is not None and current[:2] == (text, line):
+                    continue
+                if current is not None:
+                    self._remove(key)
+                self._add(key, text, line)
+                changes += 1
+            if changes:
+                self._weights.clear()
+        return changes
+
+    def sync(
+        self, recipes: List[Dict], ingredients: List[Dict], fetched_at: float
+    ) -> int:
+        """Atualiza o índice com o catálogo lido pela sessão, retornando quantos
+        itens mudaram
+
+        O índice é do processo e cada sessão tem a sua cópia do catálogo: dados
+        buscados antes dos que o índice já tem são ignorados.
+        """
+        with self._sync_lock:
+            if self.synced_at is not None and fetched_at <= self.synced_at:
+                return 0
+            changes = self.update(recipes, ingredients)
+            self.synced_at = fetched_at
+            return changes
+
+    def written(self, names: Iterable[str]) -> None:
+        """Marca o índice como desatualizado após uma escrita no catálogo"""
+        if not CATALOG_DATASETS.isdisjoint(names):
+            self.written_at = time.monotonic()
+
+    @property
+    def stale(self) -> bool:
+        """Se houve escrita no catálogo depois da busca dos dados do índice"""
+        return self.written_at is not None and (
+            self.synced_at is None or self.synced_at < self.written_at
+        )
+
+    def _term_weights(
+        self, term: str
+    ) -> Tuple[float, List[Tuple[Tuple[str, object], float]]]:
+        """IDF e peso BM25 de cada documento que contém o termo"""
+        cached = self._weights.get(term)
+        if cached is not None:
+            return cached
+        posting = self._postings.get(term, {})
+        total = len(self._documents)
+        average_length = self._total_length / total or 1.0
+        idf = math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+        weights = [
+            (
+                key,
+                frequency
+                * (_K1 + 1)
+                / (
+                    frequency
+                    + _K1 * (1 - _B + _B * self._lengths[key] / average_length)
+                ),
+            )
+            for key, frequency in posting.items()
+        ]
+        self._weights[term] = (idf, weights)
+        return idf, weights
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Tuple[float, str]]:
+        """Itens mais relevantes para a consulta, como (pontuação, linha de contexto)"""
+        terms = set(tokenize(query))
+        with self._lock:
+            total = len(self._documents)
+            if not terms or not total:
+                return []
+            scores: Dict[Tuple[str, object], float] = {}
+            for term in terms:
+                idf, weights = self._term_weights(term)
+                for key, weight in weights:
+                    scores[key] = scores.get(key, 0.0) + idf * weight
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(score, self._documents[key][1]) for key, score in best]
+
+    def context_block(
+        self,
+        query: str,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        limit: int = MAX_RESULTS,
+    ) -> str:
+        """Bloco de contexto com os itens relevantes, dentro do orçamento de tokens"""
+        header = "Itens relevantes do catálogo do usuário:"
+        used = estimate_tokens(header)
+        lines = []
+        for _, line in self.search(query, limit):
+            cost = estimate_tokens(line) + 1
+            if used + cost > token_budget:
+                continue
+            lines.append(line)
+            used += cost
+        if not lines:
+            return ""
+        return "\n".join([header, *lines])
+
+    def augment(self, message: str, query: Optional[str] = None, **kwargs) -> str:
+        """Anexa o bloco de contexto do catálogo à mensagem, quando houver"""
+        block = self.context_block(query if query is not None else message, **kwargs)
+        return f"{block}\n\n{message}" if block else message
+
+
+# Instância global do índice do catálogo
+catalog_retriever = CatalogRetriever()
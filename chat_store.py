@@ -0,0 +1,244 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+DATA_DIR = os.environ.get(
+    "MENU_MVP_DATA_DIR", os.path.join(os.path.expanduser("~"), ".menu_mvp")
+)
+
+# Janela de mensagens mantida na sessão e limites de memória por sessão
+PAGE_SIZE = 20
+MAX_SESSION_MESSAGES = 200
+MAX_SESSION_CHARS = 200_000
+# Conversas sem mensagens novas há mais que isso são apagadas, conferidas no
+# máximo uma vez por PRUNE_INTERVAL ao criar conversas
+MAX_THREAD_AGE = 30 * 24 * 3600
+PRUNE_INTERVAL = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    thread_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, seq)
+) WITHOUT ROWID;
+"""
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+CREATE INDEX IF NOT EXISTS threads_owner ON threads (owner, updated_at DESC);
+"""
+
+
+class ChatHistoryStore:
+    """Histórico das conversas do chat, gravado por thread em um SQLite local
+
+    O banco é um só para o processo; cada conversa pertence ao `owner` que a
+    criou (o navegador, veja a página do chat) e só é listada e lida por ele.
+    Conversas paradas há mais de `max_age` segundos são apagadas (`prune`).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age: float = MAX_THREAD_AGE):
+        self.path = path or os.path.join(DATA_DIR, "chat_history.sqlite3")
+        self.max_age = max_age
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pruned_at: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre a conexão na primeira utilização"""
+        if self._connection is None:
+            try:
+                if self.path != ":memory:":
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                connection = sqlite3.connect(self.path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+            except (OSError, sqlite3.Error):
+                # Sem acesso ao disco o histórico fica apenas em memória
+                connection = sqlite3.connect(":memory:", check_same_thread=False)
+            connection.executescript(_SCHEMA)
+            columns = [
+                row[1] for row in connection.execute("PRAGMA table_info(threads)")
+            ]
+            if "owner" not in columns:
+                # Bancos anteriores ao dono: as conversas antigas ficam sem
+                # dono e não aparecem para nenhuma sessão
+                connection.execute(
+                    "ALTER TABLE threads ADD COLUMN owner TEXT NOT NULL DEFAULT ''"
+                )
+            connection.executescript(_INDEXES)
+            self._connection = connection
+        return self._connection
+
+    def append(self, owner: str, thread_id: str, role: str, content: str) -> Dict:
+        """Adiciona uma mensagem ao final da conversa (criada para `owner`)"""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                row = connection.execute(
+                    "SELECT message_count, owner FROM threads WHERE thread_id = ?",
+                    (thread_id,),
+                ).fetchone()
+                if row is not None and row[1] != owner:
+                    raise PermissionError("Conversa pertence a outra sessão")
+                seq = row[0] if row else 0
+                if row is None:
+                    self._prune_due(connection, now)
+                    connection.execute(
+                        "INSERT INTO threads (thread_id, owner, title, updated_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (thread_id, owner, " ".join(content.split())[:60], now),
+                    )
+                connection.execute(
+                    "INSERT INTO messages VALUES (?, ?, ?, ?, ?)",
+                    (thread_id, seq, role, content, now),
+                )
+                connection.execute(
+                    "UPDATE threads SET message_count = ?, updated_at = ? "
+                    "WHERE thread_id = ?",
+                    (seq + 1, now, thread_id),
+                )
+        return {"seq": seq, "type": role, "content": content, "timestamp": now}
+
+    def load_window(
+        self,
+        owner: str,
+        thread_id: str,
+        limit: int = PAGE_SIZE,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        """Carrega as `limit` mensagens mais recentes anteriores a `before`"""
+        query = (
+            "SELECT seq, role, content, created_at FROM messages "
+            "JOIN threads USING (thread_id) WHERE thread_id = ? AND owner = ?"
+        )
+        params: list = [thread_id, owner]
+        if before is not None:
+            query += " AND seq < ?"
+            params.append(before)
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connect().execute(query, params).fetchall()
+        return [
+            {"seq": seq, "type": role, "content": content, "timestamp": created_at}
+            for seq, role, content, created_at in reversed(rows)
+        ]
+
+    def count(self, owner: str, thread_id: str) -> int:
+        """Quantidade de mensagens da conversa"""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT message_count FROM threads "
+                    "WHERE thread_id = ? AND owner = ?",
+                    (thread_id, owner),
+                )
+                .fetchone()
+            )
+        return row[0] if row else 0
+
+    def list_threads(self, owner: str, limit: int = 20) -> List[Dict]:
+        """Lista as conversas mais recentes de `owner`"""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT thread_id, title, updated_at, message_count FROM threads "
+                    "WHERE owner = ? ORDER BY updated_at DESC LIMIT ?",
+                    (owner, limit),
+                )
+                .fetchall()
+            )
+        return [
+            {
+                "thread_id": thread_id,
+                "title": title,
+                "updated_at": updated_at,
+                "message_count": message_count,
+            }
+            for thread_id, title, updated_at, message_count in rows
+        ]
+
+    def delete_thread(self, owner: str, thread_id: str) -> None:
+        """Remove uma conversa de `owner` e suas mensagens"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                deleted = connection.execute(
+                    "DELETE FROM threads WHERE thread_id = ? AND owner = ?",
+                    (thread_id, owner),
+                ).rowcount
+                if deleted:
+                    connection.execute(
+                        "DELETE FROM messages WHERE thread_id = ?", (thread_id,)
+                    )
+
+    def _prune(self, connection: sqlite3.Connection, cutoff: float) -> int:
+        """Apaga as conversas sem atividade desde `cutoff` (com o lock)"""
+        connection.execute(
+            "DELETE FROM messages WHERE thread_id IN "
+            "(SELECT thread_id FROM threads WHERE updated_at < ?)",
+            (cutoff,),
+        )
+        return connection.execute(
+            "DELETE FROM threads WHERE updated_at < ?", (cutoff,)
+        ).rowcount
+
+    def _prune_due(self, connection: sqlite3.Connection, now: float) -> None:
+        """Limpeza periódica, na mesma transação da escrita"""
+        monotonic = time.monotonic()
+        if self._pruned_at is None or monotonic - self._pruned_at >= PRUNE_INTERVAL:
+            self._pruned_at = monotonic
+            self._prune(connection, now - self.max_age)
+
+    def prune(self, max_age: Optional[float] = None) -> int:
+        """Apaga as conversas paradas há mais de `max_age` segundos (padrão:
+        o da instância), de todos os donos, e retorna quantas foram apagadas
+        """
+        cutoff = time.time() - (self.max_age if max_age is None else max_age)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                return self._prune(connection, cutoff)
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def trim_messages(
+    messages: List[Dict],
+    max_messages: int = MAX_SESSION_MESSAGES,
+    max_chars: int = MAX_SESSION_CHARS,
+) -> List[Dict]:
+    """Descarta as mensagens mais antigas até respeitar os limites da sessão"""
+    kept: List[Dict] = []
+    total_chars = 0
+    for message in reversed(messages):
+        total_chars += len(message["content"])
+        if kept and (len(kept) >= max_messages or total_chars > max_chars):
+            break
+        kept.append(message)
+    kept.reverse()
+    return kept
+
+
+# Instância global do histórico
+chat_store = ChatHistoryStore()
@@ -0,0 +1,390 @@
+"""Busca e mesclagem de ingredientes duplicados no catálogo
+
+Anos de cadastro manual deixam "Tomate", "tomates", "Tomate " e "Tomatte" como
+ingredientes diferentes. Comparar todos os pares é quadrático; aqui os
+candidatos vêm de blocagem, em O(n log n):
+
+- nomes com a mesma chave normalizada (`resolver_key`: sem acentos,
+  maiúsculas, conectivos e plural) são duplicados certos;
+- vizinhança ordenada: os ingredientes são ordenados pela chave, pela chave
+  invertida (erros no início do nome) e por uma chave fonética, e cada um é
+  comparado só com os `window` seguintes em cada ordem.
+
+Os pares com coeficiente de Dice dos trigramas a partir de `threshold` são
+unidos em grupos (union-find). Cada grupo mantém um ingrediente (o mais usado
+nas receitas, depois o de nome mais curto) e remove os demais.
+
+A API não tem como apontar as receitas para outro ingrediente, então a
+mesclagem só renomeia o mantido (`update_ingredient`) e remove os duplicados
+(`delete_ingredient`). Duplicados usados em receitas ficam de fora do plano, a
+menos que `include_used` seja pedido. `apply_merges` executa o plano em lotes
+concorrentes, ou só o descreve com `dry_run`.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from catalog import normalize_name, recipe_ingredient_names
+from ingredient_resolver import resolver_key, trigrams
+from rate_limiter import BACKGROUND, session_scope
+
+# Nota mínima (Dice dos trigramas) para dois nomes serem duplicados
+THRESHOLD = 0.85
+# Nota mínima quando as partes diferentes dos nomes soam igual ("Sebola")
+PHONETIC_THRESHOLD = 0.6
+# Vizinhos comparados em cada ordenação
+WINDOW = 4
+# Operações por lote e lotes executados ao mesmo tempo na mesclagem
+BATCH_SIZE = 20
+WORKERS = 4
+
+# Regras da chave fonética, aplicadas em ordem sobre a chave normalizada
+PHONETIC_RULES = (
+    (re.compile(r"[^a-z0-9 ]"), ""),
+    (re.compile(r"[cs]h"), "x"),
+    (re.compile(r"lh"), "l"),
+    (re.compile(r"nh"), "n"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"qu|q"), "k"),
+    (re.compile(r"gu(?=[ei])"), "g"),
+    (re.compile(r"sc(?=[ei])|c(?=[ei])|ss|z|ç"), "s"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"y"), "i"),
+    (re.compile(r"h"), ""),
+    # "ão" final é um som próprio: "pimentão" não soa como "pimenta"
+    (re.compile(r"(?:ao|am)\b"), "N"),
+    (re.compile(r"(?<=[a-zN])[aeiou]"), ""),
+    (re.compile(r"([a-z])\1+"), r"\1"),
+)
+
+
+def phonetic_key(key: str) -> str:
+    """Chave fonética simplificada do português (vogais só no início das palavras)"""
+    for pattern, replacement in PHONETIC_RULES:
+        key = pattern.sub(replacement, key)
+    return key
+
+
+def similarity(first: frozenset, second: frozenset) -> float:
+    """Coeficiente de Dice entre dois conjuntos de trigramas"""
+    if not first or not second:
+        return 0.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+class _Names:
+    """Chaves dos nomes e a nota de cada par, com as partes memorizadas
+
+    A nota compara só as palavras que os dois nomes não têm em comum: "Leite
+    fresco" e "Azeite fresco" diferem em "leite"/"azeite" (nota baixa), e
+    "Queijo" e "Queijo minas" não são duplicados (um nome contém o outro).
+    Se as partes diferentes soam igual (`phonetic_key`), basta `phonetic`.
+    """
+
+    def __init__(self, ingredients: Sequence[Dict], threshold: float, phonetic: float):
+        self.threshold = threshold
+        self.phonetic = phonetic
+        self.keys = [resolver_key(str(item.get("name") or "")) for item in ingredients]
+        self.words = [frozenset(key.split()) for key in self.keys]
+        self.numeric = [any(char.isdigit() for char in key) for key in self.keys]
+        self._grams: Dict[str, frozenset] = {}
+        self._sounds: Dict[str, str] = {}
+
+    def sound(self, word: str) -> str:
+        sound = self._sounds.get(word)
+        if sound is None:
+            sound = self._sounds[word] = phonetic_key(word)
+        return sound
+
+    def sort_sound(self, row: int) -> str:
+        return " ".join(self.sound(word) for word in self.keys[row].split())
+
+    def _trigrams(self, words: frozenset) -> frozenset:
+        grams = self._grams
+        if len(words) == 1:
+            (word,) = words
+            found = grams.get(word)
+            if found is None:
+                found = grams[word] = frozenset(trigrams(word))
+            return found
+        return frozenset().union(
+            *(self._trigrams(frozenset((word,))) for word in words)
+        )
+
+    def score(self, row: int, other: int) -> float:
+        """Nota do par, ou 0 se não forem duplicados"""
+        first, second = self.words[row], self.words[other]
+        if first == second:
+            return 1.0
+        only_first, only_second = first - second, second - first
+        if not only_first or not only_second:
+            return 0.0
+        if (self.numeric[row] or self.numeric[other]) and any(
+            word.isdigit() for word in only_first | only_second
+        ):
+            # "Alho picado 12" e "Alho picado 7" são ingredientes diferentes
+            return 0.0
+        left, right = self._trigrams(only_first), self._trigrams(only_second)
+        # Limite da nota pelos tamanhos, antes de comparar os trigramas
+        smaller, larger = sorted((len(left), len(right)))
+        if 2 * smaller < self.phonetic * (smaller + larger):
+            return 0.0
+        score = similarity(left, right)
+        if score >= self.threshold:
+            return score
+        if score >= self.phonetic and {self.sound(word) for word in only_first} == {
+            self.sound(word) for word in only_second
+        }:
+            return score
+        return 0.0
+
+
+@dataclass
+class Cluster:
+    """Grupo de ingredientes duplicados
+
+    `keep` é o ingrediente mantido, com o nome `name` (o dele, por padrão);
+    `score` é a menor nota entre os pares que formaram o grupo.
+    """
+
+    keep: Dict
+    duplicates: List[Dict]
+    score: float
+    name: str = ""
+
+    def __post_init__(self):
+        if not self.name:
+            self.name = self.keep["name"]
+
+    @property
+    def members(self) -> List[Dict]:
+        return [self.keep, *self.duplicates]
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.score = [1.0] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int, score: float) -> None:
+        first, second = self.find(first), self.find(second)
+        if first != second:
+            self.parent[second] = first
+            self.score[first] = min(self.score[first], self.score[second], score)
+        else:
+            self.score[first] = min(self.score[first], score)
+
+
+def recipe_usage(recipes: Optional[Iterable[Dict]]) -> Dict[str, int]:
+    """Receitas que usam cada ingrediente, pelo nome normalizado"""
+    usage: Dict[str, int] = {}
+    for recipe in recipes or []:
+        for name in set(map(normalize_name, recipe_ingredient_names(recipe))):
+            usage[name] = usage.get(name, 0) + 1
+    return usage
+
+
+def find_duplicates(
+    ingredients: Sequence[Dict],
+    usage: Optional[Dict[str, int]] = None,
+    threshold: float = THRESHOLD,
+    window: int = WINDOW,
+    phonetic: float = PHONETIC_THRESHOLD,
+) -> List[Cluster]:
+    """Grupos de ingredientes duplicados, os maiores primeiro
+
+    `usage` (veja `recipe_usage`) decide qual ingrediente de cada grupo é
+    mantido; sem ele, fica o de nome mais curto.
+    """
+    usage = usage or {}
+    names = _Names(ingredients, threshold, phonetic)
+    keys = names.keys
+    groups = _UnionFind(len(ingredients))
+
+    first_with_key: Dict[str, int] = {}
+    for row, key in enumerate(keys):
+        if key:
+            groups.union(first_with_key.setdefault(key, row), row, 1.0)
+
+    # Uma linha por chave; as demais já estão no grupo da primeira
+    rows = list(first_with_key.values())
+    for sort_key in (
+        lambda row: keys[row],
+        lambda row: keys[row][::-1],
+        names.sort_sound,
+    ):
+        ordered = sorted(rows, key=sort_key)
+        for position, row in enumerate(ordered):
+            for other in ordered[position + 1 : position + 1 + window]:
+                score = names.score(row, other)
+                if score:
+                    groups.union(row, other, score)
+
+    members: Dict[int, List[int]] = {}
+    for row in range(len(ingredients)):
+        members.setdefault(groups.find(row), []).append(row)
+
+    clusters = []
+    for root, rows in members.items():
+        if len(rows) < 2:
+            continue
+        ranked = sorted(
+            rows,
+            key=lambda row: (
+                -usage.get(normalize_name(str(ingredients[row].get("name") or "")), 0),
+                len(str(ingredients[row].get("name") or "")),
+                row,
+            ),
+        )
+        clusters.append(
+            Cluster(
+                keep=ingredients[ranked[0]],
+                duplicates=[ingredients[row] for row in ranked[1:]],
+                score=round(groups.score[root], 3),
+            )
+        )
+    clusters.sort(key=lambda cluster: (-len(cluster.duplicates), cluster.score))
+    return clusters
+
+
+@dataclass
+class MergePlan:
+    """Operações da mesclagem: remoções primeiro, depois os renomes"""
+
+    deletes: List[Dict] = field(default_factory=list)
+    renames: List[Tuple[Dict, str]] = field(default_factory=list)
+    # Duplicados usados em receitas, deixados de fora do plano
+    skipped: List[Dict] = field(default_factory=list)
+    # Se os usados em receitas também são removidos (escolha do usuário)
+    include_used: bool = False
+
+    def __len__(self) -> int:
+        return len(self.deletes) + len(self.renames)
+
+
+def plan_merges(
+    clusters: Iterable[Cluster],
+    usage: Optional[Dict[str, int]] = None,
+    include_used: bool = False,
+) -> MergePlan:
+    """Monta as operações dos grupos escolhidos na revisão"""
+    usage = usage or {}
+    plan = MergePlan(include_used=include_used)
+    for cluster in clusters:
+        for duplicate in cluster.duplicates:
+            if include_used or not _used(duplicate, usage):
+                plan.deletes.append(duplicate)
+            else:
+                plan.skipped.append(duplicate)
+        name = " ".join(cluster.name.split())
+        if name and name != cluster.keep["name"]:
+            plan.renames.append((cluster.keep, name))
+    return plan
+
+
+def _used(item: Dict, usage: Dict[str, int]) -> bool:
+    return usage.get(normalize_name(str(item.get("name") or "")), 0) > 0
+
+
+def skip_used(plan: MergePlan, usage: Dict[str, int]) -> MergePlan:
+    """Tira das remoções os duplicados usados em receitas, com o uso atual
+
+    O plano é montado na revisão, com o uso que a página tinha; antes de aplicar
+    ele é conferido de novo com as receitas completas.
+    """
+    if plan.include_used:
+        return plan
+    deletes = [item for item in plan.deletes if not _used(item, usage)]
+    if len(deletes) == len(plan.deletes):
+        return plan
+    skipped = [item for item in plan.deletes if _used(item, usage)]
+    return replace(plan, deletes=deletes, skipped=plan.skipped + skipped)
+
+
+@dataclass
+class MergeReport:
+    """Resultado da mesclagem (ou da simulação, com `dry_run`)"""
+
+    dry_run: bool
+    deleted: List[Dict] = field(default_factory=list)
+    renamed: List[Tuple[Dict, str]] = field(default_factory=list)
+    # (operação, ingrediente, mensagem do erro)
+    errors: List[Tuple[str, Dict, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _batches(items: List, size: int) -> List[List]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+def apply_merges(
+    client,
+    plan: MergePlan,
+    dry_run: bool = True,
+    batch_size: int = BATCH_SIZE,
+    workers: int = WORKERS,
+    session: str = BACKGROUND,
+    progress: Optional[Callable[[int, int], Any]] = None,
+) -> MergeReport:
+    """Executa o plano com o cliente da API, em lotes concorrentes
+
+    As remoções vêm antes dos renomes (o nome escolhido pode ser o de um
+    duplicado). Falhas são registradas no relatório sem interromper os demais
+    lotes. `progress(feitas, total)` é chamado na thread de quem chamou a cada
+    lote concluído; `session` atribui as requisições à sessão do Streamlit no
+    limite de requisições do cliente.
+    """
+    report = MergeReport(dry_run=dry_run)
+    if dry_run:
+        report.deleted = list(plan.deletes)
+        report.renamed = list(plan.renames)
+        return report
+
+    done = 0
+
+    def run_batch(operation: str, batch: List) -> List[Tuple[bool, Any, str]]:
+        results = []
+        with session_scope(session):
+            for item in batch:
+                try:
+                    if operation == "delete":
+                        client.delete_ingredient(item["id"])
+                    else:
+                        client.update_ingredient(item[0]["id"], item[1])
+                    results.append((True, item, ""))
+                except Exception as e:
+                    results.append((False, item, str(e)))
+        return results
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for operation, items in (("delete", plan.deletes), ("rename", plan.renames)):
+            futures = [
+                pool.submit(run_batch, operation, batch)
+                for batch in _batches(items, batch_size)
+            ]
+            for future in as_completed(futures):
+                for succeeded, item, error in future.result():
+                    if not succeeded:
+                        target = item if operation == "delete" else item[0]
+                        report.errors.append((operation, target, error))
+                    elif operation == "delete":
+                        report.deleted.append(item)
+                    else:
+                        report.renamed.append(item)
+                    done += 1
+                if progress is not None:
+                    progress(done, len(plan))
+    return report
@@ -0,0 +1,245 @@
+import hashlib
+import importlib.util
+import io
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import streamlit as st
+
+# O pandas só é importado ao gerar um arquivo: a maioria das execuções das
+# páginas apenas exibe o botão de download
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Formatos de exportação: extensão, tipo MIME e módulo opcional necessário
+EXPORT_FORMATS: Dict[str, Tuple[str, str, Optional[str]]] = {
+    "CSV": ("csv", "text/csv", None),
+    "Parquet": ("parquet", "application/vnd.apache.parquet", "pyarrow"),
+    "Excel": (
+        "xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "openpyxl",
+    ),
+}
+
+CHUNK_SIZE = 10_000
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def available_formats() -> List[str]:
+    """Lista os formatos cujas dependências estão instaladas"""
+    return [
+        name
+        for name, (_, _, module) in EXPORT_FORMATS.items()
+        if module is None or importlib.util.find_spec(module) is not None
+    ]
+
+
+def data_fingerprint(records: Sequence[Dict], chunk_size: int = CHUNK_SIZE) -> str:
+    """Gera um hash dos registros, processando um bloco por vez"""
+    digest = hashlib.sha1()
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start : start + chunk_size]
+        digest.update(json.dumps(chunk, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _columns(records: Sequence[Dict]) -> List[str]:
+    columns: Dict[str, None] = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+
+def _chunks(
+    records: Sequence[Dict], columns: List[str], chunk_size: int
+) -> Iterator["pd.DataFrame"]:
+    """Converte os registros em DataFrames de até chunk_size linhas"""
+    import pandas as pd
+
+    for start in range(0, len(records), chunk_size):
+        df = pd.DataFrame(list(records[start : start + chunk_size]), columns=columns)
+        # Listas e dicionários (ex.: ingredientes da receita) viram JSON
+        for column in df.columns[df.dtypes == object]:
+            df[column] = df[column].map(
+                lambda value: (
+                    json.dumps(value, ensure_ascii=False)
+                    if isinstance(value, (list, dict))
+                    else value
+                )
+            )
+        yield df
+
+
+def _write_csv(chunks: Iterator["pd.DataFrame"], buffer: io.BytesIO) -> None:
+    for number, df in enumerate(chunks):
+        df.to_csv(buffer, index=False, header=number == 0)
+
+
+def _write_parquet(chunks: Iterator["pd.DataFrame"], buffer: io.BytesIO) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    schema = None
+    try:
+        for df in chunks:
+            if writer is None:
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+                # Colunas vazias no primeiro bloco são gravadas como texto
+                for position, field in enumerate(schema):
+                    if pa.types.is_null(field.type):
+                        schema = schema.set(position, pa.field(field.name, pa.string()))
+                writer = pq.ParquetWriter(buffer, schema)
+            writer.write_table(
+                pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_excel(
+    chunks: Iterator["pd.DataFrame"], buffer: io.BytesIO, columns: List[str]
+) -> None:
+    from openpyxl import Workbook
+
+    # Modo write_only grava as linhas em fluxo, sem manter a planilha em memória
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("dados")
+    sheet.append(columns)
+    for df in chunks:
+        for row in df.astype(object).where(df.notna(), None).itertuples(index=False):
+            sheet.append(list(row))
+    workbook.save(buffer)
+
+
+def serialize(
+    records: Sequence[Dict],
+    export_format: str,
+    columns: Optional[List[str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> bytes:
+    """Serializa os registros no formato pedido, escrevendo em blocos"""
+    import pandas as pd
+
+    columns = columns or _columns(records)
+    chunks = _chunks(records, columns, chunk_size)
+    buffer = io.BytesIO()
+
+    if export_format == "CSV":
+        if not records:
+            pd.DataFrame(columns=columns).to_csv(buffer, index=False)
+        _write_csv(chunks, buffer)
+    elif export_format == "Parquet":
+        if not records:
+            chunks = iter([pd.DataFrame(columns=columns)])
+        _write_parquet(chunks, buffer)
+    elif export_format == "Excel":
+        _write_excel(chunks, buffer, columns)
+    else:
+        raise ValueError(f"Formato de exportação não suportado: {export_format}")
+
+    return buffer.getvalue()
+
+
+class ExportCache:
+    """Cache LRU dos arquivos exportados, limitado pelo total de bytes"""
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(
+        self,
+        records: Sequence[Dict],
+        export_format: str,
+        columns: Optional[List[str]] = None,
+    ) -> bytes:
+        """Retorna o arquivo do cache ou serializa os registros"""
+        key = (data_fingerprint(records), export_format, tuple(columns or ()))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        data = serialize(records, export_format, columns)
+
+        with self._lock:
+            if key not in self._entries and len(data) <= self.max_bytes:
+                self._entries[key] = data
+                self.total_bytes += len(data)
+                while self.total_bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.total_bytes -= len(evicted)
+        return data
+
+    def clear(self) -> None:
+        """Esvazia o cache"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+export_cache = ExportCache()
+
+
+def export_widget(
+    records: Sequence[Dict],
+    base_name: str,
+    key: str,
+    columns: Optional[List[str]] = None,
+) -> None:
+    """Exibe a escolha de formato e o botão de download do arquivo
+
+    O arquivo vem do cache e é guardado no session_state junto com os registros
+    de origem: enquanto eles e o formato não mudarem, as execuções seguintes da
+    página reaproveitam os bytes sem serializar nem calcular o hash de novo.
+    """
+    col_format, col_button = st.columns([1, 2])
+
+    with col_format:
+        export_format = st.selectbox(
+            "Formato", available_formats(), key=f"{key}_format"
+        )
+
+    extension, mime, _ = EXPORT_FORMATS[export_format]
+    file_key = f"{key}_file"
+    prepared = st.session_state.get(file_key)
+    # `is` evita comparar listas grandes quando os dados são os mesmos
+    if (
+        prepared is None
+        or prepared[1] != export_format
+        or not (prepared[0] is records or prepared[0] == records)
+    ):
+        prepared = st.session_state[file_key] = (
+            records,
+            export_format,
+            f"{base_name}_{datetime.now().strftime('%Y%m%d_%H%M')}.{extension}",
+            export_cache.get_or_create(records, export_format, columns),
+        )
+    _, _, file_name, data = prepared
+
+    with col_button:
+        st.download_button(
+            label=f"📄 Baixar {export_format}",
+            data=data,
+            file_name=file_name,
+            mime=mime,
+            key=f"{key}_download",
+            # Baixar não muda nada na página
+            on_click="ignore",
+        )
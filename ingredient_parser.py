@@ -0,0 +1,414 @@
+"""Leitura das linhas de ingredientes das receitas ("1/2 xícara de açúcar")
+
+O formulário de receitas separava cada linha por espaços e tomava a primeira
+palavra como quantidade e a segunda como unidade, o que falhava com frações,
+vírgula decimal, unidades de várias palavras e linhas como "sal a gosto". Aqui
+cada linha é lida por uma única expressão regular compilada:
+
+    [marcador] [quantidade] [unidade [de|do|da|dos|das]] nome [a gosto]
+
+- quantidade: "2", "1,5", "1.5", "1.000" (mil), "1/2", "1 1/2", "1 e 1/2",
+  "½", "1½" ou "um", "uma", "dois", "duas", "três", "meio", "meia";
+- unidade: sinônimos em português, sem diferenciar maiúsculas e acentos
+  ("colheres de sopa", "c. sopa", "gr", "xíc."), convertidos para a forma
+  canônica de `UNITS`;
+- "a gosto", "q.b." e "quanto baste" no fim viram a unidade "a gosto".
+
+`parse_lines` lê um lote inteiro (o formulário ou um arquivo importado) e
+retorna os ingredientes e os erros de cada linha, sem interromper a leitura.
+`parse_recipe_file` lê o arquivo de importação em lote (decodificado por
+`decode_file`), com várias receitas:
+
+    # Bolo de Cenoura
+    3 cenouras médias
+    2 xícaras de farinha de trigo
+    > Bata tudo no liquidificador e asse por 40 minutos.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from catalog import normalize_name
+
+# Forma canônica -> sinônimos aceitos (sem acentos; a leitura ignora acentos)
+UNITS: Dict[str, Tuple[str, ...]] = {
+    "g": ("g", "gr", "grs", "grama", "gramas"),
+    "kg": (
+        "kg",
+        "kgs",
+        "quilo",
+        "quilos",
+        "kilo",
+        "kilos",
+        "quilograma",
+        "quilogramas",
+    ),
+    "mg": ("mg", "miligrama", "miligramas"),
+    "ml": ("ml", "mililitro", "mililitros"),
+    "l": ("l", "lt", "lts", "litro", "litros"),
+    "xícara": (
+        "xicara de cha",
+        "xicaras de cha",
+        "xicara (cha)",
+        "xicaras (cha)",
+        "xicara",
+        "xicaras",
+        "xic",
+        "xics",
+    ),
+    "colher de sopa": (
+        "colher de sopa",
+        "colheres de sopa",
+        "colher (sopa)",
+        "colheres (sopa)",
+        "colher sopa",
+        "colheres sopa",
+        "c. sopa",
+        "c. de sopa",
+        "cs",
+        "csp",
+    ),
+    "colher de chá": (
+        "colher de cha",
+        "colheres de cha",
+        "colher (cha)",
+        "colheres (cha)",
+        "colher cha",
+        "colheres cha",
+        "c. cha",
+        "c. de cha",
+        "cc",
+        "cch",
+    ),
+    "colher de café": ("colher de cafe", "colheres de cafe", "c. cafe"),
+    "colher": ("colher", "colheres", "colh"),
+    "copo": ("copo", "copos", "copo americano", "copos americanos"),
+    "unidade": ("unidade", "unidades", "un", "und", "unid"),
+    "dente": ("dente", "dentes"),
+    "fatia": ("fatia", "fatias"),
+    "pitada": ("pitada", "pitadas"),
+    "lata": ("lata", "latas"),
+    "pacote": ("pacote", "pacotes", "pct"),
+    "caixa": ("caixa", "caixas", "cx"),
+    "maço": ("maco", "macos"),
+    "pedaço": ("pedaco", "pedacos"),
+    "folha": ("folha", "folhas"),
+    "ramo": ("ramo", "ramos"),
+    "punhado": ("punhado", "punhados"),
+    "dúzia": ("duzia", "duzias", "dz"),
+    "dezena": ("dezena", "dezenas"),
+    "cabeça": ("cabeca", "cabecas"),
+    "talo": ("talo", "talos"),
+    "cubo": ("cubo", "cubos"),
+    "tablete": ("tablete", "tabletes"),
+    "envelope": ("envelope", "envelopes"),
+    "sachê": ("sache", "saches"),
+    "pote": ("pote", "potes"),
+    "vidro": ("vidro", "vidros"),
+    "garrafa": ("garrafa", "garrafas"),
+    "bandeja": ("bandeja", "bandejas"),
+}
+TO_TASTE = "a gosto"
+
+NUMBER_WORDS = {
+    "um": 1.0,
+    "uma": 1.0,
+    "dois": 2.0,
+    "duas": 2.0,
+    "tres": 3.0,
+    "meio": 0.5,
+    "meia": 0.5,
+}
+VULGAR_FRACTIONS = {
+    "½": 0.5,
+    "⅓": 1 / 3,
+    "⅔": 2 / 3,
+    "¼": 0.25,
+    "¾": 0.75,
+    "⅕": 0.2,
+    "⅛": 0.125,
+}
+
+# Leituras de quantidades e unidades memorizadas (os textos se repetem muito)
+CACHE_SIZE = 4096
+
+_SYNONYMS = {
+    normalize_name(synonym): unit
+    for unit, synonyms in UNITS.items()
+    for synonym in synonyms
+}
+_ACCENTS = {"a": "aáàâã", "e": "eéê", "i": "ií", "o": "oóôõ", "u": "uúü", "c": "cç"}
+
+
+def _pattern(text: str) -> str:
+    """Trecho da expressão regular que aceita `text` com ou sem acentos"""
+    parts = []
+    for char in text:
+        if char in _ACCENTS:
+            parts.append(f"[{_ACCENTS[char]}]")
+        elif char == " ":
+            parts.append(r"\s+")
+        elif char == ".":
+            parts.append(r"\.\s*")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def _alternatives(words: Iterable[str]) -> str:
+    """Alternativas agrupadas por prefixo comum (uma árvore de prefixos)
+
+    Com ~100 sinônimos, "g|gr|grama|..." faria o regex testar cada alternativa
+    em toda linha; agrupadas como "g(?:r(?:ama)?)?", cada caractere é
+    comparado uma vez. Palavras mais longas têm precedência ("colher de sopa"
+    antes de "colher"), e o regex volta para a mais curta se necessário.
+    """
+    root: Dict[str, Dict] = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Dict]) -> str:
+        branches = [_pattern(char) + emit(node[char]) for char in sorted(node) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(root)
+
+
+_FRACTIONS = "".join(VULGAR_FRACTIONS)
+# "1.000" é mil: ponto seguido de grupos de três dígitos (e vírgula decimal)
+_THOUSANDS = r"[1-9]\d{0,2}(?:\.\d{3})+(?:,\d+)?(?![.\d])"
+_NUMBER = r"\d+(?:[.,]\d+)?"
+LINE = re.compile(
+    rf"""
+    \s*(?:[-*•·]\s*)?
+    (?:
+        (?P<quantity>
+            \d+\s+(?:e\s+)?\d+\s*/\s*\d+
+          | \d+\s*/\s*\d+
+          | \d*\s*[{_FRACTIONS}]
+          | {_THOUSANDS}
+          | {_NUMBER}
+          | (?:{_alternatives(NUMBER_WORDS)})(?=\s)
+        )\s*
+    )?
+    (?:
+        (?P<unit>{_alternatives(_SYNONYMS)})\.?
+        (?=\s|$)\s*
+        (?:d[aeo]s?\s+)?
+    )?
+    (?P<name>[^\W\d_].*)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+FRACTION = re.compile(r"(?:(\d+)\s+(?:e\s+)?)?(\d+)\s*/\s*(\d+)")
+THOUSANDS = re.compile(_THOUSANDS)
+# "a gosto" no fim do nome; só é procurado quando o nome termina como um deles
+TO_TASTE_SUFFIX = re.compile(
+    r"(?:\s*,\s*|\s+)(?:a\s+gosto|q\.?\s*b|quanto\s+baste)$", re.IGNORECASE
+)
+_TO_TASTE_ENDINGS = ("gosto", "baste", "q.b", "qb", "q. b")
+_TO_TASTE_LAST = "oObBeE"
+_TRAILING = " \t\r\n.;"
+
+
+class IngredientParseError(ValueError):
+    """Linha de ingrediente que não pôde ser lida"""
+
+
+@dataclass(slots=True)
+class ParsedIngredient:
+    """Ingrediente lido de uma linha (quantidade e unidade são opcionais)"""
+
+    name: str
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    line: int = 0
+
+    def to_api(self) -> Dict:
+        """Formato esperado pela API em `create_recipe`"""
+        return {
+            "ingredient_name": self.name,
+            "quantity": None if self.quantity is None else f"{self.quantity:g}",
+            "unit": self.unit,
+        }
+
+
+@dataclass
+class LineError:
+    """Erro de leitura de uma linha (numerada a partir de 1)"""
+
+    line: int
+    text: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"Linha {self.line}: {self.message} ({self.text.strip()!r})"
+
+
+@dataclass
+class ParseResult:
+    """Ingredientes lidos de um lote de linhas e os erros encontrados"""
+
+    items: List[ParsedIngredient] = field(default_factory=list)
+    errors: List[LineError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def to_api(self) -> List[Dict]:
+        return [item.to_api() for item in self.items]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_quantity(text: str) -> float:
+    """Valor de uma quantidade: "2", "1,5", "1/2", "1 1/2", "1 e 1/2", "½", "meia"..."""
+    text = text.strip()
+    if text[-1] in VULGAR_FRACTIONS:
+        whole = text[:-1].strip()
+        return (float(whole) if whole else 0.0) + VULGAR_FRACTIONS[text[-1]]
+    fraction = FRACTION.fullmatch(text)
+    if fraction is not None:
+        whole, numerator, denominator = fraction.groups()
+        if int(denominator) == 0:
+            raise IngredientParseError("fração com denominador zero")
+        return int(whole or 0) + int(numerator) / int(denominator)
+    word = normalize_name(text)
+    if word in NUMBER_WORDS:
+        return NUMBER_WORDS[word]
+    if THOUSANDS.fullmatch(text) is not None:
+        text = text.replace(".", "")
+    return float(text.replace(",", "."))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_unit(text: str) -> Optional[str]:
+    """Forma canônica de uma unidade ("Colheres de Sopa" -> "colher de sopa")"""
+    return _SYNONYMS.get(normalize_name(text.replace(".", ". ")))
+
+
+def parse_line(text: str, line: int = 0) -> ParsedIngredient:
+    """Lê uma linha de ingrediente; levanta IngredientParseError se inválida"""
+    match = LINE.match(text)
+    if match is None:
+        if not text.strip():
+            raise IngredientParseError("linha vazia")
+        raise IngredientParseError("nome do ingrediente ausente")
+    quantity, unit, name = match.group("quantity", "unit", "name")
+    if name[-1] in _TRAILING:
+        name = name.rstrip(_TRAILING)
+    taste = None
+    if name[-1] in _TO_TASTE_LAST and name[-5:].lower().endswith(_TO_TASTE_ENDINGS):
+        taste = TO_TASTE_SUFFIX.search(name)
+        if taste is not None:
+            name = name[: taste.start()]
+    if "  " in name or "\t" in name:
+        name = " ".join(name.split())
+    if unit is None and quantity is not None and canonical_unit(name):
+        # "200 g": a unidade foi lida como nome
+        raise IngredientParseError("nome do ingrediente ausente")
+
+    value = None
+    if quantity is not None:
+        value = parse_quantity(quantity)
+        if value <= 0:
+            raise IngredientParseError("a quantidade deve ser maior que zero")
+    if unit is not None:
+        unit = canonical_unit(unit)
+    elif taste is not None:
+        unit = TO_TASTE
+    return ParsedIngredient(name, value, unit, line)
+
+
+def parse_lines(lines: Iterable[str], start: int = 1) -> ParseResult:
+    """Lê um lote de linhas; linhas em branco são ignoradas
+
+    Cada linha inválida vira um `LineError` com o número da linha (a partir de
+    `start`), e a leitura continua nas seguintes.
+    """
+    return _parse_numbered(enumerate(lines, start))
+
+
+def _parse_numbered(lines: Iterable[Tuple[int, str]]) -> ParseResult:
+    result = ParseResult()
+    items = result.items
+    errors = result.errors
+    for number, text in lines:
+        if not text or text.isspace():
+            continue
+        try:
+            items.append(parse_line(text, number))
+        except IngredientParseError as e:
+            errors.append(LineError(number, text, str(e)))
+    return result
+
+
+def parse_text(text: str) -> ParseResult:
+    """Lê o texto do formulário ou de um arquivo, uma linha por ingrediente"""
+    return parse_lines((text or "").splitlines())
+
+
+def decode_file(data: bytes) -> str:
+    """Texto de um arquivo enviado: UTF-8 (com ou sem BOM) ou, se não for,
+    Windows-1252/Latin-1, comuns em arquivos em português salvos no Windows
+    """
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        pass
+    try:
+        return data.decode("cp1252")
+    except UnicodeDecodeError:
+        # Latin-1 aceita qualquer byte
+        return data.decode("latin-1")
+
+
+def parse_recipe_file(text: str) -> Tuple[List[Dict], List[LineError]]:
+    """Lê o arquivo de importação em lote (veja o início do módulo)
+
+    Retorna as receitas no formato de `create_recipes_bulk` e os erros das
+    linhas; receitas com algum ingrediente inválido ficam de fora.
+    """
+    errors: List[LineError] = []
+    # (nome, linhas de ingredientes numeradas, instruções); nome None: ignorada
+    blocks: List[Tuple[Optional[str], List[Tuple[int, str]], List[str]]] = []
+    for number, line in enumerate((text or "").splitlines(), 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("#"):
+            title = stripped.lstrip("#").strip()
+            if not title:
+                errors.append(LineError(number, line, "nome da receita ausente"))
+            blocks.append((title or None, [], []))
+        elif not blocks:
+            errors.append(
+                LineError(number, line, "linha fora de uma receita (use '# Nome')")
+            )
+        elif stripped.startswith(">"):
+            blocks[-1][2].append(stripped[1:].strip())
+        else:
+            blocks[-1][1].append((number, line))
+
+    recipes: List[Dict] = []
+    for name, lines, instructions in blocks:
+        parsed = _parse_numbered(lines)
+        errors.extend(parsed.errors)
+        if name is not None and parsed.ok:
+            recipes.append(
+                {
+                    "name": name,
+                    "instructions": "\n".join(instructions),
+                    "ingredients": parsed.to_api(),
+                }
+            )
+    errors.sort(key=lambda error: error.line)
+    return recipes, errors
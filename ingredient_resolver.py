@@ -0,0 +1,358 @@
+"""Associação dos nomes de ingredientes digitados aos ingredientes do catálogo
+
+As receitas enviavam `ingredient_name` como digitado, e "Tomate", "tomates" e
+"tomate italiano" viravam ingredientes diferentes na API. O `IngredientResolver`
+é montado uma vez a partir do catálogo (derivado da sessão, como o NameIndex) e
+compara cada nome em duas etapas:
+
+1. chave normalizada: sem acentos e maiúsculas, sem "de/do/da..." e com cada
+   palavra no singular ("Farinhas de Trigo" e "farinha trigo" são iguais);
+2. semelhança aproximada: coeficiente de Dice entre os trigramas de
+   caracteres das chaves, calculado só para os ingredientes que têm algum dos
+   trigramas mais raros do nome (índice invertido em arrays NumPy; veja
+   `IngredientResolver._similar`).
+
+Com nota a partir de `AUTO_MAP` o nome é trocado pelo do catálogo; a partir de
+`SUGGEST` o ingrediente do catálogo é apenas sugerido. Os números do nome não
+entram na semelhança, mas precisam coincidir para a troca automática: "Alho
+picado 9" só é sugerido para "Alho picado 7". Para a troca, as palavras também
+precisam estar na mesma ordem e as que diferem precisam ser parecidas entre si
+(como em `dedup`): "Leite de creme" e "Manteiga com sal" só sugerem "Creme de
+leite" e "Manteiga sem sal".
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from catalog import normalize_name
+
+# Notas mínimas (0 a 1) para trocar o nome automaticamente e para sugerir
+AUTO_MAP = 0.85
+SUGGEST = 0.5
+# Sugestões retornadas por nome
+CANDIDATES = 3
+
+# "com" e "sem" ficam na chave: "Manteiga com sal" não é "Manteiga sem sal"
+STOPWORDS = frozenset({"de", "do", "da", "dos", "das", "e"})
+# Plurais em português (sem acentos) -> singular, testados nesta ordem
+PLURALS = (
+    ("oes", "ao"),
+    ("aes", "ao"),
+    ("ais", "al"),
+    ("eis", "el"),
+    ("ois", "ol"),
+    ("uis", "ul"),
+    ("res", "r"),
+    ("zes", "z"),
+    ("ses", "s"),
+    ("ns", "m"),
+)
+_DIGIT = re.compile(r"\d")
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3 or not word.endswith("s"):
+        return word
+    for suffix, replacement in PLURALS:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            return word[: -len(suffix)] + replacement
+    return word if word.endswith("ss") else word[:-1]
+
+
+@lru_cache(maxsize=65536)
+def _word_key(word: str) -> str:
+    # As palavras se repetem muito entre os nomes do catálogo
+    word = normalize_name(word)
+    return "" if word in STOPWORDS else _singular(word)
+
+
+def resolver_key(name: str) -> str:
+    """Chave de comparação: normalizada, sem conectivos e no singular"""
+    return " ".join(filter(None, map(_word_key, name.replace("-", " ").split())))
+
+
+def key_numbers(key: str) -> Tuple[str, ...]:
+    """Palavras da chave que são só números, em ordem"""
+    if _DIGIT.search(key) is None:
+        return ()
+    return tuple(sorted(word for word in key.split() if word.isdigit()))
+
+
+def fuzzy_key(key: str) -> str:
+    """Chave da comparação aproximada: sem as palavras que são só números
+
+    "Alho picado 12" e "Alho picado 7" têm a mesma chave aproximada; números não
+    dizem nada sobre a semelhança entre nomes e multiplicariam o índice.
+    """
+    if _DIGIT.search(key) is None:
+        return key
+    return " ".join(word for word in key.split() if not word.isdigit())
+
+
+@lru_cache(maxsize=65536)
+def _word_trigrams(word: str) -> Tuple[str, ...]:
+    padded = f" {word} "
+    return tuple(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(key: str) -> List[str]:
+    """Trigramas distintos de cada palavra da chave, com espaços nas bordas"""
+    grams: Dict[str, None] = {}
+    for word in key.split():
+        grams.update(dict.fromkeys(_word_trigrams(word)))
+    return list(grams)
+
+
+@dataclass
+class Resolution:
+    """Resultado da busca de um nome no catálogo
+
+    `candidates` traz os ingredientes mais parecidos com a nota de cada um, do
+    mais parecido para o menos; `match` é o melhor deles se a nota atingir o
+    limite da troca automática.
+    """
+
+    query: str
+    candidates: List[Tuple[Dict, float]] = field(default_factory=list)
+    auto_map: float = AUTO_MAP
+    suggest: float = SUGGEST
+
+    @property
+    def score(self) -> float:
+        return self.candidates[0][1] if self.candidates else 0.0
+
+    @property
+    def match(self) -> Optional[Dict]:
+        if self.candidates and self.score >= self.auto_map:
+            return self.candidates[0][0]
+        return None
+
+    @property
+    def suggestion(self) -> Optional[Dict]:
+        """Ingrediente parecido, mas abaixo do limite da troca automática"""
+        if self.candidates and self.suggest <= self.score < self.auto_map:
+            return self.candidates[0][0]
+        return None
+
+    @property
+    def name(self) -> str:
+        """Nome a enviar à API: o do catálogo se houve troca, senão o digitado"""
+        match = self.match
+        return match["name"] if match is not None else self.query
+
+
+class IngredientResolver:
+    """Índice dos ingredientes do catálogo para associar nomes digitados
+
+    Ingredientes com a mesma chave aproximada formam um grupo, representado
+    pelo de nome mais curto; o índice invertido (trigrama -> grupos, em ordem)
+    fica em arrays NumPy no formato CSR. Grupos com nomes numerados ("Alho
+    picado 7", "Alho picado 12") guardam também o ingrediente de cada
+    combinação de números.
+    """
+
+    def __init__(
+        self,
+        ingredients: Sequence[Dict],
+        auto_map: float = AUTO_MAP,
+        suggest: float = SUGGEST,
+    ):
+        self.ingredients = ingredients
+        self.auto_map = auto_map
+        self.suggest = suggest
+        self._exact: Dict[str, int] = {}
+        self._vocabulary: Dict[str, int] = {}
+        # Linha do ingrediente que representa cada grupo
+        self._groups: List[int] = []
+        # Grupos com nomes numerados: números -> linha do ingrediente
+        self._variants: Dict[int, Dict[Tuple[str, ...], int]] = {}
+        # Teto da nota quando os números não coincidem: fica como sugestão
+        self._number_cap = (suggest + auto_map) / 2
+
+        groups: Dict[str, int] = {}
+        group_grams: List[List[int]] = []
+        vocabulary = self._vocabulary
+        for row, ingredient in enumerate(ingredients):
+            name = str(ingredient.get("name") or "")
+            key = resolver_key(name)
+            self._exact.setdefault(key, row)
+            fuzzy = fuzzy_key(key)
+            group = groups.get(fuzzy)
+            if group is None:
+                group = groups[fuzzy] = len(self._groups)
+                self._groups.append(row)
+                group_grams.append(
+                    [
+                        vocabulary.setdefault(gram, len(vocabulary))
+                        for gram in trigrams(fuzzy)
+                    ]
+                )
+            else:
+                representative = self._groups[group]
+                if fuzzy != key and group not in self._variants:
+                    # Até aqui o grupo só tinha nomes sem números
+                    self._variants[group] = {(): representative}
+                if len(name) < len(str(ingredients[representative].get("name") or "")):
+                    self._groups[group] = row
+            if fuzzy != key or group in self._variants:
+                self._variants.setdefault(group, {}).setdefault(key_numbers(key), row)
+
+        # Grupos com o trigrama t: postings[offsets[t]:offsets[t + 1]], em ordem
+        sizes = [len(grams) for grams in group_grams]
+        gram_array = np.fromiter(
+            (gram for grams in group_grams for gram in grams),
+            dtype=np.int64,
+            count=sum(sizes),
+        )
+        group_array = np.repeat(np.arange(len(sizes), dtype=np.int32), sizes)
+        order = np.argsort(gram_array, kind="stable")
+        self._postings = group_array[order]
+        self._offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(gram_array, minlength=len(vocabulary)), out=self._offsets[1:]
+        )
+        self._sizes = np.asarray(sizes, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.ingredients)
+
+    def resolve(self, name: str, limit: int = CANDIDATES) -> Resolution:
+        """Ingredientes do catálogo mais parecidos com `name`"""
+        resolution = Resolution(name, auto_map=self.auto_map, suggest=self.suggest)
+        key = resolver_key(name)
+        if not key:
+            return resolution
+        exact = self._exact.get(key)
+        if exact is not None:
+            resolution.candidates.append((self.ingredients[exact], 1.0))
+            if limit <= 1:
+                return resolution
+
+        groups, scores = self._similar(trigrams(fuzzy_key(key)) or trigrams(key))
+        order = np.argsort(-scores, kind="stable")
+        numbers = key_numbers(key)
+        needed = limit - len(resolution.candidates)
+        # (nota, linha), da maior nota para a menor
+        found: List[Tuple[float, int]] = []
+        for i in order if needed > 0 else ():
+            score = float(scores[i])
+            # O teto só diminui as notas: as seguintes não entram mais
+            if len(found) >= needed and score <= found[needed - 1][0]:
+                break
+            row, matched = self._variant(int(groups[i]), numbers)
+            if row == exact:
+                continue
+            if not matched or (
+                score >= self.auto_map and not self._same_words(key, row)
+            ):
+                score = min(score, self._number_cap)
+            found.append((score, row))
+            found.sort(key=lambda item: -item[0])
+        for score, row in found[:needed]:
+            resolution.candidates.append((self.ingredients[row], round(score, 3)))
+        return resolution
+
+    def _same_words(self, key: str, row: int) -> bool:
+        """Se a chave e a do ingrediente têm as mesmas palavras, ou parecidas
+
+        A ordem conta e as palavras que só aparecem de um lado precisam ter
+        trigramas em comum (erros de digitação), não ser palavras diferentes.
+        """
+        words = fuzzy_key(key).split()
+        name = str(self.ingredients[row].get("name") or "")
+        other = fuzzy_key(resolver_key(name)).split()
+        if words == other:
+            return True
+        only, only_other = set(words) - set(other), set(other) - set(words)
+        if not only or not only_other:
+            # Mesmas palavras em outra ordem, ou palavras a mais de um lado
+            return False
+        grams = set(trigrams(" ".join(sorted(only))))
+        other_grams = set(trigrams(" ".join(sorted(only_other))))
+        shared = len(grams & other_grams)
+        return 2 * shared / (len(grams) + len(other_grams)) >= self.suggest
+
+    def _variant(self, group: int, numbers: Tuple[str, ...]) -> Tuple[int, bool]:
+        """Ingrediente do grupo com os números do nome, ou o representante
+
+        Retorna também se os números coincidem.
+        """
+        variants = self._variants.get(group)
+        if variants is None:
+            return self._groups[group], not numbers
+        row = variants.get(numbers)
+        if row is None:
+            return self._groups[group], False
+        return row, True
+
+    def _similar(self, query: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Grupos com coeficiente de Dice a partir de `suggest`, e as notas
+
+        Para atingir a nota mínima, um grupo precisa ter ao menos `needed`
+        trigramas da busca; logo, tem algum dos `len(query) - needed + 1`
+        trigramas mais raros. Só as listas desses são percorridas; os trigramas
+        frequentes são conferidos por busca binária nos candidatos.
+        """
+        empty = (np.empty(0, dtype=np.int32), np.empty(0))
+        size = len(query)
+        needed = max(1, math.ceil(self.suggest * size / (2 - self.suggest) - 1e-9))
+        offsets = self._offsets
+        known = sorted(
+            (int(offsets[i + 1] - offsets[i]), i)
+            for i in (self._vocabulary.get(gram) for gram in query)
+            if i is not None
+        )
+        rare = len(known) - needed + 1
+        if rare <= 0:
+            return empty
+        postings = self._postings
+        candidates = np.concatenate(
+            [postings[offsets[i] : offsets[i + 1]] for _, i in known[:rare]]
+        )
+        groups, shared = np.unique(candidates, return_counts=True)
+        for _, i in known[rare:]:
+            posting = postings[offsets[i] : offsets[i + 1]]
+            found = np.searchsorted(posting, groups)
+            found[found == len(posting)] = 0
+            shared += posting[found] == groups
+
+        scores = 2.0 * shared / (size + self._sizes[groups])
+        keep = scores >= self.suggest
+        return groups[keep], scores[keep]
+
+    def resolve_many(
+        self, names: Iterable[str], limit: int = CANDIDATES
+    ) -> List[Resolution]:
+        """Resolve um lote de nomes (importação), buscando cada chave uma vez"""
+        results: Dict[str, Resolution] = {}
+        resolutions = []
+        for name in names:
+            key = resolver_key(name)
+            cached = results.get(key)
+            if cached is None:
+                cached = results[key] = self.resolve(name, limit)
+            elif cached.query != name:
+                cached = Resolution(
+                    name, cached.candidates, self.auto_map, self.suggest
+                )
+            resolutions.append(cached)
+        return resolutions
+
+
+def apply_resolutions(
+    ingredients: List[Dict], resolutions: Iterable[Resolution]
+) -> List[Dict]:
+    """Troca `ingredient_name` pelo nome do catálogo quando houve troca automática
+
+    Recebe os ingredientes no formato da API (veja `ParsedIngredient.to_api`) e
+    as resoluções na mesma ordem; retorna novos dicionários.
+    """
+    return [
+        {**ingredient, "ingredient_name": resolution.name}
+        for ingredient, resolution in zip(ingredients, resolutions)
+    ]
@@ -0,0 +1,439 @@
+"""Teste de carga com várias sessões simultâneas percorrendo as páginas reais
+
+Uso:
+    python load_harness.py --sessions 1 2 4 8 --recipes 2000 --latency 0.02
+    python load_harness.py --sessions 4 --api-url http://127.0.0.1:8000
+
+Cada sessão é um AppTest que abre o app.py e navega pelas páginas buscando,
+adicionando ingredientes, planejando refeições, gerando a lista de compras e
+conversando com o assistente. Sem --api-url, uma API simulada local é usada.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from streamlit.runtime import Runtime
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test as app_test_module
+from streamlit.testing.v1 import local_script_runner
+from streamlit.testing.v1.util import patch_config_options
+
+import api_client as api_client_module
+from api_client import MenuMVPAPIClient
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGES = {
+    "ingredients": "pages/1_ingredients.py",
+    "recipes": "pages/2_recipes.py",
+    "planning": "pages/3_planning.py",
+    "chat": "pages/4_chat_ai.py",
+}
+SEARCH_TERMS = ["tomate", "bolo", "frango", "sopa", "queijo", "arroz"]
+CHAT_PROMPTS = [
+    "Sugira uma receita com frango",
+    "O que faço com tomate e queijo?",
+    "Monte um jantar leve",
+]
+RUN_TIMEOUT = 60
+CHAT_TIMEOUT = 30
+
+
+class ApiCallCounter:
+    """Conta as chamadas feitas pelo MenuMVPAPIClient enquanto está instalado"""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._original: Optional[Callable] = None
+
+    def install(self) -> None:
+        original = MenuMVPAPIClient._make_request
+        counter = self
+
+        def counted(self, method, endpoint, data=None):
+            route = "/" + endpoint.strip("/").split("/")[0]
+            with counter._lock:
+                counter.calls[f"{method.upper()} {route}"] += 1
+            return original(self, method, endpoint, data)
+
+        self._original = original
+        setattr(MenuMVPAPIClient, "_make_request", counted)
+
+    def uninstall(self) -> None:
+        if self._original is not None:
+            setattr(MenuMVPAPIClient, "_make_request", self._original)
+            self._original = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+
+def current_rss() -> int:
+    """Memória residente do processo, em bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Sem /proc (macOS): usa o pico informado pelo getrusage
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class RssSampler:
+    """Amostra a memória residente em segundo plano e guarda o pico"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+
+@contextmanager
+def shared_runtime():
+    """Permite vários AppTest simultâneos no mesmo processo
+
+    Cada AppTest.run instala um Runtime simulado global e o remove ao terminar,
+    o que quebra as outras sessões ainda em execução. Enquanto o contexto está
+    ativo, o último Runtime instalado continua valendo para todas elas. O
+    AppTest também zera a detecção da pasta pages/ a cada run, fazendo outra
+    sessão executar o app.py no lugar da página; a detecção passa a ser feita
+    uma única vez. Por fim, o bytecode das páginas é compartilhado, como no
+    servidor real, em vez de recompilado a cada run (o que além de lento esbarra
+    em um bug de concorrência do ast.parse no Python 3.11). Pelo mesmo motivo a
+    opção global.appTest, que cada run liga e desliga, fica ligada o tempo todo.
+    """
+    original_instance = Runtime.__dict__["instance"]
+    original_exists = Runtime.__dict__["exists"]
+    original_pages_directory = PagesManager.uses_pages_directory
+    app_test_module.PagesManager = type(
+        "PagesManager", (PagesManager,), {"uses_pages_directory": None}
+    )
+    PagesManager.uses_pages_directory = None
+    script_cache = ScriptCache()
+    for script in ["app.py", *PAGES.values()]:
+        script_cache.get_bytecode(os.path.join(ROOT, script))
+    app_test_module.ScriptCache = lambda: script_cache
+    local_script_runner.ScriptCache = lambda: script_cache
+    last: Dict[str, object] = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+        if "runtime" not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last["runtime"]
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in last
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    setattr(app_test_module, "patch_config_options", lambda overrides: nullcontext())
+    try:
+        with patch_config_options({"global.appTest": True}):
+            yield
+    finally:
+        app_test_module.patch_config_options = patch_config_options
+        Runtime.instance = original_instance
+        Runtime.exists = original_exists
+        app_test_module.PagesManager = PagesManager
+        # As páginas gravam a detecção na classe base; sem restaurar, o próximo
+        # AppTest do processo roda o script como app de várias páginas
+        PagesManager.uses_pages_directory = original_pages_directory
+        app_test_module.ScriptCache = ScriptCache
+        local_script_runner.ScriptCache = ScriptCache
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por interpolação linear"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _widget(widgets, label: str):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"Widget '{label}' não encontrado")
+
+
+class SimulatedSession:
+    """Um usuário percorrendo o app; cada rerun é cronometrado"""
+
+    def __init__(self, session_id: int, seed: int = 0):
+        self.session_id = session_id
+        self.random = random.Random(seed * 1000 + session_id)
+        self.timings: List[Tuple[str, float]] = []
+        self.errors: List[str] = []
+        self.at = AppTest.from_file(
+            os.path.join(ROOT, "app.py"), default_timeout=RUN_TIMEOUT
+        )
+
+    def _timed(self, step: str, action: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        try:
+            action()
+        except Exception as e:
+            self.errors.append(f"{step}: {e}")
+            return
+        finally:
+            self.timings.append((step, time.perf_counter() - started))
+        self.errors.extend(f"{step}: {item.value}" for item in self.at.exception)
+
+    def _open(self, page: str) -> None:
+        self._timed(f"{page}.open", lambda: self.at.switch_page(PAGES[page]).run())
+
+    def landing(self) -> None:
+        self._timed("app.open", self.at.run)
+
+    def ingredients(self) -> None:
+        at = self.at
+        self._open("ingredients")
+        term = self.random.choice(SEARCH_TERMS)
+        self._timed(
+            "ingredients.search",
+            lambda: _widget(at.text_input, "🔍 Buscar ingrediente").input(term).run(),
+        )
+        name = f"Ingrediente carga {self.session_id}-{self.random.randrange(10**9)}"
+
+        def add():
+            _widget(at.text_input, "Nome do ingrediente").input(name)
+            _widget(at.button, "Adicionar Ingrediente").click().run()
+
+        self._timed("ingredients.add", add)
+
+    def recipes(self) -> None:
+        self._open("recipes")
+        term = self.random.choice(SEARCH_TERMS)
+        self._timed(
+            "recipes.search",
+            lambda: _widget(self.at.text_input, "🔍 Buscar receita").input(term).run(),
+        )
+
+    def planning(self) -> None:
+        at = self.at
+        self._open("planning")
+
+        def plan():
+            recipe = _widget(at.selectbox, "Selecionar Receita")
+            options = [option for option in recipe.options if option != "Nenhuma"]
+            if options:
+                recipe.select(self.random.choice(options))
+            _widget(at.button, "Adicionar ao Planejamento").click().run()
+
+        self._timed("planning.add_meal", plan)
+        self._timed(
+            "planning.shopping_list",
+            lambda: _widget(at.button, "🔄 Gerar Lista de Compras").click().run(),
+        )
+
+    def chat(self) -> None:
+        at = self.at
+        self._open("chat")
+        prompt = self.random.choice(CHAT_PROMPTS)
+        self._timed("chat.send", lambda: at.chat_input[0].set_value(prompt).run())
+
+        # A resposta chega em segundo plano; o rerun seguinte a registra
+        deadline = time.monotonic() + CHAT_TIMEOUT
+        pending = (
+            at.session_state["chat_pending"]
+            if "chat_pending" in at.session_state
+            else None
+        )
+        while pending is not None and not pending.done():
+            if time.monotonic() > deadline:
+                self.errors.append("chat.reply: tempo esgotado")
+                pending.cancel()
+                break
+            time.sleep(0.02)
+        self._timed("chat.reply", at.run)
+
+    def run(self, rounds: int = 1) -> None:
+        self.landing()
+        for _ in range(rounds):
+            self.ingredients()
+            self.recipes()
+            self.planning()
+            self.chat()
+
+
+def queue_wait(before: Optional[Dict], after: Optional[Dict]) -> Dict[str, Dict]:
+    """Espera na fila dos limites de requisição entre duas leituras das métricas"""
+    if not before or not after:
+        return {}
+    return {
+        category: {
+            "waited": stats["waited"] - before[category]["waited"],
+            "wait_time": stats["wait_time"] - before[category]["wait_time"],
+            "throttled": stats["throttled"] - before[category]["throttled"],
+        }
+        for category, stats in after.items()
+    }
+
+
+def run_level(sessions: int, rounds: int = 1, seed: int = 0) -> Dict:
+    """Roda `sessions` sessões simultâneas e resume latências, chamadas e memória"""
+    client = api_client_module.api_client
+    limits_before = client.limiter_stats()
+    counter = ApiCallCounter()
+    counter.install()
+    simulated = [SimulatedSession(i, seed) for i in range(sessions)]
+    started = time.perf_counter()
+    try:
+        with shared_runtime(), RssSampler() as rss:
+            with ThreadPoolExecutor(max_workers=sessions) as pool:
+                list(pool.map(lambda session: session.run(rounds), simulated))
+    finally:
+        counter.uninstall()
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for session in simulated for _, seconds in session.timings]
+    by_step: Dict[str, List[float]] = {}
+    for session in simulated:
+        for step, seconds in session.timings:
+            by_step.setdefault(step, []).append(seconds)
+    errors = [error for session in simulated for error in session.errors]
+    waits = queue_wait(limits_before, client.limiter_stats())
+
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "elapsed": elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p90": percentile(latencies, 0.90),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies, default=0.0),
+        "steps": {
+            step: {
+                "p50": percentile(values, 0.50),
+                "p90": percentile(values, 0.90),
+                "mean": statistics.fmean(values),
+            }
+            for step, values in sorted(by_step.items())
+        },
+        "api_calls": counter.total,
+        "api_calls_per_session": counter.total / sessions,
+        "api_calls_by_route": dict(counter.calls),
+        "rss_peak_mb": rss.peak / 1024 / 1024,
+        "queue_wait": waits,
+        "queue_wait_total": sum(stats["wait_time"] for stats in waits.values()),
+        "errors": errors,
+    }
+
+
+def run_load(
+    levels: List[int],
+    api_url: str,
+    rounds: int = 1,
+    seed: int = 0,
+    log: Callable[[str], None] = lambda line: None,
+) -> Dict:
+    """Roda os níveis de concorrência contra a API em `api_url`"""
+    client = api_client_module.api_client
+    previous_url = client.base_url
+    client.base_url = api_url.rstrip("/")
+    results = []
+    try:
+        for sessions in levels:
+            result = run_level(sessions, rounds, seed)
+            results.append(result)
+            log(format_level(result))
+    finally:
+        client.base_url = previous_url
+    return {"api_url": api_url, "rounds": rounds, "levels": results}
+
+
+def format_level(result: Dict) -> str:
+    """Linha de resumo de um nível de concorrência"""
+    return (
+        f"{result['sessions']:>4} sessões  "
+        f"p50 {result['p50'] * 1000:8.1f} ms  "
+        f"p90 {result['p90'] * 1000:8.1f} ms  "
+        f"p99 {result['p99'] * 1000:8.1f} ms  "
+        f"API/sessão {result['api_calls_per_session']:6.1f}  "
+        f"RSS {result['rss_peak_mb']:7.1f} MB  "
+        f"fila {result.get('queue_wait_total', 0.0) * 1000:7.1f} ms  "
+        f"erros {len(result['errors'])}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--api-url", default=None, help="API real ou já em execução")
+    parser.add_argument("--ingredients", type=int, default=1000)
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--chat-latency", type=float, default=0.5)
+    parser.add_argument("--output", default=None, help="grava o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    # Histórico e cache do chat das sessões simuladas ficam fora do diretório do usuário
+    os.environ.setdefault(
+        "MENU_MVP_DATA_DIR", tempfile.mkdtemp(prefix="menu_mvp_load_")
+    )
+
+    def log(line: str) -> None:
+        print(line, file=sys.stderr)
+
+    server = None
+    api_url = args.api_url
+    if api_url is None:
+        from stub_server import StubAPI, StubConfig, StubServer
+        from synthetic_data import generate_catalog
+
+        ingredients, recipes = generate_catalog(
+            args.ingredients, args.recipes, args.seed
+        )
+        config = StubConfig(latency=args.latency, chat_latency=args.chat_latency)
+        server = StubServer(StubAPI(ingredients, recipes, config)).start()
+        api_url = server.url
+    try:
+        report = run_load(args.sessions, api_url, args.rounds, args.seed, log=log)
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 1 if any(level["errors"] for level in report["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
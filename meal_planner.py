@@ -0,0 +1,154 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from catalog import normalize_name
+from pantry import RecipeIngredientIndex
+
+MEAL_TYPES = ["Café da Manhã", "Almoço", "Jantar", "Lanche", "Ceia"]
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def generate_plan(
+    index: RecipeIngredientIndex,
+    days: Iterable[date],
+    meal_types: Iterable[str] = MEAL_TYPES,
+    no_repeat_days: int = 3,
+    existing: Optional[Dict] = None,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Preenche as refeições vazias minimizando a quantidade de ingredientes distintos
+
+    Heurística gulosa: cada refeição recebe a receita que adiciona menos ingredientes
+    novos à lista de compras, desempatando pela que mais reaproveita os já usados.
+    Uma receita não se repete dentro de `no_repeat_days` dias.
+    """
+    existing = existing or {}
+    days = sorted(days)
+    meal_types = [meal_type for meal_type in MEAL_TYPES if meal_type in meal_types]
+    plan: Dict[str, Dict[str, str]] = {}
+    candidates = index.sizes > 0
+    if not candidates.any() or not days or not meal_types:
+        return {"plan": plan, "ingredients": 0}
+
+    jitter = np.random.default_rng(seed).random(len(index))
+    window = max(no_repeat_days, 0)
+    used = np.zeros(index.bits.shape[1], dtype=np.uint8)
+    last_day = np.full(len(index), np.iinfo(np.int64).min // 2, dtype=np.int64)
+    row_by_name = {
+        normalize_name(name): row for row, name in enumerate(index.recipe_names)
+    }
+
+    # Refeições já planejadas contam como ingredientes comprados e receitas recentes
+    for day_number, day in enumerate(days):
+        for meals in existing.get(day.strftime(DATE_FORMAT), {}).values():
+            for meal in meals:
+                row = row_by_name.get(normalize_name(meal["recipe"]))
+                if row is not None:
+                    used |= index.bits[row]
+                    last_day[row] = max(last_day[row], day_number)
+
+    for day_number, day in enumerate(days):
+        date_key = day.strftime(DATE_FORMAT)
+        for meal_type in meal_types:
+            if existing.get(date_key, {}).get(meal_type):
+                continue
+
+            # Ingredientes de cada receita que ainda não estão na lista de compras
+            new = index.coverage(~used)
+            reused = index.sizes - new
+            allowed = candidates
+            if window:
+                allowed = candidates & (last_day <= day_number - window)
+            if not allowed.any():
+                # Sem opções dentro da janela: usa a receita usada há mais tempo
+                allowed = candidates & (last_day == last_day[candidates].min())
+
+            rows = np.flatnonzero(allowed)
+            best = rows[np.lexsort((jitter[rows], -reused[rows], new[rows]))[0]]
+            used |= index.bits[best]
+            last_day[best] = day_number
+            plan.setdefault(date_key, {})[meal_type] = index.recipe_names[best]
+
+    return {"plan": plan, "ingredients": int(np.unpackbits(used).sum())}
+
+
+def apply_plan(
+    meal_plan: Dict, plan: Dict, notes: str = "Gerado automaticamente"
+) -> int:
+    """Grava um planejamento gerado no formato usado pela página de planejamento"""
+    added_at = datetime.now().strftime("%d/%m/%Y %H:%M")
+    added = 0
+    for date_key, meals in plan.items():
+        for meal_type, recipe_name in meals.items():
+            meal_plan.setdefault(date_key, {}).setdefault(meal_type, []).append(
+                {"recipe": recipe_name, "notes": notes, "added_at": added_at}
+            )
+            added += 1
+    return added
+
+
+def plan_records(meal_plan: Dict) -> List[Dict]:
+    """Converte o planejamento em uma linha por refeição (para exportação)"""
+    return [
+        {
+            "data": date_key,
+            "refeicao": meal_type,
+            "receita": meal["recipe"],
+            "notas": meal["notes"],
+            "adicionado_em": meal["added_at"],
+        }
+        for date_key, day_plan in meal_plan.items()
+        for meal_type, meals in day_plan.items()
+        for meal in meals
+    ]
+
+
+def plan_stats(meal_plan: Dict, items: List[Dict]) -> Dict[str, int]:
+    """Totais do planejamento e da lista de compras, exibidos nos painéis
+
+    Calculado a cada alteração e guardado na sessão, para que os painéis não
+    percorram o planejamento a cada execução da página.
+    """
+    return {
+        "meals": sum(
+            len(meals) for day_plan in meal_plan.values() for meals in day_plan.values()
+        ),
+        "days": len(meal_plan),
+        "items": len({item["ingrediente"] for item in items}),
+    }
+
+
+def get_week_days(today: Optional[datetime] = None) -> List[str]:
+    """Datas (dd/mm/aaaa) da semana corrente, de segunda a domingo"""
+    today = today or datetime.now()
+    start_of_week = today - timedelta(days=today.weekday())
+    return [(start_of_week + timedelta(days=i)).strftime(DATE_FORMAT) for i in range(7)]
+
+
+def shopping_list(meal_plan: Dict, recipes: List[Dict]) -> List[Dict]:
+    """Lista os ingredientes das receitas planejadas, um item por refeição"""
+    recipes_by_name: Dict[str, List[Dict]] = {}
+    for recipe in recipes:
+        recipes_by_name.setdefault(recipe["name"], []).append(recipe)
+
+    items = []
+    for date_key, day_plan in meal_plan.items():
+        for meal_type, meals in day_plan.items():
+            for meal in meals:
+                if meal["recipe"] == "Refeição livre":
+                    continue
+                for recipe in recipes_by_name.get(meal["recipe"], []):
+                    for ingredient in recipe.get("ingredients") or []:
+                        items.append(
+                            {
+                                "ingrediente": ingredient.get(
+                                    "name", "Ingrediente desconhecido"
+                                ),
+                                "receita": meal["recipe"],
+                                "data": date_key,
+                                "refeicao": meal_type,
+                            }
+                        )
+    return items
@@ -0,0 +1,507 @@
+"""Métricas do processo no formato texto do Prometheus
+
+Os módulos registram suas métricas no `registry` global:
+
+    requests_total = registry.counter(
+        "menu_mvp_api_requests_total", "Requisições à API", ["method", "route"]
+    )
+    requests_total.inc(method="GET", route="/recipes")
+
+Com a variável MENU_MVP_METRICS_PORT definida, `start_metrics_server()`
+(chamado por `start_page`) sobe uma única vez por processo um servidor HTTP
+nessa porta, com as métricas em /metrics. Contadores e histogramas custam um
+lock e uma soma por evento; sessões ativas e memória das sessões só são
+calculadas quando o Prometheus coleta.
+
+Métricas exportadas:
+    menu_mvp_api_requests_total / menu_mvp_api_request_duration_seconds
+        chamadas do MenuMVPAPIClient por método, rota e status
+    menu_mvp_cache_requests_total / menu_mvp_cache_hit_ratio
+        consultas aos caches (api, details, catalog, chat) por resultado
+    menu_mvp_rate_limit_wait_seconds_total
+        espera na fila do limite de requisições, por categoria
+    menu_mvp_page_run_seconds
+        duração das execuções (reruns) de cada página
+    menu_mvp_streamlit_sessions / menu_mvp_session_state_bytes
+        sessões ativas e estimativa da memória do session_state
+"""
+
+import itertools
+import logging
+import math
+import os
+import sys
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PORT_ENV = "MENU_MVP_METRICS_PORT"
+HOST_ENV = "MENU_MVP_METRICS_HOST"
+DEFAULT_HOST = "0.0.0.0"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites dos histogramas de duração, em segundos
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Itens medidos por coleção ao estimar a memória; o resto é extrapolado
+SIZE_SAMPLE = 100
+
+# (rótulos, valor) de uma série
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base das métricas: nome, ajuda, rótulos e o cabeçalho do formato texto"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} espera os rótulos {list(self.labelnames)}, "
+                f"recebeu {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        """Séries atuais: (nome, rótulos, valor)"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.help)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Valor que só cresce (eventos, segundos acumulados)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, self._labels(key), value) for key, value in values]
+
+
+class Histogram(_Metric):
+    """Distribuição de durações em faixas cumulativas (`le`), com soma e contagem"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Rótulos -> (contagem por faixa, soma, total)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return 0 if series is None else series[2]
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            series = [
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            ]
+        samples = []
+        for key, counts, total, count in series:
+            labels = self._labels(key)
+            for bound, cumulative in zip(self.buckets, itertools.accumulate(counts)):
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        {**labels, "le": _format_value(bound)},
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class CallbackMetric(_Metric):
+    """Métrica calculada na coleta, a partir de estatísticas mantidas em outro lugar"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        callback: Callable[[], Iterable[Sample]],
+    ):
+        super().__init__(name, help)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]:
+        return [(self.name, labels, value) for labels, value in self.callback()]
+
+
+class MetricsRegistry:
+    """Métricas do processo, na ordem de registro
+
+    Registrar de novo um nome já existente retorna a mesma métrica (os scripts
+    das páginas são reexecutados a cada rerun).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+        if (
+            type(existing) is not type(metric)
+            or existing.kind != metric.kind
+            or existing.labelnames != metric.labelnames
+        ):
+            raise ValueError(f"Métrica {metric.name} já registrada com outro formato")
+        if isinstance(metric, CallbackMetric) and isinstance(existing, CallbackMetric):
+            existing.callback = metric.callback
+        return existing
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(
+        self, name: str, help: str, callback: Callable[[], Iterable[Sample]]
+    ) -> CallbackMetric:
+        """Valor instantâneo, lido por `callback` a cada coleta"""
+        return self._register(CallbackMetric(name, help, "gauge", callback))
+
+    def counter_callback(
+        self, name: str, help: str, callback: Callable[[], Iterable[Sample]]
+    ) -> CallbackMetric:
+        """Contador mantido por outro objeto, lido por `callback` a cada coleta"""
+        return self._register(CallbackMetric(name, help, "counter", callback))
+
+    def render(self) -> str:
+        """Todas as métricas no formato texto do Prometheus
+
+        Uma métrica cuja coleta falha é omitida (e registrada no log), sem
+        derrubar as demais.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception:
+                logger.exception("Falha ao coletar a métrica %s", metric.name)
+        return "\n".join(lines) + "\n"
+
+
+# Registro global do processo
+registry = MetricsRegistry()
+
+
+# Caches: "hit" e "stale" são respondidos pelo cache, "miss" vai à origem
+cache_requests = registry.counter(
+    "menu_mvp_cache_requests_total",
+    "Consultas aos caches por resultado (hit, stale, miss)",
+    ["cache", "result"],
+)
+
+
+def cache_lookup(cache: str, result: str) -> None:
+    """Registra uma consulta ao cache `cache`"""
+    cache_requests.inc(cache=cache, result=result)
+
+
+def _hit_ratio_samples() -> Iterable[Sample]:
+    lookups: Dict[str, float] = {}
+    hits: Dict[str, float] = {}
+    for _, labels, value in cache_requests.samples():
+        cache = labels["cache"]
+        lookups[cache] = lookups.get(cache, 0.0) + value
+        if labels["result"] != "miss":
+            hits[cache] = hits.get(cache, 0.0) + value
+    return [
+        ({"cache": cache}, hits.get(cache, 0.0) / total)
+        for cache, total in lookups.items()
+        if total
+    ]
+
+
+registry.gauge(
+    "menu_mvp_cache_hit_ratio",
+    "Fração das consultas respondidas pelo cache desde a subida do processo",
+    _hit_ratio_samples,
+)
+
+
+# Sessões do Streamlit
+def _active_sessions() -> List[Any]:
+    """Sessões conectadas ao servidor do Streamlit deste processo ([] fora dele)"""
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return []
+    manager = getattr(Runtime.instance(), "_session_mgr", None)
+    return [] if manager is None else list(manager.list_active_sessions())
+
+
+def estimate_size(
+    obj: Any, sample: int = SIZE_SAMPLE, _seen: Optional[set] = None
+) -> int:
+    """Memória aproximada de um objeto e do que ele contém, em bytes
+
+    Coleções grandes são estimadas por amostra: os primeiros `sample` itens são
+    medidos e o resultado é extrapolado para o total. Objetos repetidos contam
+    uma vez. DataFrames informam o próprio tamanho.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+
+    if isinstance(obj, dict):
+        items: Iterable[Any] = itertools.chain.from_iterable(
+            itertools.islice(obj.items(), sample)
+        )
+        length, measured = len(obj), min(len(obj), sample)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        items = itertools.islice(obj, sample)
+        length, measured = len(obj), min(len(obj), sample)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return size + estimate_size(vars(obj), sample, seen)
+    else:
+        return size
+
+    contents = sum(estimate_size(item, sample, seen) for item in items)
+    if measured and length > measured:
+        contents = contents * length // measured
+    return size + contents
+
+
+def session_state_sizes(sessions: Optional[List[Any]] = None) -> List[int]:
+    """Memória estimada do session_state de cada sessão ativa
+
+    Objetos compartilhados entre sessões (as listagens do cache do cliente)
+    contam em cada uma delas.
+    """
+    sizes = []
+    for info in _active_sessions() if sessions is None else sessions:
+        state = info.session.session_state.filtered_state
+        sizes.append(estimate_size(state))
+    return sizes
+
+
+def _session_samples() -> Iterable[Sample]:
+    return [({}, len(_active_sessions()))]
+
+
+def _memory_samples() -> Iterable[Sample]:
+    sizes = session_state_sizes()
+    return [
+        ({"aggregate": "sum"}, sum(sizes)),
+        ({"aggregate": "max"}, max(sizes, default=0)),
+    ]
+
+
+registry.gauge(
+    "menu_mvp_streamlit_sessions",
+    "Sessões do Streamlit conectadas a este processo",
+    _session_samples,
+)
+registry.gauge(
+    "menu_mvp_session_state_bytes",
+    "Memória estimada do session_state (soma e maior sessão)",
+    _memory_samples,
+)
+
+
+# Servidor
+class _Handler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # Uma linha por coleta só poluiria o log do Streamlit
+        pass
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    """Serve o registro em /metrics em uma thread, em uma porta livre por padrão
+
+    Pode ser usado como gerenciador de contexto:
+
+        with MetricsServer(port=0) as server:
+            requests.get(f"{server.url}/metrics")
+    """
+
+    def __init__(
+        self,
+        metrics: Optional[MetricsRegistry] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.registry = metrics or registry
+        handler = type("MetricsHandler", (_Handler,), {"registry": self.registry})
+        self.httpd = _HTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            kwargs={"poll_interval": 0.5},
+            name="metrics-server",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MetricsServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+_server: Optional[MetricsServer] = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(
+    port: Optional[int] = None, host: Optional[str] = None
+) -> Optional[MetricsServer]:
+    """Sobe o servidor de métricas uma vez por processo
+
+    Sem `port`, usa MENU_MVP_METRICS_PORT; sem nenhum dos dois, as métricas
+    continuam sendo registradas mas não são servidas. Uma porta ocupada é
+    registrada no log sem interromper o app, e não há nova tentativa.
+    """
+    global _server, _server_started
+    if _server_started:
+        return _server
+    with _server_lock:
+        if _server_started:
+            return _server
+        if port is None:
+            value = os.environ.get(PORT_ENV)
+            port = int(value) if value else None
+        if port is not None:
+            host = host or os.environ.get(HOST_ENV, DEFAULT_HOST)
+            try:
+                _server = MetricsServer(registry, host, port).start()
+            except OSError as e:
+                logger.warning(
+                    "Servidor de métricas não iniciado em %s:%s: %s", host, port, e
+                )
+        _server_started = True
+        return _server
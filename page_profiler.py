@@ -0,0 +1,207 @@
+"""Medição de tempo de cada execução (rerun) das páginas
+
+Uso em uma página:
+
+    profiler = start_page("ingredientes")
+    with profiler.section("fetch"):
+        ingredients = load_ingredients()
+    ...
+    finish_page(profiler)
+
+Os tempos são sempre medidos (custo desprezível) e guardados na sessão. Com
+`?profile=1` na URL, o painel "⏱️ Desempenho" aparece na barra lateral e cada
+execução também é perfilada com o cProfile; `?profile=0` desliga. A duração
+de cada execução também alimenta o histograma `menu_mvp_page_run_seconds` do
+processo (veja metrics.py).
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import streamlit as st
+
+from metrics import registry, start_metrics_server
+
+PROFILE_PARAM = "profile"
+HISTORY_SIZE = 20
+TOP_FUNCTIONS = 25
+
+# Chaves no session_state
+_ENABLED_KEY = "profile_enabled"
+_ACTIVE_KEY = "profile_active"
+_HISTORY_KEY = "profile_history"
+
+# Tempo não coberto por seções nomeadas (em geral, montagem da interface)
+OTHER_SECTION = "render/outros"
+
+# Limites do histograma de duração das execuções, em segundos
+RUN_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+page_runs = registry.histogram(
+    "menu_mvp_page_run_seconds",
+    "Duração das execuções (reruns) de cada página",
+    ["page"],
+    buckets=RUN_BUCKETS,
+)
+
+
+def format_stats(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> str:
+    """Funções com maior tempo acumulado, no formato texto do pstats"""
+    buffer = io.StringIO()
+    stats = pstats.Stats(profile, stream=buffer)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return buffer.getvalue()
+
+
+class PageProfiler:
+    """Cronometra uma execução da página e suas seções nomeadas
+
+    Seções com o mesmo nome são somadas; seções não devem ser aninhadas, para
+    que o tempo restante ("render/outros") faça sentido.
+    """
+
+    def __init__(self, page: str, capture: bool = False):
+        self.page = page
+        self.started_at = datetime.now()
+        self.sections: Dict[str, float] = {}
+        self.report: Optional[Dict] = None
+        self._profile = cProfile.Profile() if capture else None
+        # Perfil pedido, mas o cProfile estava ocupado: só os tempos são medidos
+        self.profile_skipped = False
+        self._started = time.perf_counter()
+        if self._profile is not None:
+            try:
+                self._profile.enable()
+            except ValueError:
+                # No Python 3.12+ só um perfilador por processo pode estar ativo
+                # (outra sessão perfilada ao mesmo tempo, depurador, cobertura)
+                self._profile = None
+                self.profile_skipped = True
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        """Soma o tempo do bloco na seção `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sections[name] = self.sections.get(name, 0.0) + elapsed
+
+    def stop(self) -> Dict:
+        """Encerra a medição e retorna o relatório (chamadas repetidas são ignoradas)"""
+        if self.report is not None:
+            return self.report
+        total = time.perf_counter() - self._started
+        stats = None
+        if self._profile is not None:
+            self._profile.disable()
+            stats = format_stats(self._profile)
+            self._profile = None
+
+        page_runs.observe(total, page=self.page)
+
+        sections = dict(self.sections)
+        sections[OTHER_SECTION] = max(0.0, total - sum(self.sections.values()))
+        self.report = {
+            "page": self.page,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "total": total,
+            "sections": sections,
+            "profile": stats,
+            "profile_skipped": self.profile_skipped,
+        }
+        return self.report
+
+
+def profiling_enabled() -> bool:
+    """Lê `?profile=` da URL; a escolha vale para o resto da sessão"""
+    value = st.query_params.get(PROFILE_PARAM)
+    if value is not None:
+        st.session_state[_ENABLED_KEY] = value not in ("0", "false", "")
+    return st.session_state.get(_ENABLED_KEY, False)
+
+
+def start_page(page: str) -> PageProfiler:
+    """Começa a medir a execução atual da página
+
+    Na primeira execução do processo, sobe também o servidor de métricas (se
+    MENU_MVP_METRICS_PORT estiver definida).
+    """
+    start_metrics_server()
+    # Uma execução interrompida (st.rerun, st.stop) não chega a finish_page
+    previous = st.session_state.get(_ACTIVE_KEY)
+    if previous is not None:
+        previous.stop()
+    profiler = PageProfiler(page, capture=profiling_enabled())
+    st.session_state[_ACTIVE_KEY] = profiler
+    return profiler
+
+
+def finish_page(profiler: PageProfiler) -> Dict:
+    """Encerra a medição, guarda no histórico e mostra o painel se ativado"""
+    report = profiler.stop()
+    st.session_state[_ACTIVE_KEY] = None
+    history: List[Dict] = st.session_state.setdefault(_HISTORY_KEY, [])
+    history.append(report)
+    del history[:-HISTORY_SIZE]
+    if st.session_state.get(_ENABLED_KEY, False):
+        render_panel(history)
+    return report
+
+
+def export_report(history: List[Dict]) -> str:
+    """Histórico de execuções em JSON, para anexar em chamados"""
+    return json.dumps(
+        {
+            "exported_at": datetime.now().isoformat(timespec="seconds"),
+            "runs": history,
+        },
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+def render_panel(history: List[Dict]) -> None:
+    """Painel recolhível na barra lateral com a última execução e o histórico"""
+    report = history[-1]
+    page_totals = [run["total"] for run in history if run["page"] == report["page"]]
+
+    with st.sidebar.expander("⏱️ Desempenho", expanded=False):
+        st.metric(
+            "Execução da página",
+            f"{report['total'] * 1000:.0f} ms",
+            help=f"Média das últimas {len(page_totals)} execuções: "
+            f"{sum(page_totals) / len(page_totals) * 1000:.0f} ms",
+        )
+        rows = [
+            {
+                "seção": name,
+                "ms": round(seconds * 1000, 1),
+                "%": (
+                    round(seconds / report["total"] * 100, 1) if report["total"] else 0
+                ),
+            }
+            for name, seconds in report["sections"].items()
+        ]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+        if report["profile"]:
+            st.caption(f"cProfile: {TOP_FUNCTIONS} funções com maior tempo acumulado")
+            st.code(report["profile"], language=None)
+        elif report.get("profile_skipped"):
+            st.caption("cProfile em uso por outra execução: apenas os tempos")
+
+        st.download_button(
+            label="📥 Exportar perfil",
+            data=export_report(history),
+            file_name=f"perfil_{report['page']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            key="profile_export",
+        )
@@ -1,54 +1,25 @@
-import os
-import sys
-from datetime import datetime
+from dataclasses import replace
 
-import pandas as pd
 import streamlit as st
 
-# Adiciona o diretório raiz ao path para importar o api_client
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 from api_client import api_client
+from dedup import find_duplicates, plan_merges, recipe_usage
+from export_service import export_widget
+from page_profiler import finish_page, start_page
+from repository import PAGE_BUDGET, catalog
+from table_view import paged_table, search_picker
 
 st.set_page_config(page_title="Ingredientes - Menu MVP", page_icon="🥕", layout="wide")
+profiler = start_page("ingredientes")
+catalog.set_budget(PAGE_BUDGET)
+
+# Grupos de duplicados mostrados por página na revisão
+CLUSTERS_PER_PAGE = 10
 
 st.title("🥕 Gerenciamento de Ingredientes")
 st.markdown("---")
 
 
-# Função para carregar ingredientes da API
-def load_ingredients():
-    """Carrega ingredientes da API"""
-    try:
-        ingredients = api_client.get_ingredients()
-        return ingredients
-    except Exception as e:
-        st.error(f"Erro ao carregar ingredientes: {str(e)}")
-        return []
-
-
-# Função para adicionar ingrediente via API
-def add_ingredient(name):
-    """Adiciona ingrediente via API"""
-    try:
-        result = api_client.create_ingredient(name)
-        return result
-    except Exception as e:
-        st.error(f"Erro ao adicionar ingrediente: {str(e)}")
-        return None
-
-
-# Função para deletar ingrediente via API
-def delete_ingredient(ingredient_id):
-    """Deleta ingrediente via API"""
-    try:
-        result = api_client.delete_ingredient(ingredient_id)
-        return result
-    except Exception as e:
-        st.error(f"Erro ao deletar ingrediente: {str(e)}")
-        return None
-
-
 # Sidebar para adicionar ingredientes
 with st.sidebar:
     st.header("➕ Adicionar Ingrediente")
@@ -59,7 +30,7 @@ with st.sidebar:
         submitted = st.form_submit_button("Adicionar Ingrediente")
 
         if submitted and nome:
-            result = add_ingredient(nome)
+            result = catalog.create_ingredient(nome)
             if result:
                 st.success(f"Ingrediente '{nome}' adicionado com sucesso!")
                 st.rerun()
@@ -71,36 +42,29 @@ with col1:
     st.header("📋 Lista de Ingredientes")
 
     # Carregar ingredientes da API
-    ingredients = load_ingredients()
+    with profiler.section("fetch"):
+        ingredients = catalog.load_ingredients()
 
     if ingredients:
-        # Converter para DataFrame
-        df = pd.DataFrame(ingredients)
+        # Índice de busca por nome (a tabela recebe apenas a página visível)
+        with profiler.section("transform"):
+            index = catalog.derived("ingredients", "search_index")
 
-        # Filtros
-        search_term = st.text_input(
-            "🔍 Buscar ingrediente", placeholder="Digite o nome..."
-        )
-
-        # Aplicar filtros
-        filtered_df = df.copy()
-        if search_term:
-            filtered_df = filtered_df[
-                filtered_df["name"].str.contains(search_term, case=False)
-            ]
-
-        # Exibir tabela
-        st.dataframe(filtered_df[["id", "name"]], use_container_width=True)
+        # Busca e tabela paginada
+        with profiler.section("transform"):
+            filtered_total = paged_table(
+                index, "ingredients", search_label="🔍 Buscar ingrediente"
+            )
 
         # Estatísticas
         st.subheader("📊 Estatísticas")
         col_stats1, col_stats2 = st.columns(2)
 
         with col_stats1:
-            st.metric("Total de ingredientes", len(df))
+            st.metric("Total de ingredientes", len(index))
 
         with col_stats2:
-            st.metric("Ingredientes filtrados", len(filtered_df))
+            st.metric("Ingredientes filtrados", filtered_total)
 
     else:
         st.info(
@@ -113,21 +77,131 @@ with col2:
     if ingredients:
         # Deletar ingrediente
         st.subheader("🗑️ Remover Ingrediente")
-        ingredient_delete = st.selectbox(
-            "Selecione para remover",
-            [f"{ing['id']} - {ing['name']}" for ing in ingredients],
+        ingredient_delete = search_picker(
+            catalog.derived("ingredients", "search_index"),
+            "Buscar para remover",
+            key="delete_ingredient",
         )
 
         if st.button("Remover", type="secondary"):
             if ingredient_delete:
-                ingredient_id = int(ingredient_delete.split(" - ")[0])
-                result = delete_ingredient(ingredient_id)
+                result = catalog.delete_ingredient(ingredient_delete["id"])
                 if result:
                     st.success(f"Ingrediente removido com sucesso!")
                     st.rerun()
     else:
         st.info("Adicione ingredientes para ver as ações disponíveis.")
 
+
+def show_merge_report(report) -> None:
+    """Mostra o resultado da última mesclagem (ou simulação)"""
+    summary = (
+        f"{len(report.deleted)} ingredientes removidos e "
+        f"{len(report.renamed)} renomeados"
+    )
+    if report.dry_run:
+        st.info(f"🧪 Simulação: seriam {summary}.")
+        lines = [f"- remover **{item['name']}**" for item in report.deleted] + [
+            f"- renomear **{item['name']}** para **{name}**"
+            for item, name in report.renamed
+        ]
+        st.markdown("\n".join(lines[:50]))
+    elif report.ok:
+        st.success(f"✅ Mesclagem concluída: {summary}.")
+    else:
+        st.warning(f"Mesclagem parcial: {summary}; {len(report.errors)} falharam.")
+        for operation, item, error in report.errors[:20]:
+            st.error(f"{operation} '{item.get('name', item.get('id'))}': {error}")
+
+
+# Revisão e mesclagem de ingredientes duplicados
+if ingredients:
+    st.markdown("---")
+    st.header("🧹 Ingredientes Duplicados")
+
+    if "merge_report" in st.session_state:
+        show_merge_report(st.session_state.merge_report)
+
+    if st.button("🔍 Procurar duplicados"):
+        with st.spinner("Comparando os nomes do catálogo..."):
+            # O uso nas receitas protege os duplicados: as receitas vêm completas
+            try:
+                usage = recipe_usage(catalog.get("recipes", wait=True))
+            except Exception as e:
+                st.error(f"Erro ao carregar receitas: {str(e)}")
+            else:
+                st.session_state.duplicates = (
+                    find_duplicates(ingredients, usage),
+                    usage,
+                )
+        st.session_state.pop("merge_report", None)
+
+    if "duplicates" in st.session_state:
+        clusters, usage = st.session_state.duplicates
+        if not clusters:
+            st.success("Nenhum duplicado encontrado.")
+        else:
+            pages = (len(clusters) - 1) // CLUSTERS_PER_PAGE + 1
+            page = st.number_input(
+                f"Página (de {pages})", min_value=1, max_value=pages, value=1
+            )
+            st.caption(
+                f"{len(clusters)} grupos encontrados. Marque os que devem ser "
+                "mesclados e ajuste o nome mantido, se quiser."
+            )
+            start = (page - 1) * CLUSTERS_PER_PAGE
+            selected = []
+            for cluster in clusters[start : start + CLUSTERS_PER_PAGE]:
+                key = cluster.keep["id"]
+                col_check, col_name = st.columns([3, 2])
+                with col_check:
+                    duplicates = ", ".join(item["name"] for item in cluster.duplicates)
+                    merge = st.checkbox(
+                        f"**{cluster.keep['name']}** ← {duplicates} "
+                        f"(nota {cluster.score:.2f})",
+                        key=f"merge_{key}",
+                    )
+                with col_name:
+                    name = st.text_input(
+                        "Nome mantido",
+                        value=cluster.name,
+                        key=f"merge_name_{key}",
+                        label_visibility="collapsed",
+                    )
+                if merge:
+                    selected.append(replace(cluster, name=name))
+
+            include_used = st.checkbox(
+                "Remover também os duplicados usados em receitas "
+                "(as receitas perdem esses ingredientes)"
+            )
+            plan = plan_merges(selected, usage, include_used)
+            if plan.skipped:
+                st.caption(
+                    f"{len(plan.skipped)} duplicados usados em receitas ficam de fora: "
+                    + ", ".join(item["name"] for item in plan.skipped[:10])
+                )
+
+            col_dry, col_apply = st.columns(2)
+            with col_dry:
+                dry_run = st.button("🧪 Simular", disabled=not plan)
+            with col_apply:
+                apply = st.button("🧹 Mesclar selecionados", disabled=not plan)
+            if dry_run or apply:
+                bar = st.progress(0.0)
+                try:
+                    st.session_state.merge_report = catalog.merge_ingredients(
+                        plan,
+                        dry_run=dry_run,
+                        progress=lambda done, total: bar.progress(done / total),
+                    )
+                except Exception as e:
+                    st.error(f"Erro ao carregar receitas: {str(e)}")
+                else:
+                    if apply:
+                        del st.session_state.duplicates
+                    st.rerun()
+
 # Status da API
 st.markdown("---")
 st.header("🔗 Status da API")
@@ -144,12 +218,7 @@ if ingredients:
     st.markdown("---")
     st.header("💾 Exportar Dados")
 
-    if st.button("📄 Exportar CSV"):
-        df = pd.DataFrame(ingredients)
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name=f"ingredientes_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv",
-        )
+    export_widget(ingredients, "ingredientes", key="export_ingredients")
+
+catalog.show_refreshing()
+finish_page(profiler)
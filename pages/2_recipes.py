@@ -1,86 +1,107 @@
-import os
-import sys
-from datetime import datetime
-
-import pandas as pd
 import streamlit as st
 
-# Adiciona o diretório raiz ao path para importar o api_client
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 from api_client import api_client
+from export_service import export_widget
+from ingredient_parser import decode_file, parse_recipe_file, parse_text
+from ingredient_resolver import apply_resolutions
+from page_profiler import finish_page, start_page
+from repository import PAGE_BUDGET, catalog
+from table_view import paged_table, search_picker
 
 st.set_page_config(page_title="Receitas - Menu MVP", page_icon="👨‍🍳", layout="wide")
+profiler = start_page("receitas")
+catalog.set_budget(PAGE_BUDGET)
+
+# Erros de leitura exibidos na importação em lote
+IMPORT_ERRORS_SHOWN = 20
 
 st.title("👨‍🍳 Gerenciamento de Receitas")
 st.markdown("---")
 
 
-# Função para carregar receitas da API
-def load_recipes():
-    """Carrega receitas da API"""
+def resolve_ingredients(ingredients):
+    """Troca os nomes parecidos com os do catálogo; retorna os itens e as resoluções"""
     try:
-        recipes = api_client.get_recipes()
-        return recipes
+        resolver = catalog.derived("ingredients", "resolver")
     except Exception as e:
-        st.error(f"Erro ao carregar receitas: {str(e)}")
-        return []
+        st.warning(f"Nomes enviados como digitados (catálogo indisponível: {e})")
+        return ingredients, []
+    resolutions = resolver.resolve_many(
+        [item["ingredient_name"] for item in ingredients], limit=1
+    )
+    return apply_resolutions(ingredients, resolutions), resolutions
 
 
-# Função para carregar ingredientes da API
-def load_ingredients():
-    """Carrega ingredientes da API"""
-    try:
-        ingredients = api_client.get_ingredients()
-        return ingredients
-    except Exception as e:
-        st.error(f"Erro ao carregar ingredientes: {str(e)}")
-        return []
+def mapped_names(resolutions):
+    """Nomes trocados pelos do catálogo, para o aviso após o cadastro"""
+    mapped = {
+        (resolution.query, resolution.name)
+        for resolution in resolutions
+        if resolution.match is not None and resolution.name != resolution.query
+    }
+    return [f"'{query}' → '{name}'" for query, name in sorted(mapped)]
 
 
 # Função para adicionar receita via API
-def add_recipe(name, instructions, ingredients_list):
-    """Adiciona receita via API"""
-    try:
-        # Converter ingredientes para o formato da API
-        api_ingredients = []
-        for ingredient in ingredients_list:
-            if ingredient.strip():
-                # Assumindo formato: "quantidade unidade nome"
-                parts = ingredient.strip().split()
-                if len(parts) >= 2:
-                    quantity = parts[0]
-                    unit = parts[1] if len(parts) > 2 else None
-                    ingredient_name = (
-                        " ".join(parts[2:]) if len(parts) > 2 else parts[1]
-                    )
+def add_recipe(name, instructions, ingredients_text, keep_names=False):
+    """Adiciona receita via API; as linhas de ingredientes inválidas são listadas
+
+    Nomes iguais aos do catálogo (a menos de plural, acentos e maiúsculas) são
+    trocados pelo do catálogo; nomes só parecidos são sugeridos e a receita não
+    é enviada, a menos que `keep_names` seja marcado.
+    """
+    parsed = parse_text(ingredients_text)
+    if not parsed.ok:
+        st.error(
+            "Corrija os ingredientes:\n\n"
+            + "\n".join(f"- {error}" for error in parsed.errors)
+        )
+        return None
+    ingredients, resolutions = resolve_ingredients(parsed.to_api())
+    suggestions = [
+        f"- '{resolution.query}': já existe '{resolution.suggestion['name']}'"
+        f" ({resolution.score:.0%} parecido)"
+        for resolution in resolutions
+        if resolution.suggestion is not None
+    ]
+    if suggestions and not keep_names:
+        st.warning(
+            "Ingredientes parecidos com os do catálogo; corrija os nomes ou marque "
+            "'Manter nomes digitados':\n\n" + "\n".join(suggestions)
+        )
+        return None
+    result = catalog.create_recipe(name, instructions, ingredients)
+    if result:
+        st.session_state["recipe_notice"] = (
+            f"Receita '{name}' adicionada com sucesso!",
+            mapped_names(resolutions),
+        )
+    return result
 
-                    api_ingredients.append(
-                        {
-                            "ingredient_name": ingredient_name,
-                            "quantity": quantity,
-                            "unit": unit,
-                        }
-                    )
 
-        result = api_client.create_recipe(name, instructions, api_ingredients)
-        return result
-    except Exception as e:
-        st.error(f"Erro ao adicionar receita: {str(e)}")
-        return None
+def show_notice():
+    """Mensagem do último cadastro, guardada para depois do rerun"""
+    notice = st.session_state.pop("recipe_notice", None)
+    if notice is not None:
+        message, mapped = notice
+        st.success(message)
+        if mapped:
+            st.caption("Associados ao catálogo: " + ", ".join(mapped))
 
 
 # Sidebar para adicionar receitas
 with st.sidebar:
     st.header("➕ Adicionar Receita")
+    show_notice()
 
     with st.form("add_recipe"):
         nome = st.text_input("Nome da receita", placeholder="Ex: Macarrão à Bolonhesa")
 
-        # Ingredientes (formato simplificado)
+        # Ingredientes, um por linha
         ingredientes_text = st.text_area(
             "Ingredientes (um por linha, formato: quantidade unidade nome)",
-            placeholder="200 g macarrão\n2 unidade tomate\n1 unidade cebola\n...",
+            placeholder="200 g de macarrão\n1/2 xícara de molho de tomate\n"
+            "1 cebola\nsal a gosto\n...",
         )
 
         # Instruções
@@ -89,54 +110,82 @@ with st.sidebar:
             placeholder="1. Ferva água...\n2. Cozinhe o macarrão...\n...",
         )
 
+        manter_nomes = st.checkbox(
+            "Manter nomes digitados",
+            help="Cadastra os ingredientes novos mesmo se parecidos com os do catálogo",
+        )
         submitted = st.form_submit_button("Adicionar Receita")
 
         if submitted and nome and instrucoes:
-            # Converter ingredientes para lista
-            ingredientes_list = (
-                ingredientes_text.split("\n") if ingredientes_text else []
-            )
-
-            result = add_recipe(nome, instrucoes, ingredientes_list)
+            result = add_recipe(nome, instrucoes, ingredientes_text, manter_nomes)
             if result:
-                st.success(f"Receita '{nome}' adicionada com sucesso!")
                 st.rerun()
 
+    # Importação em lote de um arquivo de texto
+    with st.expander("📥 Importar receitas"):
+        st.caption(
+            "Uma receita por bloco: '# Nome', um ingrediente por linha e "
+            "as instruções em linhas iniciadas por '>'."
+        )
+        upload = st.file_uploader("Arquivo .txt", type=["txt"], key="import_recipes")
+        if upload is not None:
+            recipes, errors = parse_recipe_file(decode_file(upload.getvalue()))
+            st.caption(
+                f"{len(recipes)} receitas prontas, {len(errors)} linhas com erro"
+            )
+            if errors:
+                st.warning(
+                    "\n".join(f"- {error}" for error in errors[:IMPORT_ERRORS_SHOWN])
+                )
+            if st.session_state.get("imported_file") == upload.file_id:
+                st.success("Arquivo importado!")
+            elif recipes and st.button("Importar", key="import_recipes_submit"):
+                items, resolutions = resolve_ingredients(
+                    [item for recipe in recipes for item in recipe["ingredients"]]
+                )
+                position = 0
+                for imported in recipes:
+                    count = len(imported["ingredients"])
+                    imported["ingredients"] = items[position : position + count]
+                    position += count
+                if catalog.create_recipes_bulk(recipes) is not None:
+                    st.session_state["imported_file"] = upload.file_id
+                    st.session_state["recipe_notice"] = (
+                        f"{len(recipes)} receitas importadas!",
+                        mapped_names(resolutions),
+                    )
+                    st.rerun()
+
 # Área principal
 col1, col2 = st.columns([2, 1])
 
 with col1:
     st.header("📋 Lista de Receitas")
 
-    # Carregar receitas da API
-    recipes = load_recipes()
+    # Carregar a lista resumida (id e nome) da API; os detalhes vêm sob demanda
+    with profiler.section("fetch"):
+        recipes = catalog.load_recipe_summaries()
 
     if recipes:
-        # Converter para DataFrame
-        df = pd.DataFrame(recipes)
-
-        # Filtros
-        search_term = st.text_input("🔍 Buscar receita", placeholder="Digite o nome...")
-
-        # Aplicar filtros
-        filtered_df = df.copy()
-        if search_term:
-            filtered_df = filtered_df[
-                filtered_df["name"].str.contains(search_term, case=False)
-            ]
-
-        # Exibir tabela
-        st.dataframe(filtered_df[["id", "name"]], use_container_width=True)
+        # Índice de busca por nome (a tabela recebe apenas a página visível)
+        with profiler.section("transform"):
+            index = catalog.derived("recipe_summaries", "search_index")
+
+        # Busca e tabela paginada
+        with profiler.section("transform"):
+            filtered_total = paged_table(
+                index, "recipes", search_label="🔍 Buscar receita"
+            )
 
         # Estatísticas
         st.subheader("📊 Estatísticas")
         col_stats1, col_stats2 = st.columns(2)
 
         with col_stats1:
-            st.metric("Total de receitas", len(df))
+            st.metric("Total de receitas", len(index))
 
         with col_stats2:
-            st.metric("Receitas filtradas", len(filtered_df))
+            st.metric("Receitas filtradas", filtered_total)
 
     else:
         st.info(
@@ -149,26 +198,49 @@ with col2:
     if recipes:
         # Visualizar receita detalhada
         st.subheader("👁️ Visualizar Receita")
-        recipe_view = st.selectbox(
-            "Selecione a receita", [rec["name"] for rec in recipes]
+        summary = search_picker(
+            catalog.derived("recipe_summaries", "search_index"),
+            "Buscar receita para visualizar",
+            key="view_recipe",
+            # A escolhida e as vizinhas são as próximas a serem abertas
+            prefetch=lambda items: catalog.prefetch_details(
+                [item["name"] for item in items]
+            ),
         )
 
-        if st.button("Ver Detalhes"):
-            for recipe in recipes:
-                if recipe["name"] == recipe_view:
-                    st.subheader(f"📖 {recipe['name']}")
-                    st.write(f"**ID:** {recipe['id']}")
-
-                    st.write("**Ingredientes:**")
-                    if recipe.get("ingredients"):
-                        for ingredient in recipe["ingredients"]:
-                            st.write(f"- {ingredient.get('name', 'N/A')}")
-                    else:
-                        st.write("Nenhum ingrediente cadastrado")
-
-                    st.write("**Instruções:**")
-                    st.text(recipe.get("instructions", "N/A"))
-                    break
+        if st.button("Ver Detalhes") and summary:
+            with profiler.section("fetch"):
+                recipe = catalog.recipe_details(summary["name"])
+            if recipe:
+                st.subheader(f"📖 {recipe['name']}")
+                st.write(f"**ID:** {recipe['id']}")
+
+                st.write("**Ingredientes:**")
+                if recipe.get("ingredients"):
+                    for ingredient in recipe["ingredients"]:
+                        st.write(f"- {ingredient.get('name', 'N/A')}")
+                else:
+                    st.write("Nenhum ingrediente cadastrado")
+
+                st.write("**Instruções:**")
+                st.text(recipe.get("instructions", "N/A"))
+
+                # Receitas semelhantes (consulta à tabela de vizinhos), quando o
+                # catálogo completo já está na sessão; senão, ele é buscado em
+                # segundo plano para a próxima vez
+                full_catalog = catalog.peek("recipes")
+                similar = []
+                if full_catalog is None:
+                    catalog.start_prefetch(names=["recipes"])
+                else:
+                    with profiler.section("transform"):
+                        similar = catalog.derived("recipes", "recommender").similar(
+                            recipe["id"]
+                        )
+                if similar:
+                    st.write("**🔗 Receitas semelhantes:**")
+                    for item in similar:
+                        st.write(f"- {item['name']} ({item['score']:.0%})")
     else:
         st.info("Adicione receitas para ver as ações disponíveis.")
 
@@ -188,12 +260,11 @@ if recipes:
     st.markdown("---")
     st.header("💾 Exportar Dados")
 
-    if st.button("📄 Exportar CSV"):
-        df = pd.DataFrame(recipes)
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name=f"receitas_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv",
-        )
+    # As receitas completas vêm do catálogo dentro do prazo da página; se ainda
+    # não chegaram, a página é recarregada quando a busca terminar
+    full_recipes = catalog.load("recipes")
+    if full_recipes:
+        export_widget(full_recipes, "receitas", key="export_recipes")
+
+catalog.show_refreshing()
+finish_page(profiler)
@@ -1,16 +1,23 @@
-import os
-import sys
 from datetime import datetime, timedelta
 
-import pandas as pd
 import streamlit as st
 
-# Adiciona o diretório raiz ao path para importar o api_client
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
-from api_client import api_client
+from export_service import export_widget
+from meal_planner import (
+    MEAL_TYPES,
+    apply_plan,
+    generate_plan,
+    get_week_days,
+    plan_records,
+    plan_stats,
+    shopping_list,
+)
+from page_profiler import finish_page, start_page
+from repository import PAGE_BUDGET, catalog
 
 st.set_page_config(page_title="Planejamento - Menu MVP", page_icon="📅", layout="wide")
+profiler = start_page("planejamento")
+catalog.set_budget(PAGE_BUDGET)
 
 st.title("📅 Planejamento de Refeições")
 st.markdown("---")
@@ -20,28 +27,17 @@ if "meal_plan" not in st.session_state:
     st.session_state.meal_plan = {}
 if "shopping_list" not in st.session_state:
     st.session_state.shopping_list = []
+if "plan_stats" not in st.session_state:
+    st.session_state.plan_stats = plan_stats(
+        st.session_state.meal_plan, st.session_state.shopping_list
+    )
 
 
-# Função para obter dias da semana
-def get_week_days():
-    today = datetime.now()
-    start_of_week = today - timedelta(days=today.weekday())
-    week_days = []
-    for i in range(7):
-        day = start_of_week + timedelta(days=i)
-        week_days.append(day.strftime("%d/%m/%Y"))
-    return week_days
-
-
-# Função para carregar receitas da API
-def load_recipes():
-    """Carrega receitas da API"""
-    try:
-        recipes = api_client.get_recipes()
-        return recipes
-    except Exception as e:
-        st.error(f"Erro ao carregar receitas: {str(e)}")
-        return []
+def update_stats():
+    """Recalcula os totais exibidos aqui e na página inicial após uma alteração"""
+    st.session_state.plan_stats = plan_stats(
+        st.session_state.meal_plan, st.session_state.shopping_list
+    )
 
 
 # Sidebar para planejamento
@@ -57,16 +53,15 @@ with st.sidebar:
     )
 
     # Selecionar tipo de refeição
-    meal_type = st.selectbox(
-        "Tipo de Refeição", ["Café da Manhã", "Almoço", "Jantar", "Lanche", "Ceia"]
-    )
+    meal_type = st.selectbox("Tipo de Refeição", MEAL_TYPES)
 
     # Carregar receitas da API
-    recipes = load_recipes()
+    with profiler.section("fetch"):
+        recipes = catalog.load_recipes()
 
     # Selecionar receita (se existir)
     if recipes:
-        recipe_options = [rec["name"] for rec in recipes]
+        recipe_options = catalog.derived("recipes", "names")
         selected_recipe = st.selectbox(
             "Selecionar Receita", ["Nenhuma"] + recipe_options
         )
@@ -97,8 +92,51 @@ with st.sidebar:
         }
 
         st.session_state.meal_plan[date_key][meal_type].append(meal_entry)
+        update_stats()
         st.success(f"Refeição adicionada para {date_key} - {meal_type}")
 
+    # Planejamento automático
+    st.markdown("---")
+    st.header("🤖 Planejamento Automático")
+
+    today = datetime.now().date()
+    start_of_week = today - timedelta(days=today.weekday())
+    date_range = st.date_input(
+        "Período",
+        value=(start_of_week, start_of_week + timedelta(days=6)),
+        min_value=today - timedelta(days=30),
+        max_value=today + timedelta(days=90),
+    )
+    auto_meal_types = st.multiselect(
+        "Refeições", MEAL_TYPES, default=["Almoço", "Jantar"]
+    )
+    no_repeat_days = st.number_input(
+        "Não repetir receita em (dias)", min_value=0, max_value=14, value=3
+    )
+
+    if st.button("Gerar Planejamento"):
+        if not catalog.load("recipes", wait=True):
+            st.warning("Adicione receitas primeiro!")
+        elif len(date_range) != 2:
+            st.warning("Selecione a data inicial e a final do período.")
+        else:
+            start, end = date_range
+            days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+            with profiler.section("transform"):
+                result = generate_plan(
+                    catalog.derived("recipes", "pantry_index"),
+                    days,
+                    auto_meal_types,
+                    no_repeat_days=int(no_repeat_days),
+                    existing=st.session_state.meal_plan,
+                )
+            added = apply_plan(st.session_state.meal_plan, result["plan"])
+            update_stats()
+            st.success(
+                f"{added} refeições planejadas usando "
+                f"{result['ingredients']} ingredientes distintos"
+            )
+
 # Área principal
 col1, col2 = st.columns([2, 1])
 
@@ -116,13 +154,7 @@ with col1:
             if day in st.session_state.meal_plan:
                 day_plan = st.session_state.meal_plan[day]
 
-                for meal_type in [
-                    "Café da Manhã",
-                    "Almoço",
-                    "Jantar",
-                    "Lanche",
-                    "Ceia",
-                ]:
+                for meal_type in MEAL_TYPES:
                     if meal_type in day_plan:
                         st.subheader(f"🍽️ {meal_type}")
 
@@ -141,6 +173,7 @@ with col1:
                                     day_plan[meal_type].remove(meal)
                                     if not day_plan[meal_type]:
                                         del day_plan[meal_type]
+                                    update_stats()
                                     st.success("Refeição removida!")
                                     st.rerun()
             else:
@@ -151,33 +184,15 @@ with col2:
 
     # Gerar lista de compras automaticamente
     if st.button("🔄 Gerar Lista de Compras"):
-        st.session_state.shopping_list = []
-
-        # Carregar receitas da API
-        recipes = load_recipes()
-
         # Coletar ingredientes das receitas planejadas
-        for date, day_plan in st.session_state.meal_plan.items():
-            for meal_type, meals in day_plan.items():
-                for meal in meals:
-                    if meal["recipe"] != "Refeição livre" and recipes:
-                        # Encontrar a receita
-                        for recipe in recipes:
-                            if recipe["name"] == meal["recipe"]:
-                                # Adicionar ingredientes à lista
-                                if recipe.get("ingredients"):
-                                    for ingredient in recipe["ingredients"]:
-                                        ingredient_name = ingredient.get(
-                                            "name", "Ingrediente desconhecido"
-                                        )
-                                        st.session_state.shopping_list.append(
-                                            {
-                                                "ingrediente": ingredient_name,
-                                                "receita": meal["recipe"],
-                                                "data": date,
-                                                "refeicao": meal_type,
-                                            }
-                                        )
+        with profiler.section("fetch"):
+            # Ação do usuário: as receitas vêm completas, sem o prazo da página
+            latest_recipes = catalog.load("recipes", wait=True)
+        with profiler.section("transform"):
+            st.session_state.shopping_list = shopping_list(
+                st.session_state.meal_plan, latest_recipes
+            )
+            update_stats()
 
         st.success("Lista de compras gerada!")
 
@@ -203,6 +218,7 @@ with col2:
         # Limpar lista
         if st.button("🗑️ Limpar Lista"):
             st.session_state.shopping_list = []
+            update_stats()
             st.success("Lista de compras limpa!")
             st.rerun()
     else:
@@ -216,54 +232,43 @@ if st.session_state.meal_plan:
     st.header("📊 Estatísticas do Planejamento")
 
     col_stats1, col_stats2, col_stats3 = st.columns(3)
+    stats = st.session_state.plan_stats
 
     with col_stats1:
-        total_meals = sum(
-            len(meals)
-            for day_plan in st.session_state.meal_plan.values()
-            for meals in day_plan.values()
-        )
-        st.metric("Total de Refeições", total_meals)
+        st.metric("Total de Refeições", stats["meals"])
 
     with col_stats2:
-        days_planned = len(st.session_state.meal_plan)
-        st.metric("Dias Planejados", days_planned)
+        st.metric("Dias Planejados", stats["days"])
 
     with col_stats3:
-        if st.session_state.shopping_list:
-            unique_items = len(
-                set(item["ingrediente"] for item in st.session_state.shopping_list)
-            )
-            st.metric("Itens Únicos", unique_items)
-        else:
-            st.metric("Itens Únicos", 0)
+        st.metric("Itens Únicos", stats["items"])
+
+# Sugestões baseadas nas receitas já planejadas
+planned_recipes = {
+    meal["recipe"]
+    for day_plan in st.session_state.meal_plan.values()
+    for meals in day_plan.values()
+    for meal in meals
+    if meal["recipe"] != "Refeição livre"
+}
+if planned_recipes and recipes:
+    with profiler.section("transform"):
+        suggestions = catalog.derived("recipes", "recommender").suggest(planned_recipes)
+    if suggestions:
+        st.markdown("---")
+        st.header("💡 Você também pode planejar")
+        st.write(" · ".join(item["name"] for item in suggestions))
 
 # Exportar planejamento
 if st.session_state.meal_plan:
     st.markdown("---")
     st.header("💾 Exportar Planejamento")
 
-    if st.button("📄 Exportar CSV"):
-        # Preparar dados para exportação
-        export_data = []
-        for date, day_plan in st.session_state.meal_plan.items():
-            for meal_type, meals in day_plan.items():
-                for meal in meals:
-                    export_data.append(
-                        {
-                            "data": date,
-                            "refeicao": meal_type,
-                            "receita": meal["recipe"],
-                            "notas": meal["notes"],
-                            "adicionado_em": meal["added_at"],
-                        }
-                    )
+    export_widget(
+        plan_records(st.session_state.meal_plan),
+        "planejamento",
+        key="export_planning",
+    )
 
-        df = pd.DataFrame(export_data)
-        csv = df.to_csv(index=False)
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name=f"planejamento_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv",
-        )
+catalog.show_refreshing()
+finish_page(profiler)
@@ -1,36 +1,228 @@
-import os
-import sys
+import re
 import uuid
 from datetime import datetime
 
 import streamlit as st
 
-# Adiciona o diretório raiz ao path para importar o api_client
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 from api_client import api_client
+from chat_cache import chat_cache
+from chat_executor import ChatBusyError, chat_executor
+from chat_retrieval import catalog_retriever
+from chat_store import (
+    MAX_SESSION_MESSAGES,
+    PAGE_SIZE,
+    chat_store,
+    trim_messages,
+)
+from page_profiler import finish_page, start_page
+from repository import PAGE_BUDGET, catalog, on_write
+
+# Parâmetro da URL com o dono das conversas (32 dígitos hexadecimais)
+OWNER_PARAM = "owner"
+OWNER_PATTERN = re.compile(r"[0-9a-f]{32}")
 
 st.set_page_config(page_title="Chat AI - Menu MVP", page_icon="🤖", layout="wide")
+profiler = start_page("chat")
+catalog.set_budget(PAGE_BUDGET)
+# Escritas em qualquer página desatualizam o índice do catálogo usado no chat
+on_write(catalog_retriever.written)
 
 st.title("🤖 Chat AI - Assistente de Menu")
 st.markdown("---")
 
 # Inicializar session state para chat
-if "chat_messages" not in st.session_state:
-    st.session_state.chat_messages = []
+if "chat_owner" not in st.session_state:
+    # Dono das conversas no histórico: fica na URL (?owner=...) para que o
+    # navegador continue listando e retomando as suas depois de recarregar
+    owner = st.query_params.get(OWNER_PARAM, "")
+    if not OWNER_PATTERN.fullmatch(owner):
+        owner = uuid.uuid4().hex
+    st.session_state.chat_owner = owner
+if st.query_params.get(OWNER_PARAM) != st.session_state.chat_owner:
+    st.query_params[OWNER_PARAM] = st.session_state.chat_owner
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid.uuid4())
+if "chat_messages" not in st.session_state:
+    # Apenas as mensagens mais recentes da conversa ficam na sessão
+    st.session_state.chat_messages = chat_store.load_window(
+        st.session_state.chat_owner, st.session_state.thread_id, PAGE_SIZE
+    )
+if "chat_visible" not in st.session_state:
+    st.session_state.chat_visible = PAGE_SIZE
+if "chat_cached_turns" not in st.session_state:
+    st.session_state.chat_cached_turns = {}
+if "chat_pending" not in st.session_state:
+    st.session_state.chat_pending = None
+
+
+# Função para cancelar a resposta em andamento
+def cancel_pending():
+    """Cancela a requisição de chat pendente, se houver"""
+    if st.session_state.chat_pending is not None:
+        st.session_state.chat_pending.cancel()
+        st.session_state.chat_pending = None
+
+
+# Função para trocar de conversa
+def switch_thread(thread_id):
+    """Troca a conversa atual, carregando apenas as mensagens mais recentes"""
+    cancel_pending()
+    st.session_state.thread_id = thread_id
+    st.session_state.chat_messages = chat_store.load_window(
+        st.session_state.chat_owner, thread_id, PAGE_SIZE
+    )
+    st.session_state.chat_visible = PAGE_SIZE
+
+
+# Função para retomar uma conversa anterior escolhida na sidebar
+def resume_thread():
+    """Retoma a conversa selecionada"""
+    title = st.session_state.previous_thread
+    if title in st.session_state.thread_titles:
+        switch_thread(st.session_state.thread_titles[title])
+    st.session_state.previous_thread = None
+
+
+# Função para exibir mais mensagens da conversa
+def load_earlier_messages():
+    """Amplia a janela, buscando no histórico só o que ainda não está na sessão"""
+    loaded = st.session_state.chat_messages
+    visible = min(st.session_state.chat_visible + PAGE_SIZE, MAX_SESSION_MESSAGES)
+    missing = visible - len(loaded)
+    if missing > 0 and loaded and loaded[0]["seq"] > 0:
+        earlier = chat_store.load_window(
+            st.session_state.chat_owner,
+            st.session_state.thread_id,
+            missing,
+            before=loaded[0]["seq"],
+        )
+        st.session_state.chat_messages = earlier + loaded
+    st.session_state.chat_visible = visible
+
+
+# Função para registrar uma mensagem na conversa atual
+def add_message(message_type, content):
+    """Grava a mensagem no histórico e na janela da sessão"""
+    message = chat_store.append(
+        st.session_state.chat_owner, st.session_state.thread_id, message_type, content
+    )
+    st.session_state.chat_messages = trim_messages(
+        st.session_state.chat_messages + [message]
+    )
+
+
+# Função para ler um conjunto do catálogo para o índice do chat
+def catalog_records(name):
+    """Lê o conjunto do repositório, dentro do prazo da página
+
+    Depois de uma escrita no catálogo (nesta ou em outra sessão), espera os
+    dados novos; a cópia da sessão buscada antes da escrita é buscada de novo.
+    """
+    written_at = catalog_retriever.written_at
+    if written_at is None or not catalog_retriever.stale:
+        return catalog.get(name)
+    fetched_at = catalog.fetched_at(name)
+    outdated = fetched_at is not None and fetched_at < written_at
+    return catalog.get(name, force=outdated, wait=True)
+
+
+# Função para anexar o contexto do catálogo à mensagem
+def catalog_context(prompt):
+    """Retorna a preparação que busca os itens do catálogo ligados à pergunta
+
+    O catálogo vem do repositório (veja `catalog_records`); se ainda estiver
+    chegando (ou a busca falhar), a pergunta usa o índice anterior. A
+    atualização do índice e a busca rodam na thread de trabalho do chat.
+    """
+    try:
+        recipes = catalog_records("recipes")
+        ingredients = catalog_records("ingredients")
+    except Exception:
+        recipes = ingredients = None
+    # Conjuntos ainda chegando (ou com falha) não substituem o índice
+    complete = recipes is not None and not catalog.refreshing()
+    fetched_at = min(
+        catalog.fetched_at("recipes") or 0.0, catalog.fetched_at("ingredients") or 0.0
+    )
+
+    def prepare(message):
+        if complete:
+            catalog_retriever.sync(recipes, ingredients, fetched_at)
+        return catalog_retriever.augment(message, query=prompt)
+
+    return prepare
 
 
 # Função para enviar mensagem para a API
-def send_message(message):
-    """Envia mensagem para a API de chat"""
+def send_message(message, cacheable=False):
+    """Envia mensagem para a API de chat em segundo plano"""
+    thread_id = st.session_state.thread_id
+    prompt = message
+    # Respostas servidas do cache não passaram pela API: reenvia o contexto
+    cached_turn = st.session_state.chat_cached_turns.get(thread_id)
+    if cached_turn:
+        message = (
+            f"Contexto da conversa:\nUsuário: {cached_turn[0]}\n"
+            f"Assistente: {cached_turn[1]}\n\n{message}"
+        )
+    prepare = (
+        catalog_context(prompt)
+        if st.session_state.get("chat_use_catalog", True)
+        else None
+    )
     try:
-        response = api_client.chat(message, st.session_state.thread_id)
-        return response
+        st.session_state.chat_pending = chat_executor.submit(
+            api_client,
+            message,
+            thread_id,
+            prepare=prepare,
+            prompt=prompt,
+            cacheable=cacheable,
+        )
+    except ChatBusyError as e:
+        st.error(str(e))
+        return False
+    return True
+
+
+# Função para registrar a resposta que chegou em segundo plano
+def collect_response():
+    """Grava a resposta da requisição pendente quando ela termina"""
+    request = st.session_state.chat_pending
+    if request is None or not request.done():
+        return
+    st.session_state.chat_pending = None
+    if request.cancelled:
+        return
+
+    try:
+        response = request.result()
     except Exception as e:
         st.error(f"Erro ao enviar mensagem: {str(e)}")
-        return None
+        return
+
+    if response and "output" in response:
+        assistant_message = response["output"].get(
+            "content", "Desculpe, não consegui processar sua mensagem."
+        )
+        add_message("assistant", assistant_message)
+        st.session_state.chat_cached_turns.pop(request.thread_id, None)
+        if request.metadata["cacheable"]:
+            chat_cache.put(request.metadata["prompt"], assistant_message)
+    else:
+        st.error("Erro ao obter resposta do assistente")
+
+
+# Indicador da resposta pendente, atualizado sem bloquear a página
+@st.fragment(run_every=0.5)
+def pending_response():
+    """Mostra o tempo de espera e recarrega a página quando a resposta chega"""
+    request = st.session_state.chat_pending
+    if request is None:
+        return
+    if request.done():
+        st.rerun()
+    st.write(f"🤖 Assistente pensando... {request.elapsed():.0f}s")
 
 
 # Sidebar para configurações
@@ -39,11 +231,61 @@ with st.sidebar:
 
     # Novo thread
     if st.button("🆕 Nova Conversa"):
-        st.session_state.thread_id = str(uuid.uuid4())
-        st.session_state.chat_messages = []
+        switch_thread(str(uuid.uuid4()))
         st.success("Nova conversa iniciada!")
         st.rerun()
 
+    # Conversas anteriores
+    with profiler.section("fetch"):
+        threads = [
+            thread
+            for thread in chat_store.list_threads(st.session_state.chat_owner)
+            if thread["thread_id"] != st.session_state.thread_id
+        ]
+    if threads:
+        st.subheader("🗂️ Conversas Anteriores")
+        st.session_state.thread_titles = {
+            f"{thread['title']} · "
+            f"{datetime.fromtimestamp(thread['updated_at']).strftime('%d/%m %H:%M')}": (
+                thread["thread_id"]
+            )
+            for thread in threads
+        }
+        st.selectbox(
+            "Retomar conversa",
+            list(st.session_state.thread_titles),
+            index=None,
+            placeholder="Selecione...",
+            key="previous_thread",
+            on_change=resume_thread,
+        )
+
+    # Cache de respostas
+    st.subheader("⚡ Cache de Respostas")
+    use_cache = st.toggle(
+        "Reutilizar respostas de perguntas frequentes",
+        key="chat_use_cache",
+        help="Vale apenas para a primeira pergunta de cada conversa.",
+    )
+    if use_cache:
+        cache_stats = chat_cache.stats()
+        st.caption(
+            f"Taxa de acerto: {cache_stats['hit_rate']:.0%} "
+            f"({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']}) · "
+            f"{cache_stats['entries']} respostas"
+        )
+
+    # Contexto do catálogo
+    st.subheader("📚 Contexto do Catálogo")
+    use_catalog = st.toggle(
+        "Enviar receitas e ingredientes relevantes",
+        value=True,
+        key="chat_use_catalog",
+        help="Anexa à mensagem um resumo dos itens do catálogo ligados à pergunta.",
+    )
+    if use_catalog and len(catalog_retriever):
+        st.caption(f"{len(catalog_retriever)} itens indexados")
+
     # Thread ID atual
     st.subheader("📋 Thread ID")
     st.code(st.session_state.thread_id[:8] + "...")
@@ -60,8 +302,25 @@ with st.sidebar:
 # Área principal do chat
 st.header("💬 Conversa com o Assistente")
 
-# Exibir mensagens anteriores
-for message in st.session_state.chat_messages:
+# Registrar a resposta pendente, se já tiver chegado
+with profiler.section("fetch"):
+    collect_response()
+
+    # Exibir apenas a janela mais recente da conversa
+    window = st.session_state.chat_messages[-st.session_state.chat_visible :]
+    hidden_messages = chat_store.count(
+        st.session_state.chat_owner, st.session_state.thread_id
+    ) - len(window)
+if hidden_messages > 0:
+    if st.session_state.chat_visible >= MAX_SESSION_MESSAGES:
+        st.caption(f"Exibindo as últimas {len(window)} mensagens da conversa.")
+    else:
+        st.button(
+            f"⬆️ Carregar mensagens anteriores ({hidden_messages})",
+            on_click=load_earlier_messages,
+        )
+
+for message in window:
     if message["type"] == "user":
         with st.chat_message("user"):
             st.write(message["content"])
@@ -69,38 +328,39 @@ for message in st.session_state.chat_messages:
         with st.chat_message("assistant"):
             st.write(message["content"])
 
+# Resposta em andamento
+if st.session_state.chat_pending is not None:
+    with st.chat_message("assistant"):
+        pending_response()
+        st.button("⏹️ Parar resposta", on_click=cancel_pending)
+
 # Input para nova mensagem
-if prompt := st.chat_input("Digite sua mensagem..."):
-    # Adicionar mensagem do usuário
-    st.session_state.chat_messages.append(
-        {"type": "user", "content": prompt, "timestamp": datetime.now()}
+if prompt := st.chat_input(
+    "Digite sua mensagem...", disabled=st.session_state.chat_pending is not None
+):
+    # O cache só vale para a pergunta que abre a conversa
+    first_turn = (
+        chat_store.count(st.session_state.chat_owner, st.session_state.thread_id) == 0
     )
+    cached_answer = chat_cache.get(prompt) if use_cache and first_turn else None
 
-    # Exibir mensagem do usuário
-    with st.chat_message("user"):
-        st.write(prompt)
+    # Adicionar mensagem do usuário
+    add_message("user", prompt)
 
-    # Enviar para API e exibir resposta
-    with st.chat_message("assistant"):
-        with st.spinner("🤖 Assistente pensando..."):
-            response = send_message(prompt)
-
-            if response and "output" in response:
-                assistant_message = response["output"].get(
-                    "content", "Desculpe, não consegui processar sua mensagem."
-                )
-                st.write(assistant_message)
-
-                # Adicionar resposta do assistente
-                st.session_state.chat_messages.append(
-                    {
-                        "type": "assistant",
-                        "content": assistant_message,
-                        "timestamp": datetime.now(),
-                    }
-                )
-            else:
-                st.error("Erro ao obter resposta do assistente")
+    if cached_answer:
+        with st.chat_message("user"):
+            st.write(prompt)
+        with st.chat_message("assistant"):
+            st.write(cached_answer)
+            st.caption("⚡ Resposta do cache")
+        add_message("assistant", cached_answer)
+        st.session_state.chat_cached_turns[st.session_state.thread_id] = (
+            prompt,
+            cached_answer,
+        )
+    elif send_message(prompt, cacheable=use_cache and first_turn):
+        # Recarrega para exibir a mensagem e o indicador de resposta pendente
+        st.rerun()
 
 # Exemplos de prompts
 st.markdown("---")
@@ -161,3 +421,5 @@ with st.expander("ℹ️ Sobre o Assistente AI"):
 # Footer
 st.markdown("---")
 st.markdown("*Assistente AI integrado com a API do Menu MVP*")
+
+finish_page(profiler)
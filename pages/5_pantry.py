@@ -0,0 +1,96 @@
+import pandas as pd
+import streamlit as st
+
+from page_profiler import finish_page, start_page
+from pantry import match_pantry
+from repository import PAGE_BUDGET, catalog
+
+st.set_page_config(
+    page_title="O que cozinhar - Menu MVP", page_icon="🧺", layout="wide"
+)
+profiler = start_page("despensa")
+catalog.set_budget(PAGE_BUDGET)
+
+st.title("🧺 O que posso cozinhar?")
+st.markdown("---")
+
+
+with profiler.section("fetch"):
+    recipes = catalog.load_recipes()
+
+if recipes:
+    with profiler.section("transform"):
+        index = catalog.derived("recipes", "pantry_index")
+
+    # Sidebar com os ingredientes disponíveis
+    with st.sidebar:
+        st.header("🥕 Ingredientes Disponíveis")
+
+        pantry = st.multiselect(
+            "Selecione o que você tem em casa",
+            sorted(index.ingredient_labels, key=str.casefold),
+        )
+
+        extra = st.text_input(
+            "Outros ingredientes (separados por vírgula)",
+            placeholder="Ex: sal, azeite",
+        )
+        if extra:
+            pantry = pantry + [
+                item.strip() for item in extra.split(",") if item.strip()
+            ]
+
+        min_covered = st.slider("Mínimo de ingredientes em comum", 0, 10, 1)
+        limit = st.number_input("Máximo de receitas", 5, 500, 50, step=5)
+
+    st.header("📋 Receitas Sugeridas")
+
+    if pantry:
+        with profiler.section("transform"):
+            matches = match_pantry(
+                index, pantry, limit=int(limit), min_covered=int(min_covered)
+            )
+
+        if matches:
+            df = pd.DataFrame(
+                {
+                    "Receita": [match["name"] for match in matches],
+                    "Cobertura": [match["coverage"] * 100 for match in matches],
+                    "Tenho": [
+                        f"{match['covered']}/{match['total']}" for match in matches
+                    ],
+                    "Faltam": [", ".join(match["missing"]) for match in matches],
+                }
+            )
+            st.dataframe(
+                df,
+                use_container_width=True,
+                column_config={
+                    "Cobertura": st.column_config.ProgressColumn(
+                        "Cobertura", format="%.0f%%", min_value=0, max_value=100
+                    )
+                },
+            )
+
+            # Estatísticas
+            st.subheader("📊 Estatísticas")
+            col_stats1, col_stats2, col_stats3 = st.columns(3)
+
+            with col_stats1:
+                st.metric("Receitas analisadas", len(index))
+
+            with col_stats2:
+                st.metric("Receitas sugeridas", len(matches))
+
+            with col_stats3:
+                complete = sum(1 for match in matches if not match["missing"])
+                st.metric("Receitas completas", complete)
+        else:
+            st.info("Nenhuma receita usa os ingredientes selecionados.")
+    else:
+        st.info("Selecione na barra lateral os ingredientes que você tem em casa.")
+else:
+    st.info("Adicione receitas primeiro!")
+
+catalog.show_refreshing()
+finish_page(profiler)
@@ -0,0 +1,138 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from catalog import catalog_fingerprint, normalize_name, recipe_ingredient_names
+
+# Quantidade de bits ligados para cada valor possível de um byte
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+# np.bitwise_count só existe a partir do NumPy 2.0
+_bitwise_count = getattr(np, "bitwise_count", None)
+
+
+class RecipeIngredientIndex:
+    """Índice de receitas em que cada receita é um bitset dos seus ingredientes"""
+
+    def __init__(self, recipes: List[Dict]):
+        self.recipe_ids: List = []
+        self.recipe_names: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self.ingredient_labels: List[str] = []
+
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, recipe in enumerate(recipes):
+            self.recipe_ids.append(recipe.get("id"))
+            self.recipe_names.append(recipe.get("name", ""))
+            for name in recipe_ingredient_names(recipe):
+                key = normalize_name(name)
+                col = self.vocabulary.get(key)
+                if col is None:
+                    col = len(self.ingredient_labels)
+                    self.vocabulary[key] = col
+                    self.ingredient_labels.append(name)
+                rows.append(row)
+                cols.append(col)
+
+        self.n_ingredients = len(self.ingredient_labels)
+        # Linhas alinhadas em palavras de 64 bits para a contagem de bits em lote
+        n_bytes = max(1, (self.n_ingredients + 63) // 64) * 8
+        self.bits = np.zeros((len(self.recipe_ids), n_bytes), dtype=np.uint8)
+        if rows:
+            row_array = np.asarray(rows, dtype=np.intp)
+            col_array = np.asarray(cols, dtype=np.intp)
+            # Mesmo layout de np.packbits (bit mais significativo primeiro)
+            np.bitwise_or.at(
+                self.bits,
+                (row_array, col_array >> 3),
+                (128 >> (col_array & 7)).astype(np.uint8),
+            )
+        self.words = self.bits.view(np.uint64)
+        self.sizes = self.coverage(np.full(n_bytes, 255, dtype=np.uint8))
+        self.row_by_id = {
+            recipe_id: row for row, recipe_id in enumerate(self.recipe_ids)
+        }
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def encode(self, names: Iterable[str]) -> np.ndarray:
+        """Codifica uma lista de ingredientes como bitset (nomes desconhecidos são ignorados)"""
+        mask = np.zeros(self.bits.shape[1], dtype=np.uint8)
+        for name in names:
+            col = self.vocabulary.get(normalize_name(name))
+            if col is not None:
+                mask[col >> 3] |= 128 >> (col & 7)
+        return mask
+
+    def coverage(self, mask: np.ndarray) -> np.ndarray:
+        """Conta, para todas as receitas de uma vez, quantos ingredientes o bitset cobre"""
+        if _bitwise_count is not None:
+            masked = self.words & np.ascontiguousarray(mask).view(np.uint64)
+            return _bitwise_count(masked).sum(axis=1, dtype=np.int32)
+        return _POPCOUNT[self.bits & mask].sum(axis=1, dtype=np.int32)
+
+    def ingredient_columns(self, row: int) -> np.ndarray:
+        """Retorna as colunas dos ingredientes de uma receita"""
+        return np.flatnonzero(np.unpackbits(self.bits[row])[: self.n_ingredients])
+
+    def missing(self, row: int, mask: np.ndarray) -> List[str]:
+        """Lista os ingredientes de uma receita que não estão no bitset"""
+        absent = self.bits[row] & ~mask
+        columns = np.flatnonzero(np.unpackbits(absent)[: self.n_ingredients])
+        return [self.ingredient_labels[col] for col in columns]
+
+
+_index_lock = threading.Lock()
+_index_cache: Dict[str, RecipeIngredientIndex] = {}
+
+
+def get_index(recipes: List[Dict]) -> RecipeIngredientIndex:
+    """Retorna o índice do catálogo, reconstruindo apenas quando as receitas mudam"""
+    fingerprint = catalog_fingerprint(recipes)
+    with _index_lock:
+        index = _index_cache.get(fingerprint)
+        if index is None:
+            index = RecipeIngredientIndex(recipes)
+            _index_cache.clear()
+            _index_cache[fingerprint] = index
+        return index
+
+
+def match_pantry(
+    index: RecipeIngredientIndex,
+    pantry: Iterable[str],
+    limit: Optional[int] = None,
+    min_covered: int = 0,
+) -> List[Dict]:
+    """Ordena as receitas pela cobertura dos ingredientes disponíveis"""
+    mask = index.encode(pantry)
+    covered = index.coverage(mask)
+    totals = index.sizes
+    ratio = np.divide(
+        covered,
+        totals,
+        out=np.zeros(len(index), dtype=np.float64),
+        where=totals > 0,
+    )
+    missing_count = totals - covered
+
+    # np.lexsort usa a última chave como principal
+    order = np.lexsort((-covered, missing_count, -ratio))
+    order = order[covered[order] >= min_covered]
+    if limit is not None:
+        order = order[:limit]
+
+    return [
+        {
+            "id": index.recipe_ids[row],
+            "name": index.recipe_names[row],
+            "covered": int(covered[row]),
+            "total": int(totals[row]),
+            "coverage": float(ratio[row]),
+            "missing": index.missing(row, mask),
+        }
+        for row in order
+    ]
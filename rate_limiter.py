@@ -0,0 +1,234 @@
+"""Limite de requisições à API por categoria, com fila justa entre sessões
+
+Cada categoria (leituras, escritas e chat) tem um token bucket: `rate`
+requisições por segundo, com rajadas de até `burst`. Quando os tokens acabam,
+as requisições esperam em uma fila por sessão do Streamlit e os tokens são
+entregues em rodízio entre as sessões, para que uma sessão com muitas
+requisições (uma importação em lote, por exemplo) não atrase as demais.
+
+Respostas 429 da API pausam a categoria pelo tempo pedido em `Retry-After`.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+# Categorias de requisição: (requisições por segundo, rajada)
+LIMITS: Dict[str, Tuple[float, int]] = {
+    "read": (20.0, 40),
+    "write": (5.0, 10),
+    "chat": (1.0, 3),
+}
+# Tempo máximo de espera na fila antes de desistir da requisição
+MAX_WAIT = 30.0
+# Pausa usada quando uma resposta 429 não traz Retry-After
+DEFAULT_RETRY_AFTER = 1.0
+
+# Sessão usada por threads fora de uma execução de página (e sem session_scope)
+BACKGROUND = "background"
+
+_local = threading.local()
+
+
+class RateLimitError(Exception):
+    """A requisição esperou mais que o permitido na fila do limite"""
+
+
+def current_session() -> str:
+    """Sessão do Streamlit em nome da qual a thread atual faz requisições"""
+    key = getattr(_local, "session", None)
+    if key is not None:
+        return key
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return BACKGROUND
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return BACKGROUND if ctx is None else ctx.session_id
+
+
+@contextmanager
+def session_scope(key: str) -> Iterator[None]:
+    """Atribui as requisições da thread atual a uma sessão (threads de trabalho)"""
+    previous = getattr(_local, "session", None)
+    _local.session = key
+    try:
+        yield
+    finally:
+        _local.session = previous
+
+
+def request_category(method: str, endpoint: str) -> str:
+    """Categoria de limite de uma requisição"""
+    if endpoint.startswith("/chat/"):
+        return "chat"
+    return "read" if method.upper() == "GET" else "write"
+
+
+def parse_retry_after(
+    value: Optional[str], default: float = DEFAULT_RETRY_AFTER
+) -> float:
+    """Segundos pedidos no cabeçalho Retry-After (número ou data HTTP)"""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class FairTokenBucket:
+    """Token bucket cujos tokens, quando escassos, são distribuídos em rodízio
+
+    Sem fila, a requisição leva um token na hora. Com fila, cada sessão tem a
+    sua; a sessão da frente recebe o próximo token e vai para o fim do rodízio.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # Sessão -> requisições esperando, na ordem do rodízio
+        self._queues: "OrderedDict[str, Deque[object]]" = OrderedDict()
+        self._condition = threading.Condition()
+        # Métricas
+        self._granted = 0
+        self._waited = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._throttled = 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, now: float) -> bool:
+        self._refill(now)
+        if now < self._paused_until or self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _delay(self, now: float) -> float:
+        """Tempo até o próximo token"""
+        if now < self._paused_until:
+            return self._paused_until - now
+        return max((1 - self._tokens) / self.rate, 0.0)
+
+    def _is_next(self, waiter: object) -> bool:
+        queue = next(iter(self._queues.values()))
+        return queue[0] is waiter
+
+    def _remove(self, key: str, waiter: object, served: bool) -> None:
+        queue = self._queues[key]
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[key]
+        elif served:
+            # A sessão atendida vai para o fim do rodízio
+            self._queues.move_to_end(key)
+
+    def acquire(self, key: str, timeout: float = MAX_WAIT) -> float:
+        """Espera um token em nome da sessão `key`; retorna o tempo de espera"""
+        started = time.monotonic()
+        with self._condition:
+            if not self._queues and self._take(started):
+                self._granted += 1
+                return 0.0
+
+            waiter = object()
+            self._queues.setdefault(key, deque()).append(waiter)
+            served = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    is_next = self._is_next(waiter)
+                    if is_next and self._take(now):
+                        served = True
+                        break
+                    remaining = timeout - (now - started)
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise RateLimitError(
+                            f"Limite de requisições atingido: espera maior que {timeout:.0f}s"
+                        )
+                    wait = min(remaining, self._delay(now)) if is_next else remaining
+                    self._condition.wait(wait)
+            finally:
+                self._remove(key, waiter, served)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - started
+            self._granted += 1
+            self._waited += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+            return waited
+
+    def pause(self, seconds: float) -> None:
+        """Suspende a entrega de tokens (resposta 429 da API)"""
+        with self._condition:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = now
+            self._throttled += 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "granted": self._granted,
+                "waited": self._waited,
+                "wait_time": self._wait_time,
+                "max_wait": self._max_wait,
+                "timeouts": self._timeouts,
+                "throttled": self._throttled,
+                "queued": sum(len(queue) for queue in self._queues.values()),
+                "queued_sessions": len(self._queues),
+            }
+
+
+class RateLimiter:
+    """Limites por categoria de requisição, compartilhados pelas sessões"""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        max_wait: float = MAX_WAIT,
+    ):
+        self.max_wait = max_wait
+        self.buckets = {
+            category: FairTokenBucket(rate, burst)
+            for category, (rate, burst) in (limits or LIMITS).items()
+        }
+
+    def acquire(self, category: str, key: Optional[str] = None) -> float:
+        """Espera a vez da requisição; categorias sem limite passam direto"""
+        bucket = self.buckets.get(category)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire(key or current_session(), self.max_wait)
+
+    def throttle(self, category: str, seconds: float) -> None:
+        """Pausa a categoria pelo tempo pedido pela API"""
+        bucket = self.buckets.get(category)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas de cada categoria, incluindo o tempo de espera na fila"""
+        return {category: bucket.stats() for category, bucket in self.buckets.items()}
@@ -0,0 +1,169 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import catalog_fingerprint, normalize_name, recipe_ingredient_names
+
+DEFAULT_K = 5
+
+# Limite de elementos da matriz de similaridades calculada a cada bloco
+_BLOCK_ELEMENTS = 4_000_000
+
+
+class RecipeRecommender:
+    """Vizinhos mais próximos entre receitas pela similaridade de cosseno dos ingredientes"""
+
+    def __init__(self, recipes: List[Dict], k: int = DEFAULT_K, tfidf: bool = True):
+        self.k = k
+        self.recipe_ids: List = [recipe.get("id") for recipe in recipes]
+        self.recipe_names: List[str] = [recipe.get("name", "") for recipe in recipes]
+        self.row_by_id = {
+            recipe_id: row for row, recipe_id in enumerate(self.recipe_ids)
+        }
+        self.row_by_name = {
+            normalize_name(name): row for row, name in enumerate(self.recipe_names)
+        }
+
+        self.indptr, self.indices, self.data = self._build_matrix(recipes, tfidf)
+        self.neighbors, self.scores = self._compute_neighbors()
+
+    def _build_matrix(
+        self, recipes: List[Dict], tfidf: bool
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Monta a matriz receita × ingrediente no formato CSR, com linhas normalizadas"""
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        for recipe in recipes:
+            columns = {
+                vocabulary.setdefault(normalize_name(name), len(vocabulary))
+                for name in recipe_ingredient_names(recipe)
+            }
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        self.n_ingredients = len(vocabulary)
+
+        indptr_array = np.asarray(indptr, dtype=np.int64)
+        indices_array = np.asarray(indices, dtype=np.int64)
+        data: np.ndarray = np.ones(len(indices_array), dtype=np.float32)
+
+        if tfidf and len(indices_array):
+            n_recipes = len(recipes)
+            document_frequency = np.bincount(
+                indices_array, minlength=self.n_ingredients
+            )
+            idf = np.log((1 + n_recipes) / (1 + document_frequency)) + 1
+            data = idf[indices_array].astype(np.float32)
+
+        # Normaliza cada linha (norma L2) para que o produto escalar seja o cosseno
+        lengths = np.diff(indptr_array)
+        row_of_entry = np.repeat(np.arange(len(lengths)), lengths)
+        norms = np.sqrt(
+            np.bincount(row_of_entry, weights=data**2, minlength=len(lengths))
+        )
+        data = data / norms[row_of_entry].astype(np.float32)
+        return indptr_array, indices_array, data
+
+    def _compute_neighbors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Calcula em lote os k vizinhos de todas as receitas"""
+        n_recipes = len(self.recipe_ids)
+        k = min(self.k, max(n_recipes - 1, 0))
+        neighbors = np.full((n_recipes, k), -1, dtype=np.int32)
+        scores = np.zeros((n_recipes, k), dtype=np.float32)
+        nnz = len(self.indices)
+        if k == 0 or nnz == 0:
+            return neighbors, scores
+
+        # Índice invertido (CSC): para cada ingrediente, as receitas que o usam
+        lengths = np.diff(self.indptr)
+        row_of_entry = np.repeat(np.arange(n_recipes), lengths)
+        by_column = np.argsort(self.indices, kind="stable")
+        column_rows = row_of_entry[by_column]
+        column_data = self.data[by_column]
+        frequency = np.bincount(self.indices, minlength=self.n_ingredients)
+        column_ptr = np.concatenate(([0], np.cumsum(frequency)))
+
+        block_size = max(1, min(n_recipes, _BLOCK_ELEMENTS // n_recipes))
+        for first in range(0, n_recipes, block_size):
+            last = min(first + block_size, n_recipes)
+            lo, hi = self.indptr[first], self.indptr[last]
+            columns = self.indices[lo:hi]
+            counts = frequency[columns]
+
+            # Expande cada ingrediente do bloco nas receitas que também o usam
+            offsets = column_ptr[columns] - (np.cumsum(counts) - counts)
+            positions = np.repeat(offsets, counts) + np.arange(counts.sum())
+            sources = np.repeat(row_of_entry[lo:hi] - first, counts)
+            weights = np.repeat(self.data[lo:hi], counts) * column_data[positions]
+            similarities = np.bincount(
+                sources * n_recipes + column_rows[positions],
+                weights=weights,
+                minlength=(last - first) * n_recipes,
+            ).reshape(last - first, n_recipes)
+            similarities[np.arange(last - first), np.arange(first, last)] = -np.inf
+
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(similarities, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            valid = top_scores > 0
+            neighbors[first:last] = np.where(valid, top, -1)
+            scores[first:last] = np.where(valid, top_scores, 0.0)
+
+        return neighbors, scores
+
+    def _describe(self, row: int, score: float) -> Dict:
+        return {
+            "id": self.recipe_ids[row],
+            "name": self.recipe_names[row],
+            "score": float(score),
+        }
+
+    def similar(self, recipe_id, k: Optional[int] = None) -> List[Dict]:
+        """Retorna as receitas mais parecidas com uma receita (consulta à tabela de vizinhos)"""
+        row = self.row_by_id.get(recipe_id)
+        if row is None:
+            return []
+        return [
+            self._describe(neighbor, score)
+            for neighbor, score in zip(self.neighbors[row][:k], self.scores[row][:k])
+            if neighbor >= 0
+        ]
+
+    def suggest(self, recipe_names: Iterable[str], k: int = DEFAULT_K) -> List[Dict]:
+        """Sugere receitas parecidas com um conjunto de receitas, excluindo as já escolhidas"""
+        rows = {
+            self.row_by_name[key]
+            for key in map(normalize_name, recipe_names)
+            if key in self.row_by_name
+        }
+        totals: Dict[int, float] = {}
+        for row in rows:
+            for neighbor, score in zip(self.neighbors[row], self.scores[row]):
+                if neighbor >= 0 and neighbor not in rows:
+                    totals[int(neighbor)] = totals.get(int(neighbor), 0.0) + float(
+                        score
+                    )
+        best = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [self._describe(row, score) for row, score in best]
+
+
+_recommender_lock = threading.Lock()
+_recommender_cache: Dict[Tuple[str, int, bool], RecipeRecommender] = {}
+
+
+def get_recommender(
+    recipes: List[Dict], k: int = DEFAULT_K, tfidf: bool = True
+) -> RecipeRecommender:
+    """Retorna o recomendador do catálogo, recalculando apenas quando as receitas mudam"""
+    key = (catalog_fingerprint(recipes), k, tfidf)
+    with _recommender_lock:
+        recommender = _recommender_cache.get(key)
+        if recommender is None:
+            recommender = RecipeRecommender(recipes, k=k, tfidf=tfidf)
+            _recommender_cache.clear()
+            _recommender_cache[key] = recommender
+        return recommender
@@ -0,0 +1,745 @@
+"""Acesso aos dados do catálogo compartilhado pelo app e pelas páginas
+
+Receitas e ingredientes são buscados uma vez por sessão e reaproveitados entre
+reruns e trocas de página até expirarem (`max_age`) ou até uma escrita feita
+pela própria sessão. Erros de leitura e escrita são exibidos com `st.error`,
+como as páginas já faziam.
+
+Na subida do processo, `warmup` pode buscar o catálogo em segundo plano
+enquanto o Streamlit inicia (veja serve.py); a primeira sessão aproveita o
+resultado em vez de esperar por uma nova chamada à API.
+
+A página inicial chama `start_prefetch`, que prepara em segundo plano os dados
+da sessão e seus derivados (índices de busca e por nome, veja DERIVED) para
+as outras páginas. Essas buscas usam um pool pequeno e compartilhado, têm
+tempo máximo e são canceladas por escritas da sessão.
+
+Cada página pode declarar um limite de espera (`set_budget`): passado o prazo,
+as leituras retornam os dados disponíveis, a busca continua em segundo plano e
+`show_refreshing` recarrega a página quando ela termina.
+
+A página de receitas lista só id e nome (`recipe_summaries`); a receita completa
+é buscada ao ser aberta (`recipe_details`), e as próximas prováveis são
+aquecidas em segundo plano (`prefetch_details`).
+"""
+
+import importlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from api_client import COUNTED, MenuMVPAPIClient, api_client
+from metrics import cache_lookup
+from rate_limiter import BACKGROUND, current_session, session_scope
+from table_view import NameIndex
+
+MAX_AGE = 60
+
+# Conjunto de dados -> (método do cliente, nome usado nas mensagens de erro)
+DATASETS: Dict[str, Tuple[str, str]] = {
+    "recipes": ("get_recipes", "receitas"),
+    "ingredients": ("get_ingredients", "ingredientes"),
+    # Só id e nome: lista e seletor da página de receitas (veja recipe_details)
+    "recipe_summaries": ("get_recipe_summaries", "receitas"),
+}
+# Conjuntos afetados pelas escritas em receitas
+RECIPE_DATASETS = ("recipes", "recipe_summaries")
+
+# Tempo máximo que uma leitura espera pela busca da subida ainda em andamento
+WARMUP_WAIT = 10.0
+
+# Busca em segundo plano das sessões: threads do processo, buscas simultâneas
+# aceitas e tempo máximo de cada uma
+PREFETCH_WORKERS = 2
+PREFETCH_MAX_PENDING = 8
+PREFETCH_TIMEOUT = 30.0
+
+# Limite de espera padrão de uma página (veja set_budget) e intervalo com que a
+# página montada com dados incompletos verifica se a busca terminou
+PAGE_BUDGET = 0.3
+REFRESH_POLL = 0.5
+
+# Chaves no session_state
+_STATE_KEY = "catalog_data"
+_DERIVED_KEY = "catalog_derived"
+_JOB_KEY = "catalog_prefetch"
+_BUDGET_KEY = "catalog_budget"
+
+
+class CatalogWarmup:
+    """Busca do catálogo feita uma vez por processo, fora de qualquer sessão
+
+    Os dados valem para as sessões que abrirem até `max_age` segundos depois da
+    busca. Módulos em `modules` são importados na mesma thread após a busca,
+    para que a primeira página que os usa não pague a importação.
+    """
+
+    def __init__(self, client: MenuMVPAPIClient, max_age: float = MAX_AGE):
+        self.client = client
+        self.max_age = max_age
+        self._data: Dict[str, Tuple[float, List[Dict]]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(
+        self, names: Iterable[str] = tuple(DATASETS), modules: Iterable[str] = ()
+    ) -> threading.Thread:
+        """Inicia a busca em segundo plano (apenas na primeira chamada)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(list(names), list(modules)),
+                    name="catalog-warmup",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._thread
+
+    def _run(self, names: List[str], modules: List[str]) -> None:
+        for name in names:
+            try:
+                data = getattr(self.client, DATASETS[name][0])()
+            except Exception:
+                continue
+            with self._lock:
+                self._data[name] = (time.monotonic(), data)
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+
+    def take(
+        self, name: str, timeout: float = WARMUP_WAIT
+    ) -> Optional[Tuple[float, List[Dict]]]:
+        """Dados da busca da subida, esperando por ela se ainda estiver em andamento"""
+        thread = self._thread
+        if thread is None:
+            return None
+        with self._lock:
+            entry = self._data.get(name)
+        if entry is None and thread.is_alive():
+            thread.join(timeout)
+            with self._lock:
+                entry = self._data.get(name)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            return None
+        return entry
+
+    def discard(self, name: str) -> None:
+        """Descarta um conjunto, por exemplo após uma escrita"""
+        with self._lock:
+            self._data.pop(name, None)
+
+
+def _dataframe(records: List[Dict]):
+    import pandas as pd
+
+    return pd.DataFrame(records)
+
+
+def _by_name(records: List[Dict]) -> Dict[str, Dict]:
+    index: Dict[str, Dict] = {}
+    for record in records:
+        index.setdefault(record["name"], record)
+    return index
+
+
+def _names(records: List[Dict]) -> List[str]:
+    return [record["name"] for record in records]
+
+
+def _pantry_index(records: List[Dict]):
+    from pantry import get_index
+
+    return get_index(records)
+
+
+def _recommender(records: List[Dict]):
+    from recommendations import get_recommender
+
+    return get_recommender(records)
+
+
+def _resolver(records: List[Dict]):
+    from ingredient_resolver import IngredientResolver
+
+    return IngredientResolver(records)
+
+
+# Dados derivados de cada conjunto: (conjunto, nome) -> construção
+DERIVED: Dict[Tuple[str, str], Callable[[List[Dict]], Any]] = {
+    ("ingredients", "dataframe"): _dataframe,
+    ("ingredients", "search_index"): NameIndex,
+    ("ingredients", "resolver"): _resolver,
+    ("recipes", "dataframe"): _dataframe,
+    ("recipes", "search_index"): NameIndex,
+    ("recipe_summaries", "search_index"): NameIndex,
+    ("recipes", "by_name"): _by_name,
+    ("recipes", "names"): _names,
+    ("recipes", "pantry_index"): _pantry_index,
+    ("recipes", "recommender"): _recommender,
+}
+
+# Derivados preparados pela busca em segundo plano; os DataFrames (as tabelas das
+# páginas usam o search_index) e o resolver (usado só ao cadastrar receitas)
+# ficam de fora e só são montados se pedidos
+PREFETCH_DERIVED = tuple(
+    key for key in DERIVED if key[1] not in ("dataframe", "resolver")
+)
+
+
+# Chamados após cada escrita no catálogo, com os conjuntos afetados (o índice do
+# chat, por exemplo, é do processo e não passa pela memória das sessões)
+_write_listeners: Dict[Callable[[Tuple[str, ...]], None], None] = {}
+
+
+def on_write(listener: Callable[[Tuple[str, ...]], None]) -> None:
+    """Registra uma função chamada após as escritas (uma vez por função)"""
+    _write_listeners[listener] = None
+
+
+class PrefetchJob:
+    """Busca em segundo plano dos dados de uma sessão
+
+    Cada conjunto tem um evento sinalizado quando sua busca termina (com ou sem
+    sucesso), para que leituras da página possam esperar por ela em vez de
+    repetir a chamada à API.
+    """
+
+    def __init__(self, names: List[str], timeout: float, session: str = BACKGROUND):
+        self.names = names
+        # Sessão a quem as requisições são atribuídas nos limites da API
+        self.session = session
+        self.deadline = time.monotonic() + timeout
+        self.future: Optional[Future] = None
+        self._cancelled = threading.Event()
+        self._ready = {name: threading.Event() for name in names}
+        # Falhas da API por conjunto, repassadas à leitura que esperava por ele
+        self.errors: Dict[str, Exception] = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def expired(self) -> bool:
+        return self.cancelled or time.monotonic() > self.deadline
+
+    def covers(self, name: str) -> bool:
+        return name in self._ready
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Espera o fim do trabalho"""
+        if self.future is not None and not self.future.cancelled():
+            self.future.result(timeout)
+
+    def cancel(self) -> None:
+        """Interrompe a busca entre uma etapa e outra"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+        self._release()
+
+    def wait(self, name: str, timeout: float) -> None:
+        """Espera a busca de um conjunto, se fizer parte deste trabalho"""
+        event = self._ready.get(name)
+        if event is not None:
+            event.wait(timeout)
+
+    def _release(self, name: Optional[str] = None) -> None:
+        for key, event in self._ready.items():
+            if name is None or key == name:
+                event.set()
+
+
+class LatencyBudget:
+    """Prazo de uma execução da página para obter os dados do catálogo"""
+
+    def __init__(self, seconds: float, page: Optional[str]):
+        self.deadline = time.monotonic() + seconds
+        self.page = page
+        # Conjuntos entregues incompletos por falta de tempo nesta execução
+        self.refreshing: List[str] = []
+
+    def remaining(self) -> float:
+        return max(self.deadline - time.monotonic(), 0.0)
+
+
+def _current_page() -> Optional[str]:
+    ctx = get_script_run_ctx()
+    return None if ctx is None else ctx.page_script_hash
+
+
+@st.fragment(run_every=REFRESH_POLL)
+def _refresh_status(job: PrefetchJob, labels: List[str]) -> None:
+    """Avisa a atualização em andamento e recarrega a página quando ela termina"""
+    if job.done():
+        st.rerun()
+    st.caption(f"🔄 Atualizando {', '.join(labels)} em segundo plano...")
+
+
+class CatalogRepository:
+    """Leituras memorizadas por sessão e escritas que invalidam a memória"""
+
+    def __init__(
+        self,
+        client: MenuMVPAPIClient,
+        max_age: float = MAX_AGE,
+        state: Optional[MutableMapping] = None,
+        warmup: Optional[CatalogWarmup] = None,
+        prefetch_workers: int = PREFETCH_WORKERS,
+        prefetch_pending: int = PREFETCH_MAX_PENDING,
+    ):
+        self.client = client
+        self.max_age = max_age
+        self.warmup = warmup
+        self.prefetch_workers = prefetch_workers
+        self._state = state
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(prefetch_pending)
+
+    @property
+    def _session_state(self) -> MutableMapping:
+        return self._state if self._state is not None else st.session_state
+
+    def _session(self, key: str, default: Any) -> Any:
+        state = self._session_state
+        if key not in state:
+            state[key] = default
+        return state[key]
+
+    @property
+    def _entries(self) -> Dict[str, Tuple[float, List[Dict]]]:
+        """Dados já buscados pela sessão: nome -> (momento da busca, registros)"""
+        return self._session(_STATE_KEY, {})
+
+    @property
+    def _derived(self) -> Dict[Tuple[str, str], Tuple[List[Dict], Any]]:
+        """Dados derivados: (conjunto, nome) -> (registros de origem, valor)"""
+        return self._session(_DERIVED_KEY, {})
+
+    @property
+    def _job(self) -> Optional[PrefetchJob]:
+        return self._session(_JOB_KEY, None)
+
+    def _running_job(self) -> Optional[PrefetchJob]:
+        """Busca em segundo plano ainda útil (não terminada nem cancelada)"""
+        job = self._job
+        if job is None or job.done() or job.cancelled:
+            return None
+        return job
+
+    def _fresh(self, name: str) -> Optional[Tuple[float, List[Dict]]]:
+        entry = self._entries.get(name)
+        if entry is None or time.monotonic() - entry[0] > self.max_age:
+            return None
+        return entry
+
+    def _fetch(self, name: str) -> List[Dict]:
+        method, _ = DATASETS[name]
+        return getattr(self.client, method)()
+
+    def _load_entry(self, name: str, use_warmup: bool) -> Tuple[float, List[Dict]]:
+        """Usa a busca da subida, se permitido e disponível, ou chama a API"""
+        entry = None
+        if use_warmup and self.warmup is not None:
+            entry = self.warmup.take(name)
+        if entry is None:
+            entry = (time.monotonic(), self._fetch(name))
+        return entry
+
+    def get(self, name: str, force: bool = False, wait: bool = False) -> List[Dict]:
+        """Retorna o conjunto de dados, buscando na API se necessário
+
+        Se a busca em segundo plano da sessão ainda estiver trazendo o conjunto,
+        espera por ela. Com `wait`, o prazo da página é ignorado e o conjunto
+        vem completo (exportações). Exceções do cliente são propagadas.
+        """
+        entries = self._entries
+        if not force:
+            entry = self._fresh(name)
+            cache_lookup("catalog", "miss" if entry is None else "hit")
+            if entry is not None:
+                return entry[1]
+            budget = None if wait else self._budget()
+            if budget is not None:
+                return self._get_within(name, budget)
+            job = self._running_job()
+            if job is not None:
+                job.wait(name, WARMUP_WAIT)
+            entry = self._fresh(name)
+            if entry is not None:
+                return entry[1]
+        entry = self._load_entry(name, not force and name not in entries)
+        entries[name] = entry
+        return entry[1]
+
+    def _get_within(self, name: str, budget: LatencyBudget) -> List[Dict]:
+        """Busca o conjunto em segundo plano e espera até o prazo da página
+
+        Se a busca não terminar a tempo, retorna os dados vencidos da sessão (ou
+        lista vazia) e marca o conjunto como em atualização.
+        """
+        job = self._job
+        if job is not None and job.done() and name in job.errors:
+            # A busca que a página esperava falhou: o erro aparece uma vez
+            raise job.errors.pop(name)
+        job = self._running_job() or self.start_prefetch(names=[name], derived=[])
+        if job is None or not job.covers(name):
+            # Sem vaga para buscar em segundo plano: busca e espera aqui
+            loaded = self._load_entry(name, name not in self._entries)
+            self._entries[name] = loaded
+            return loaded[1]
+
+        job.wait(name, budget.remaining())
+        entry = self._fresh(name)
+        if entry is not None:
+            return entry[1]
+        if job.done() and name in job.errors:
+            raise job.errors.pop(name)
+        if name not in budget.refreshing:
+            budget.refreshing.append(name)
+        stale = self._entries.get(name)
+        return [] if stale is None else stale[1]
+
+    def set_budget(self, seconds: Optional[float] = PAGE_BUDGET) -> None:
+        """Declara quanto a execução atual da página aceita esperar pelos dados
+
+        Chamado no topo da página. Passado o prazo, leituras que dependem da API
+        retornam os dados disponíveis (vencidos, ou lista vazia) enquanto a busca
+        continua em segundo plano; `show_refreshing` avisa e recarrega a página
+        quando ela termina. None remove o limite.
+        """
+        state = self._session_state
+        if seconds is None:
+            state.pop(_BUDGET_KEY, None)
+        else:
+            state[_BUDGET_KEY] = LatencyBudget(seconds, _current_page())
+
+    def _budget(self) -> Optional[LatencyBudget]:
+        """Limite da página em execução (o de outra página não vale aqui)"""
+        budget = self._session_state.get(_BUDGET_KEY)
+        if budget is None or budget.page != _current_page():
+            return None
+        return budget
+
+    def refreshing(self) -> List[str]:
+        """Conjuntos entregues incompletos nesta execução da página"""
+        budget = self._budget()
+        return [] if budget is None else list(budget.refreshing)
+
+    def show_refreshing(self) -> None:
+        """Marca a página como em atualização, se algum dado veio incompleto"""
+        names = self.refreshing()
+        job = self._job
+        if names and job is not None:
+            _refresh_status(job, [DATASETS[name][1] for name in names])
+
+    def peek(self, name: str) -> Optional[List[Dict]]:
+        """Conjunto já memorizado na sessão, sem buscar (None se ausente ou vencido)"""
+        entry = self._fresh(name)
+        return None if entry is None else entry[1]
+
+    def fetched_at(self, name: str) -> Optional[float]:
+        """Momento (time.monotonic) da busca do conjunto memorizado na sessão"""
+        entry = self._entries.get(name)
+        return None if entry is None else entry[0]
+
+    def counts(self) -> Dict[str, int]:
+        """Totais do catálogo sem buscar as listas
+
+        Vêm do cliente (endpoint de estatísticas ou totais das últimas listagens);
+        os que faltam são contados nos conjuntos já carregados na sessão. Conjuntos
+        sem total conhecido ficam de fora do resultado.
+        """
+        counts = self.client.get_counts(fetch_missing=False)
+        for name in COUNTED:
+            data = None if name in counts else self.peek(name)
+            if data is not None:
+                counts[name] = len(data)
+        return counts
+
+    def load(self, name: str, wait: bool = False) -> List[Dict]:
+        """Como `get`, mas exibe o erro na página e retorna lista vazia"""
+        try:
+            return self.get(name, wait=wait)
+        except Exception as e:
+            st.error(f"Erro ao carregar {DATASETS[name][1]}: {str(e)}")
+            return []
+
+    def load_recipes(self) -> List[Dict]:
+        """Receitas do catálogo"""
+        return self.load("recipes")
+
+    def load_ingredients(self) -> List[Dict]:
+        """Ingredientes do catálogo"""
+        return self.load("ingredients")
+
+    def load_recipe_summaries(self) -> List[Dict]:
+        """Receitas do catálogo só com id e nome"""
+        return self.load("recipe_summaries")
+
+    def recipe_details(self, name: str) -> Optional[Dict]:
+        """Receita completa, buscada sob demanda (LRU compartilhado do cliente)"""
+        try:
+            return self.client.get_recipe_details(name)
+        except Exception as e:
+            st.error(f"Erro ao carregar a receita '{name}': {str(e)}")
+            return None
+
+    def prefetch_details(self, names: Iterable[str]) -> int:
+        """Busca em segundo plano as receitas completas que a página deve pedir
+
+        Usa o pool das buscas em segundo plano; receitas já em cache (ou sendo
+        buscadas) são ignoradas, assim como o pedido todo se o limite de buscas
+        simultâneas do processo tiver sido atingido. Retorna quantas receitas
+        foram agendadas.
+        """
+        missing = [
+            name for name in names if not self.client.cached_recipe_details(name)
+        ]
+        if not missing or not self._slots.acquire(blocking=False):
+            return 0
+        try:
+            future = self._executor().submit(
+                self._run_detail_prefetch, missing, current_session()
+            )
+        except RuntimeError:
+            self._slots.release()
+            return 0
+        future.add_done_callback(lambda _: self._slots.release())
+        return len(missing)
+
+    def _run_detail_prefetch(self, names: List[str], session: str) -> None:
+        with session_scope(session):
+            for name in names:
+                try:
+                    self.client.get_recipe_details(name)
+                except Exception:
+                    # A página mostra o erro se a receita for pedida de novo
+                    pass
+
+    def derived(self, name: str, key: str) -> Any:
+        """Dado derivado do conjunto (DataFrame, índice por nome...), memorizado
+
+        O valor é reconstruído apenas quando os registros do conjunto mudam.
+        """
+        data = self.get(name)
+        cached = self._derived.get((name, key))
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        value = DERIVED[(name, key)](data)
+        self._derived[(name, key)] = (data, value)
+        return value
+
+    def start_prefetch(
+        self,
+        names: Iterable[str] = tuple(DATASETS),
+        derived: Iterable[Tuple[str, str]] = PREFETCH_DERIVED,
+        timeout: float = PREFETCH_TIMEOUT,
+    ) -> Optional[PrefetchJob]:
+        """Aquece em segundo plano os conjuntos e seus derivados para a sessão
+
+        Não bloqueia a página: retorna o trabalho em andamento (o mesmo, se já
+        houver um), ou None se não houver nada a buscar ou se o limite de buscas
+        simultâneas do processo tiver sido atingido.
+        """
+        job = self._running_job()
+        if job is not None:
+            return job
+        entries = self._entries
+        derived_values = self._derived
+        names = list(names)
+
+        def stale(key: Tuple[str, str]) -> bool:
+            entry = self._fresh(key[0])
+            cached = derived_values.get(key)
+            return entry is None or cached is None or cached[0] is not entry[1]
+
+        keys = [key for key in derived if key[0] in names and stale(key)]
+        missing = [name for name in names if self._fresh(name) is None]
+        if not missing and not keys:
+            return None
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        job = PrefetchJob(missing, timeout, current_session())
+        try:
+            job.future = self._executor().submit(
+                self._run_prefetch, job, entries, derived_values, keys
+            )
+        except RuntimeError:
+            self._slots.release()
+            return None
+        job.future.add_done_callback(lambda _: self._slots.release())
+        self._session_state[_JOB_KEY] = job
+        return job
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers,
+                    thread_name_prefix="catalog-prefetch",
+                )
+            return self._pool
+
+    def _run_prefetch(
+        self,
+        job: PrefetchJob,
+        entries: Dict,
+        derived_values: Dict,
+        keys: List[Tuple[str, str]],
+    ) -> None:
+        """Roda na thread de busca: não usa o st.session_state, só os dicionários"""
+        try:
+            for name in job.names:
+                if job.expired():
+                    return
+                try:
+                    with session_scope(job.session):
+                        entry = self._load_entry(name, name not in entries)
+                except Exception as e:
+                    entry = None
+                    job.errors[name] = e
+                if entry is not None and not job.cancelled:
+                    entries[name] = entry
+                job._release(name)
+
+            for name, key in keys:
+                entry = entries.get(name)
+                if job.expired() or entry is None:
+                    continue
+                try:
+                    value = DERIVED[(name, key)](entry[1])
+                except Exception:
+                    continue
+                if not job.cancelled:
+                    derived_values[(name, key)] = (entry[1], value)
+        finally:
+            job._release()
+
+    def cancel_prefetch(self) -> None:
+        """Cancela a busca em segundo plano da sessão, se houver"""
+        job = self._job
+        if job is not None:
+            job.cancel()
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Descarta um conjunto (ou todos) da memória da sessão"""
+        # Uma busca em andamento traria dados anteriores à mudança
+        self.cancel_prefetch()
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def _write(self, names: Tuple[str, ...], error: str, method: str, *args) -> Any:
+        """Chama o método de escrita do cliente e invalida os conjuntos afetados"""
+        try:
+            result = getattr(self.client, method)(*args)
+        except Exception as e:
+            st.error(f"{error}: {str(e)}")
+            return None
+        self._written(names)
+        return result
+
+    def _written(self, names: Tuple[str, ...]) -> None:
+        for name in names:
+            self.invalidate(name)
+            if self.warmup is not None:
+                self.warmup.discard(name)
+        for listener in list(_write_listeners):
+            listener(names)
+
+    def create_ingredient(self, name: str) -> Optional[Dict]:
+        """Adiciona um ingrediente"""
+        return self._write(
+            ("ingredients",),
+            "Erro ao adicionar ingrediente",
+            "create_ingredient",
+            name,
+        )
+
+    def delete_ingredient(self, ingredient_id: int) -> Optional[Dict]:
+        """Remove um ingrediente (as receitas que o usavam também mudam)"""
+        return self._write(
+            ("ingredients", *RECIPE_DATASETS),
+            "Erro ao deletar ingrediente",
+            "delete_ingredient",
+            ingredient_id,
+        )
+
+    def merge_ingredients(
+        self,
+        plan,
+        dry_run: bool = False,
+        progress: Optional[Callable[[int, int], Any]] = None,
+    ):
+        """Executa (ou simula) a mesclagem de duplicados (veja `dedup.apply_merges`)
+
+        Antes, o plano é conferido com as receitas completas (sem o prazo da
+        página), para não remover duplicados ainda usados; se elas não puderem
+        ser lidas, a exceção do cliente é propagada e nada é removido. As falhas
+        ficam no relatório retornado; as receitas também mudam, porque trazem os
+        nomes dos ingredientes.
+        """
+        from dedup import apply_merges, recipe_usage, skip_used
+
+        if not plan.include_used:
+            plan = skip_used(plan, recipe_usage(self.get("recipes", wait=True)))
+        report = apply_merges(
+            self.client,
+            plan,
+            dry_run=dry_run,
+            session=current_session(),
+            progress=progress,
+        )
+        if not dry_run and (report.deleted or report.renamed):
+            self._written(("ingredients", *RECIPE_DATASETS))
+        return report
+
+    def create_recipe(
+        self, name: str, instructions: str, ingredients: List[Dict]
+    ) -> Optional[Dict]:
+        """Adiciona uma receita (a API pode cadastrar ingredientes novos)"""
+        return self._write(
+            (*RECIPE_DATASETS, "ingredients"),
+            "Erro ao adicionar receita",
+            "create_recipe",
+            name,
+            instructions,
+            ingredients,
+        )
+
+    def create_recipes_bulk(self, recipes: List[Dict]) -> Optional[List[Dict]]:
+        """Adiciona várias receitas de uma vez (importação de arquivo)"""
+        return self._write(
+            (*RECIPE_DATASETS, "ingredients"),
+            "Erro ao importar receitas",
+            "create_recipes_bulk",
+            recipes,
+        )
+
+
+# Instâncias usadas pelo app e pelas páginas
+warmup = CatalogWarmup(api_client)
+catalog = CatalogRepository(api_client, warmup=warmup)
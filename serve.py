@@ -0,0 +1,35 @@
+"""Sobe o app buscando o catálogo em paralelo à inicialização do Streamlit
+
+Uso:
+    python serve.py [opções do streamlit run]
+
+Equivale a `streamlit run app.py`, mas a busca de receitas e ingredientes (e a
+importação do pandas) começa antes do servidor aceitar conexões, em vez de
+acontecer no primeiro acesso. Com MENU_MVP_METRICS_PORT definida, o servidor de
+métricas (veja metrics.py) também sobe antes da primeira sessão.
+"""
+
+import os
+import sys
+from typing import List, Optional
+
+from streamlit.web import cli
+
+from metrics import start_metrics_server
+from repository import warmup
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Importados em segundo plano depois da busca: usados pelas páginas com tabelas
+WARM_MODULES = ("pandas",)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    warmup.start(modules=WARM_MODULES)
+    start_metrics_server()
+    sys.argv = ["streamlit", "run", APP, *(sys.argv[1:] if argv is None else argv)]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,486 @@
+"""Servidor local que imita a API do Menu MVP para testes de carga e desempenho
+
+Uso:
+    python stub_server.py --port 8000 --ingredients 10000 --recipes 10000 --latency 0.05
+
+e aponte o app para ele com MENU_MVP_API_URL=http://127.0.0.1:8000.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from synthetic_data import generate_catalog
+
+
+@dataclass
+class StubConfig:
+    """Comportamento simulado do servidor"""
+
+    # Atraso fixo e variação aleatória de cada resposta, em segundos
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Atraso extra das respostas do chat (geração do modelo)
+    chat_latency: float = 0.0
+    # Fração das requisições que falham com HTTP 500
+    error_rate: float = 0.0
+    # Atraso da primeira requisição e das que chegam após `idle_timeout` sem uso
+    cold_start: float = 0.0
+    idle_timeout: Optional[float] = None
+    seed: Optional[int] = None
+    # Oferece GET /stats com os totais (a API real pode não ter o endpoint)
+    stats_endpoint: bool = False
+    # Requisições por segundo aceitas; acima disso, responde 429 com Retry-After
+    rate_limit: Optional[float] = None
+
+
+class StubAPI:
+    """Estado em memória da API simulada (ingredientes e receitas)"""
+
+    def __init__(
+        self,
+        ingredients: Optional[List[Dict]] = None,
+        recipes: Optional[List[Dict]] = None,
+        config: Optional[StubConfig] = None,
+    ):
+        self.config = config or StubConfig()
+        self.ingredients: Dict[int, Dict] = {
+            item["id"]: item for item in ingredients or []
+        }
+        self.recipes: Dict[int, Dict] = {item["id"]: item for item in recipes or []}
+        self._ingredient_names = {item["name"] for item in self.ingredients.values()}
+        self._next_ingredient_id = max(self.ingredients, default=0) + 1
+        self._next_recipe_id = max(self.recipes, default=0) + 1
+        self.requests: Counter = Counter()
+        # Conexões TCP aceitas (com keep-alive, cada cliente reaproveita as suas)
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._encoded: Dict[str, bytes] = {}
+        self._last_request: Optional[float] = None
+        self._cold_lock = threading.Lock()
+        # Token bucket do rate_limit (rajada de até um segundo de requisições)
+        self._allowance = self.config.rate_limit or 0.0
+        self._allowance_at = time.monotonic()
+
+    # Comportamento simulado
+    def simulate(self) -> bool:
+        """Aplica partida a frio e latência; retorna False se a requisição deve falhar"""
+        config = self.config
+        with self._cold_lock:
+            now = time.monotonic()
+            cold = self._last_request is None or (
+                config.idle_timeout is not None
+                and now - self._last_request > config.idle_timeout
+            )
+            if cold and config.cold_start:
+                # Requisições simultâneas esperam a mesma partida a frio
+                time.sleep(config.cold_start)
+            self._last_request = time.monotonic()
+
+        with self._lock:
+            delay = config.latency + self._random.uniform(0, config.jitter)
+            failed = self._random.random() < config.error_rate
+        if delay:
+            time.sleep(delay)
+        return not failed
+
+    def admit(self) -> Optional[float]:
+        """Aplica o rate_limit: None se aceita, ou os segundos até a próxima vaga"""
+        rate = self.config.rate_limit
+        if not rate:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(
+                rate, self._allowance + (now - self._allowance_at) * rate
+            )
+            self._allowance_at = now
+            if self._allowance >= 1:
+                self._allowance -= 1
+                return None
+            return (1 - self._allowance) / rate
+
+    def count(self, method: str, route: str) -> None:
+        """Contabiliza a requisição por método e rota"""
+        with self._lock:
+            self.requests[(method, route)] += 1
+
+    def count_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def encoded(self, key: str, build) -> bytes:
+        """JSON das listagens, serializado uma vez e reaproveitado até a próxima escrita"""
+        with self._lock:
+            body = self._encoded.get(key)
+            if body is None:
+                body = json.dumps(build(), ensure_ascii=False).encode()
+                self._encoded[key] = body
+            return body
+
+    def _invalidate(self) -> None:
+        self._encoded.clear()
+
+    # Ingredientes
+    def create_ingredient(self, name: str) -> Tuple[int, Dict]:
+        with self._lock:
+            if name in self._ingredient_names:
+                return 400, {"detail": f"Ingrediente '{name}' já existe"}
+            ingredient_id = self._next_ingredient_id
+            self._next_ingredient_id += 1
+            ingredient = {"id": ingredient_id, "name": name}
+            self.ingredients[ingredient_id] = ingredient
+            self._ingredient_names.add(name)
+            self._invalidate()
+        return 200, ingredient
+
+    def update_ingredient(self, ingredient_id: int, name: str) -> Tuple[int, Dict]:
+        with self._lock:
+            if ingredient_id not in self.ingredients:
+                return 404, {"detail": "Ingrediente não encontrado"}
+            self._ingredient_names.discard(self.ingredients[ingredient_id]["name"])
+            self._ingredient_names.add(name)
+            self.ingredients[ingredient_id] = {"id": ingredient_id, "name": name}
+            self._invalidate()
+            return 200, self.ingredients[ingredient_id]
+
+    def delete_ingredient(self, ingredient_id: int) -> Tuple[int, Dict]:
+        with self._lock:
+            ingredient = self.ingredients.pop(ingredient_id, None)
+            if ingredient is None:
+                return 404, {"detail": "Ingrediente não encontrado"}
+            self._ingredient_names.discard(ingredient["name"])
+            self._invalidate()
+        return 200, {"message": "Ingrediente removido com sucesso"}
+
+    # Receitas
+    def create_recipe(self, data: Dict) -> Tuple[int, Dict]:
+        if not isinstance(data, dict) or not data.get("name"):
+            return 422, {"detail": "Campo 'name' obrigatório"}
+        with self._lock:
+            recipe = {
+                "id": self._next_recipe_id,
+                "name": data["name"],
+                "instructions": data.get("instructions") or "",
+                "ingredients": [
+                    {
+                        "name": item.get("name") or item.get("ingredient_name"),
+                        "quantity": item.get("quantity"),
+                        "unit": item.get("unit"),
+                    }
+                    for item in data.get("ingredients") or []
+                ],
+            }
+            self._next_recipe_id += 1
+            self.recipes[recipe["id"]] = recipe
+            self._invalidate()
+        return 200, recipe
+
+    def delete_recipe(self, recipe_id: int) -> Tuple[int, Dict]:
+        with self._lock:
+            if self.recipes.pop(recipe_id, None) is None:
+                return 404, {"detail": "Receita não encontrada"}
+            self._invalidate()
+        return 200, {"message": "Receita removida com sucesso"}
+
+    def recipe_by_name(self, name: str) -> Tuple[int, Dict]:
+        with self._lock:
+            for recipe in self.recipes.values():
+                if recipe["name"] == name:
+                    return 200, recipe
+        return 404, {"detail": "Receita não encontrada"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Roteia as requisições HTTP para o estado da API simulada"""
+
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em escritas separadas: sem isso o Nagle soma ~40 ms
+    disable_nagle_algorithm = True
+    api: StubAPI
+
+    def setup(self):
+        super().setup()
+        self.api.count_connection()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(
+        self,
+        status: int,
+        body,
+        content_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        query = parse_qs(url.query)
+        data = self._body() if method in ("POST", "PUT") else None
+        parts = [part for part in path.split("/") if part]
+        route = "/" + "/".join(parts[:1] + (["id"] if parts[1:2] == ["id"] else []))
+        self.api.count(method, route)
+
+        retry_after = self.api.admit()
+        if retry_after is not None:
+            self._send(
+                429,
+                {"detail": "Muitas requisições"},
+                headers={"Retry-After": f"{retry_after:.2f}"},
+            )
+            return
+        if not self.api.simulate():
+            self._send(500, {"detail": "Erro simulado no servidor"})
+            return
+        try:
+            status, body = self._route(method, parts, data, query)
+        except (KeyError, TypeError, ValueError):
+            status, body = 422, {"detail": "Requisição inválida"}
+        if status == 200 and isinstance(body, tuple):
+            self._send(200, body[0], body[1])
+        else:
+            self._send(status, body)
+
+    def _route(self, method: str, parts: List[str], data, query: Dict[str, List[str]]):
+        api = self.api
+        if not parts and method == "GET":
+            return 200, {"message": "Menu MVP API (servidor local de testes)"}
+        resource, rest = parts[0], parts[1:]
+
+        if resource == "stats" and not rest and method == "GET":
+            if api.config.stats_endpoint:
+                with api._lock:
+                    return 200, {
+                        "ingredients": len(api.ingredients),
+                        "recipes": len(api.recipes),
+                    }
+
+        if resource == "ingredients":
+            if not rest and method == "GET":
+                return 200, api.encoded(
+                    "ingredients", lambda: list(api.ingredients.values())
+                )
+            if not rest and method == "POST":
+                return api.create_ingredient(data["name"])
+            ingredient_id = int(rest[0])
+            if method == "GET":
+                ingredient = api.ingredients.get(ingredient_id)
+                if ingredient is None:
+                    return 404, {"detail": "Ingrediente não encontrado"}
+                return 200, ingredient
+            if method == "PUT":
+                return api.update_ingredient(ingredient_id, data["name"])
+            if method == "DELETE":
+                return api.delete_ingredient(ingredient_id)
+
+        if resource == "recipes":
+            if not rest and method == "GET" and "fields" in query:
+                # Listagem resumida: só os campos pedidos de cada receita
+                fields = query["fields"][0].split(",")
+                return 200, api.encoded(
+                    f"recipes?fields={','.join(fields)}",
+                    lambda: [
+                        {field: item.get(field) for field in fields}
+                        for item in api.recipes.values()
+                    ],
+                )
+            if not rest and method == "GET":
+                return 200, api.encoded("recipes", lambda: list(api.recipes.values()))
+            if not rest and method == "POST":
+                return api.create_recipe(data)
+            if rest == ["bulk"] and method == "POST":
+                created = [api.create_recipe(item) for item in data]
+                failed = [body for status, body in created if status != 200]
+                if failed:
+                    return 422, failed[0]
+                return 200, [body for _, body in created]
+            if rest[:1] == ["id"] and len(rest) == 2 and method == "DELETE":
+                return api.delete_recipe(int(rest[1]))
+            if len(rest) == 1 and method == "GET":
+                return api.recipe_by_name(rest[0])
+
+        if (
+            resource == "chat"
+            and method == "POST"
+            and rest
+            in (
+                ["invoke"],
+                ["stream-sse"],
+            )
+        ):
+            if api.config.chat_latency:
+                time.sleep(api.config.chat_latency)
+            message = data["message"]
+            output = {
+                "content": f"Resposta simulada para: {message[:200]}",
+                "thread_id": data.get("thread_id"),
+            }
+            if rest == ["stream-sse"] and "text/event-stream" in self.headers.get(
+                "Accept", ""
+            ):
+                events = "".join(
+                    f"data: {json.dumps({'content': word + ' '})}\n\n"
+                    for word in output["content"].split()
+                )
+                return 200, (events.encode(), "text/event-stream")
+            return 200, {"output": output}
+
+        return 404, {"detail": "Not Found"}
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Cliente que desiste no meio da resposta (timeout, cancelamento) não é erro
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Sobe a API simulada em uma thread, em uma porta livre por padrão
+
+    Pode ser usado como gerenciador de contexto:
+
+        with StubServer(StubAPI(ingredients, recipes)) as server:
+            client = MenuMVPAPIClient(server.url)
+    """
+
+    def __init__(self, api: Optional[StubAPI] = None, host="127.0.0.1", port=0):
+        self.api = api or StubAPI()
+        handler = type("StubHandler", (_Handler,), {"api": self.api})
+        self.httpd = _HTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="stub-api",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--ingredients", type=int, default=1000)
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--instruction-words",
+        type=int,
+        default=30,
+        help="palavras no preparo de cada receita (tamanho do payload)",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--chat-latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cold-start", type=float, default=0.0)
+    parser.add_argument("--idle-timeout", type=float, default=None)
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="requisições por segundo antes de responder 429",
+    )
+    parser.add_argument(
+        "--stats-endpoint",
+        action="store_true",
+        help="oferece GET /stats com os totais do catálogo",
+    )
+    args = parser.parse_args(argv)
+
+    ingredients, recipes = generate_catalog(
+        args.ingredients,
+        args.recipes,
+        seed=args.seed,
+        instruction_words=args.instruction_words,
+    )
+    config = StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        chat_latency=args.chat_latency,
+        error_rate=args.error_rate,
+        cold_start=args.cold_start,
+        idle_timeout=args.idle_timeout,
+        seed=args.seed,
+        stats_endpoint=args.stats_endpoint,
+        rate_limit=args.rate_limit,
+    )
+    server = StubServer(StubAPI(ingredients, recipes, config), args.host, args.port)
+    print(
+        f"API simulada em {server.url} ({len(ingredients)} ingredientes, "
+        f"{len(recipes)} receitas)"
+    )
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
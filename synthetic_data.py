@@ -0,0 +1,245 @@
+import gc
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BASE_INGREDIENTS = [
+    "Tomate",
+    "Cebola",
+    "Alho",
+    "Batata",
+    "Cenoura",
+    "Arroz",
+    "Feijão",
+    "Frango",
+    "Carne moída",
+    "Peixe",
+    "Camarão",
+    "Ovo",
+    "Leite",
+    "Manteiga",
+    "Queijo",
+    "Presunto",
+    "Farinha de trigo",
+    "Açúcar",
+    "Sal",
+    "Pimenta",
+    "Azeite",
+    "Limão",
+    "Laranja",
+    "Banana",
+    "Maçã",
+    "Morango",
+    "Chocolate",
+    "Milho",
+    "Ervilha",
+    "Abóbora",
+    "Abobrinha",
+    "Berinjela",
+    "Brócolis",
+    "Couve",
+    "Espinafre",
+    "Alface",
+    "Pimentão",
+    "Mandioca",
+    "Fubá",
+    "Aveia",
+    "Iogurte",
+    "Creme de leite",
+    "Leite de coco",
+    "Coentro",
+    "Salsinha",
+    "Cebolinha",
+    "Manjericão",
+    "Orégano",
+    "Canela",
+    "Gengibre",
+]
+QUALIFIERS = [
+    "orgânico",
+    "fresco",
+    "congelado",
+    "ralado",
+    "picado",
+    "integral",
+    "light",
+    "defumado",
+    "em conserva",
+    "desidratado",
+    "em pó",
+    "caipira",
+]
+DISHES = [
+    "Bolo",
+    "Torta",
+    "Sopa",
+    "Risoto",
+    "Salada",
+    "Escondidinho",
+    "Moqueca",
+    "Farofa",
+    "Omelete",
+    "Lasanha",
+    "Panqueca",
+    "Caldo",
+    "Creme",
+    "Refogado",
+    "Assado",
+    "Suflê",
+]
+UNITS = ["g", "kg", "ml", "xícara", "colher de sopa", "colher de chá", "unidade"]
+COOKING_WORDS = (
+    "misture bata refogue cozinhe asse frite tempere corte pique rale adicione "
+    "reserve sirva leve ao forno fogo baixo médio alto por minutos até dourar "
+    "ferver engrossar em uma panela tigela assadeira untada com o a os as e de "
+    "do da aos poucos mexendo sempre depois retire deixe esfriar acerte sal"
+).split()
+
+# Textos de preparo distintos sorteados entre as receitas
+_INSTRUCTION_POOL = 256
+
+
+def ingredient_names(count: int) -> List[str]:
+    """Gera `count` nomes de ingredientes distintos e realistas"""
+    names = []
+    base_count = len(BASE_INGREDIENTS)
+    for i in range(count):
+        base = BASE_INGREDIENTS[i % base_count]
+        variant = i // base_count
+        if variant == 0:
+            names.append(base)
+        elif variant <= len(QUALIFIERS):
+            names.append(f"{base} {QUALIFIERS[variant - 1]}")
+        else:
+            qualifier = QUALIFIERS[(variant - 1) % len(QUALIFIERS)]
+            names.append(f"{base} {qualifier} {(variant - 1) // len(QUALIFIERS) + 1}")
+    return names
+
+
+def generate_ingredients(count: int, seed: int = 0) -> List[Dict]:
+    """Gera um catálogo de ingredientes no formato da API
+
+    A semente define a ordem dos nomes; os ids vão de 1 a `count`.
+    """
+    names = ingredient_names(count)
+    order = np.random.default_rng(seed).permutation(count)
+    return [{"id": i + 1, "name": names[j]} for i, j in enumerate(order.tolist())]
+
+
+def _instructions(rng: np.random.Generator, words: int) -> List[str]:
+    """Conjunto de textos de preparo com `words` palavras cada"""
+    if words <= 0:
+        return [""]
+    vocabulary = np.array(COOKING_WORDS)
+    texts = []
+    for _ in range(_INSTRUCTION_POOL):
+        text = " ".join(rng.choice(vocabulary, words).tolist())
+        texts.append(f"{text[0].upper()}{text[1:]}.")
+    return texts
+
+
+def generate_recipes(
+    count: int,
+    ingredients: List[Dict],
+    seed: int = 0,
+    min_ingredients: int = 3,
+    max_ingredients: int = 10,
+    instruction_words: int = 30,
+) -> List[Dict]:
+    """Gera receitas no formato da API usando os ingredientes informados
+
+    Ingredientes do início do catálogo aparecem com mais frequência, como
+    acontece com itens básicos (sal, cebola, alho) em catálogos reais.
+    `instruction_words` controla o tamanho do payload de cada receita.
+    """
+    if not ingredients:
+        raise ValueError("É preciso ao menos um ingrediente para gerar receitas")
+
+    rng = np.random.default_rng(seed)
+    names = [ingredient["name"] for ingredient in ingredients]
+    max_ingredients = min(max_ingredients, len(names))
+    min_ingredients = min(min_ingredients, max_ingredients)
+
+    sizes = rng.integers(min_ingredients, max_ingredients + 1, count)
+    picks = (rng.random(int(sizes.sum())) ** 2 * len(names)).astype(np.int64)
+    quantities = rng.integers(1, 500, len(picks)).tolist()
+    units = rng.integers(0, len(UNITS), len(picks)).tolist()
+    dishes = rng.integers(0, len(DISHES), count).tolist()
+    texts = _instructions(rng, instruction_words)
+    text_choice = rng.integers(0, len(texts), count).tolist()
+
+    # Milhões de dicionários pequenos: o coletor de lixo só atrapalharia aqui
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build_recipes(
+            names,
+            sizes.tolist(),
+            picks.tolist(),
+            quantities,
+            units,
+            dishes,
+            texts,
+            text_choice,
+        )
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _build_recipes(
+    names: List[str],
+    sizes: List[int],
+    picks: List[int],
+    quantities: List[int],
+    units: List[int],
+    dishes: List[int],
+    texts: List[str],
+    text_choice: List[int],
+) -> List[Dict]:
+    """Monta os dicionários das receitas a partir dos sorteios"""
+    recipes = []
+    seen: Dict[str, int] = {}
+    offset = 0
+    for i, size in enumerate(sizes):
+        chosen = list(dict.fromkeys(picks[offset : offset + size]))
+        items = [
+            {
+                "name": names[j],
+                "quantity": quantities[offset + k],
+                "unit": UNITS[units[offset + k]],
+            }
+            for k, j in enumerate(chosen)
+        ]
+        offset += size
+
+        name = f"{DISHES[dishes[i]]} de {names[chosen[0]].lower()}"
+        repeat = seen.get(name, 0)
+        seen[name] = repeat + 1
+        if repeat:
+            name = f"{name} ({repeat + 1})"
+
+        recipes.append(
+            {
+                "id": i + 1,
+                "name": name,
+                "instructions": texts[text_choice[i]],
+                "ingredients": items,
+            }
+        )
+    return recipes
+
+
+def generate_catalog(
+    ingredients: int,
+    recipes: int,
+    seed: int = 0,
+    instruction_words: int = 30,
+    max_ingredients: Optional[int] = None,
+) -> Tuple[List[Dict], List[Dict]]:
+    """Gera ingredientes e receitas consistentes entre si a partir de uma semente"""
+    catalog = generate_ingredients(ingredients, seed)
+    kwargs = {} if max_ingredients is None else {"max_ingredients": max_ingredients}
+    return catalog, generate_recipes(
+        recipes, catalog, seed, instruction_words=instruction_words, **kwargs
+    )
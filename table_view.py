@@ -0,0 +1,182 @@
+"""Tabelas paginadas e seletores com busca para conjuntos grandes
+
+As páginas de ingredientes e receitas montavam a tabela com o DataFrame filtrado
+inteiro e listavam todos os itens nos selectbox; com dezenas de milhares de
+registros, cada rerun mandava tudo para o navegador. Aqui a busca é feita no
+servidor sobre um índice de nomes (`NameIndex`, derivado do catálogo da sessão)
+e só a página visível da tabela, ou os primeiros resultados do seletor, são
+enviados.
+
+Uso em uma página:
+
+    index = catalog.derived("ingredients", "search_index")
+    total = paged_table(index, "ingredients", search_label="🔍 Buscar ingrediente")
+    ingredient = search_picker(index, "Buscar para remover", key="delete_ingredient")
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import streamlit as st
+
+from catalog import normalize_name
+
+# Linhas por página da tabela e resultados exibidos no seletor
+PAGE_SIZE = 50
+PICKER_LIMIT = 50
+# Vizinhos do item escolhido no seletor passados a `prefetch`, de cada lado
+PREFETCH_NEIGHBORS = 2
+# Buscas recentes memorizadas por índice (a busca atual é repetida a cada rerun)
+QUERY_CACHE_SIZE = 8
+
+# Posições dos registros que atendem a uma busca
+Matches = Union[range, List[int]]
+
+
+class NameIndex:
+    """Busca por trecho do nome, sem diferenciar maiúsculas e acentos
+
+    Guarda apenas o nome normalizado de cada registro; as buscas retornam
+    posições em `records`, e só a fatia pedida vira lista de registros.
+    """
+
+    def __init__(self, records: Sequence[Dict], field: str = "name"):
+        self.records = records
+        self._keys = [
+            normalize_name(str(record.get(field) or "")) for record in records
+        ]
+        self._matches: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def matches(self, query: str) -> Matches:
+        """Posições dos registros cujo nome contém `query`, na ordem original"""
+        term = normalize_name(query or "")
+        if not term:
+            return range(len(self._keys))
+        positions = self._matches.get(term)
+        if positions is None:
+            positions = [i for i, key in enumerate(self._keys) if term in key]
+            self._matches[term] = positions
+            while len(self._matches) > QUERY_CACHE_SIZE:
+                self._matches.popitem(last=False)
+        else:
+            self._matches.move_to_end(term)
+        return positions
+
+    def count(self, query: str = "") -> int:
+        """Quantidade de registros encontrados pela busca"""
+        return len(self.matches(query))
+
+    def page(self, query: str, page: int, page_size: int = PAGE_SIZE) -> List[Dict]:
+        """Registros da página `page` (a partir de 0) do resultado da busca"""
+        start = page * page_size
+        return [self.records[i] for i in self.matches(query)[start : start + page_size]]
+
+    def search(self, query: str, limit: int = PICKER_LIMIT) -> List[int]:
+        """Primeiras posições encontradas, com os nomes que começam pela busca antes"""
+        term = normalize_name(query or "")
+        matches = self.matches(term)
+        if not term:
+            return list(matches[:limit])
+        prefix = [i for i in matches if self._keys[i].startswith(term)][:limit]
+        if len(prefix) < limit:
+            seen = set(prefix)
+            prefix.extend([i for i in matches if i not in seen][: limit - len(prefix)])
+        return prefix
+
+
+def _record_label(record: Dict) -> str:
+    return f"{record.get('id')} - {record.get('name')}"
+
+
+def paged_table(
+    index: NameIndex,
+    key: str,
+    columns: Sequence[str] = ("id", "name"),
+    search_label: str = "🔍 Buscar",
+    placeholder: str = "Digite o nome...",
+    page_size: int = PAGE_SIZE,
+) -> int:
+    """Campo de busca e tabela com apenas a página atual; retorna o total filtrado
+
+    Uma nova busca volta para a primeira página.
+    """
+    query = st.text_input(search_label, placeholder=placeholder, key=f"{key}_search")
+    total = index.count(query)
+    pages = max(1, -(-total // page_size))
+
+    page_key = f"{key}_page"
+    query_key = f"{key}_page_query"
+    if (
+        st.session_state.get(query_key) != query
+        or st.session_state.get(page_key, 1) > pages
+    ):
+        st.session_state[page_key] = 1
+        st.session_state[query_key] = query
+
+    # A tabela vem antes dos controles na tela, mas depende da página escolhida
+    table = st.container()
+    col_page, col_info = st.columns([1, 3])
+    with col_page:
+        page = st.number_input(
+            "Página", min_value=1, max_value=pages, step=1, key=page_key
+        )
+    start = (page - 1) * page_size
+    rows = index.page(query, page - 1, page_size)
+    with col_info:
+        if total:
+            st.caption(
+                f"Exibindo {start + 1}–{start + len(rows)} de {total} (página {page} de {pages})"
+            )
+        else:
+            st.caption("Nenhum resultado para a busca")
+    with table:
+        st.dataframe(
+            [{column: row.get(column) for column in columns} for row in rows],
+            use_container_width=True,
+            hide_index=True,
+        )
+    return total
+
+
+def search_picker(
+    index: NameIndex,
+    label: str,
+    key: str,
+    format_record: Callable[[Dict], str] = _record_label,
+    limit: int = PICKER_LIMIT,
+    prefetch: Optional[Callable[[List[Dict]], Any]] = None,
+) -> Optional[Dict]:
+    """Seletor que busca no índice e lista só os primeiros resultados
+
+    Retorna o registro escolhido, ou None se a busca não encontrar nada. Se
+    informada, `prefetch` recebe a cada execução o registro escolhido e seus
+    vizinhos na lista (os próximos primeiro), que o usuário deve abrir em seguida.
+    """
+    query = st.text_input(
+        label, placeholder="Digite parte do nome...", key=f"{key}_query"
+    )
+    positions = index.search(query, limit)
+    if not positions:
+        st.caption("Nenhum resultado para a busca")
+        return None
+    position = st.selectbox(
+        f"{label} (resultados)",
+        positions,
+        format_func=lambda i: format_record(index.records[i]),
+        key=f"{key}_choice",
+        label_visibility="collapsed",
+    )
+    total = index.count(query)
+    if total > len(positions):
+        st.caption(f"Mostrando {len(positions)} de {total} resultados; refine a busca")
+    if prefetch is not None:
+        selected = positions.index(position)
+        nearby = (
+            positions[selected : selected + PREFETCH_NEIGHBORS + 1]
+            + positions[max(selected - PREFETCH_NEIGHBORS, 0) : selected][::-1]
+        )
+        prefetch([index.records[i] for i in nearby])
+    return index.records[position]
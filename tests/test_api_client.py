@@ -1,9 +1,11 @@
+import threading
+import time
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
-from api_client import MenuMVPAPIClient
+from api_client import MenuMVPAPIClient, SessionPool
 
 
 class TestMenuMVPAPIClient:
@@ -20,6 +22,12 @@ class TestMenuMVPAPIClient:
         client = MenuMVPAPIClient("https://test-api.com/")
         assert client.base_url == "https://test-api.com"
 
+    def test_init_with_session(self):
+        """Testa inicialização com uma sessão HTTP fornecida"""
+        session = requests.Session()
+        client = MenuMVPAPIClient("https://test-api.com", session=session)
+        assert client.session is session
+
     def test_init_without_trailing_slash(self):
         """Testa inicialização com URL sem /"""
         client = MenuMVPAPIClient("https://test-api.com")
@@ -211,6 +219,360 @@ class TestMenuMVPAPIClient:
         mock_make_request.assert_called_once_with("GET", "/")
 
 
+class TestCounts:
+    """Testes para os totais do catálogo sem baixar as listas"""
+
+    def setup_method(self):
+        self.client = MenuMVPAPIClient("https://test-api.com")
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_stats_endpoint(self, mock_make_request):
+        """Testa os totais vindos do endpoint de estatísticas, reaproveitados"""
+        mock_make_request.return_value = {"ingredients": 10, "recipes": 4}
+
+        assert self.client.get_counts() == {"ingredients": 10, "recipes": 4}
+        assert self.client.get_counts() == {"ingredients": 10, "recipes": 4}
+        mock_make_request.assert_called_once_with("GET", "/stats")
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_counts_from_listings(self, mock_make_request):
+        """Testa os totais das listagens quando a API não tem o endpoint"""
+        mock_make_request.side_effect = Exception("Erro na requisição: 404")
+        assert self.client.get_counts(fetch_missing=False) == {}
+
+        mock_make_request.side_effect = None
+        mock_make_request.return_value = [{"id": 1}, {"id": 2}]
+        self.client.get_ingredients()
+        self.client.get_recipes()
+        mock_make_request.reset_mock()
+
+        with patch("api_client.time.monotonic", return_value=time.monotonic() + 60):
+            assert self.client.get_counts() == {"ingredients": 2, "recipes": 2}
+        mock_make_request.assert_not_called()
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_fetch_missing(self, mock_make_request):
+        """Testa a busca da listagem para um total desconhecido"""
+        mock_make_request.side_effect = [
+            Exception("Erro na requisição: 404"),
+            [{"id": 1}],
+            [{"id": 1}, {"id": 2}, {"id": 3}],
+        ]
+        assert self.client.get_counts() == {"ingredients": 1, "recipes": 3}
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_writes_adjust_counts(self, mock_make_request):
+        """Testa se as escritas atualizam os totais conhecidos"""
+        mock_make_request.return_value = [{"id": 1}, {"id": 2}]
+        self.client.get_ingredients()
+        self.client.get_recipes()
+
+        mock_make_request.return_value = {"id": 3}
+        self.client.create_ingredient("Sal")
+        self.client.create_ingredient("Açúcar")
+        self.client.delete_ingredient(1)
+        self.client.delete_recipe(1)
+        assert self.client._known_counts(60) == {"ingredients": 3, "recipes": 1}
+
+        # Receitas podem criar ingredientes: o total deles é descartado
+        self.client.create_recipe("Sopa", "Cozinhe", [])
+        assert self.client._known_counts(60) == {"recipes": 2}
+
+        mock_make_request.return_value = [{"id": 4}, {"id": 5}]
+        self.client.create_recipes_bulk([{"name": "A"}, {"name": "B"}])
+        assert self.client._known_counts(60) == {"recipes": 4}
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_counts_expire(self, mock_make_request):
+        """Testa a validade dos totais obtidos das listagens"""
+        mock_make_request.side_effect = Exception("Erro na requisição: 404")
+        self.client.get_counts(fetch_missing=False)
+        mock_make_request.side_effect = None
+        mock_make_request.return_value = [{"id": 1}]
+        self.client.get_recipes()
+
+        later = time.monotonic() + 301
+        with patch("api_client.time.monotonic", return_value=later):
+            assert "recipes" not in self.client._known_counts(300)
+
+
+class TestStaleWhileRevalidate:
+    """Testes para o cache das listagens (stale-while-revalidate)"""
+
+    def setup_method(self):
+        self.client = MenuMVPAPIClient(
+            "https://test-api.com", soft_ttl=10, hard_ttl=100
+        )
+        self.now = 1000.0
+
+    def read_at(self, offset):
+        with patch("api_client.time.monotonic", return_value=self.now + offset):
+            return self.client.get_recipes()
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_fresh_from_cache(self, mock_make_request):
+        """Testa a resposta reaproveitada dentro do TTL curto"""
+        mock_make_request.return_value = [{"id": 1}]
+        assert self.read_at(0) == [{"id": 1}]
+        assert self.read_at(5) == [{"id": 1}]
+        mock_make_request.assert_called_once_with("GET", "/recipes/")
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_stale_served_while_refreshing(self, mock_make_request):
+        """Testa o valor antigo retornado na hora e atualizado em segundo plano"""
+        mock_make_request.return_value = [{"id": 1}]
+        self.read_at(0)
+
+        release = threading.Event()
+        mock_make_request.side_effect = lambda *args: release.wait(5) and [{"id": 2}]
+        assert self.read_at(50) == [{"id": 1}]
+        refresh = self.client._loading["/recipes/"]
+        assert self.read_at(51) == [{"id": 1}]
+
+        release.set()
+        assert refresh.result(5) == [{"id": 2}]
+        assert self.read_at(52) == [{"id": 2}]
+        assert mock_make_request.call_count == 2
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_refresh_failure_keeps_value(self, mock_make_request):
+        """Testa falha na atualização em segundo plano"""
+        mock_make_request.return_value = [{"id": 1}]
+        self.read_at(0)
+
+        mock_make_request.side_effect = Exception("Erro na requisição")
+        assert self.read_at(50) == [{"id": 1}]
+        with pytest.raises(Exception):
+            self.client._loading["/recipes/"].result(5)
+        assert self.read_at(51) == [{"id": 1}]
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_blocks_after_hard_ttl(self, mock_make_request):
+        """Testa a nova busca obrigatória depois do TTL longo"""
+        mock_make_request.return_value = [{"id": 1}]
+        self.read_at(0)
+        mock_make_request.return_value = [{"id": 2}]
+        assert self.read_at(101) == [{"id": 2}]
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_concurrent_reads_share_load(self, mock_make_request):
+        """Testa leituras simultâneas esperando a mesma busca"""
+        release = threading.Event()
+        mock_make_request.side_effect = lambda *args: release.wait(5) and [{"id": 1}]
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.client.get_recipes()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == [[{"id": 1}]] * 4
+        assert mock_make_request.call_count == 1
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_writes_invalidate(self, mock_make_request):
+        """Testa se as escritas descartam as listagens afetadas"""
+        mock_make_request.return_value = [{"id": 1}]
+        self.client.get_recipes()
+        self.client.get_ingredients()
+
+        self.client.create_ingredient("Sal")
+        assert "/ingredients/" not in self.client._cache
+        assert "/recipes/" in self.client._cache
+
+        self.client.create_recipe("Sopa", "Cozinhe", [])
+        assert self.client._cache == {}
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_write_during_load_is_not_cached(self, mock_make_request):
+        """Testa se uma busca iniciada antes de uma escrita não fica em cache"""
+        release = threading.Event()
+        mock_make_request.side_effect = lambda *args: release.wait(5) and [{"id": 1}]
+        reader = threading.Thread(target=self.client.get_ingredients)
+        reader.start()
+        time.sleep(0.05)
+
+        mock_make_request.side_effect = None
+        mock_make_request.return_value = {"id": 2}
+        self.client.create_ingredient("Sal")
+        release.set()
+        reader.join(5)
+        assert self.client._cache == {}
+
+
+class TestRecipeDetails:
+    """Testes para a lista resumida e o LRU de receitas completas"""
+
+    def setup_method(self):
+        self.client = MenuMVPAPIClient(
+            "https://test-api.com", soft_ttl=10, hard_ttl=100, detail_cache_size=2
+        )
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_summaries(self, mock_make_request):
+        """Testa a lista só com id e nome, mesmo se a API mandar tudo"""
+        mock_make_request.return_value = [
+            {"id": 1, "name": "Bolo", "instructions": "Asse", "ingredients": []}
+        ]
+        assert self.client.get_recipe_summaries() == [{"id": 1, "name": "Bolo"}]
+        assert self.client.get_recipe_summaries() == [{"id": 1, "name": "Bolo"}]
+        mock_make_request.assert_called_once_with("GET", "/recipes/?fields=id,name")
+        assert self.client.get_counts(fetch_missing=False) == {"recipes": 1}
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_details_cached(self, mock_make_request):
+        """Testa a receita completa reaproveitada e o nome codificado na URL"""
+        mock_make_request.return_value = {"id": 1, "name": "Bolo de fubá"}
+        assert self.client.get_recipe_details("Bolo de fubá")["id"] == 1
+        assert self.client.get_recipe_details("Bolo de fubá")["id"] == 1
+        mock_make_request.assert_called_once_with(
+            "GET", "/recipes/Bolo%20de%20fub%C3%A1"
+        )
+        assert self.client.cached_recipe_details("Bolo de fubá")
+        assert not self.client.cached_recipe_details("Pudim")
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_details_lru(self, mock_make_request):
+        """Testa o descarte da receita usada há mais tempo"""
+        mock_make_request.side_effect = lambda method, endpoint: {"endpoint": endpoint}
+        self.client.get_recipe_details("a")
+        self.client.get_recipe_details("b")
+        self.client.get_recipe_details("a")
+        self.client.get_recipe_details("c")
+
+        assert self.client.cached_recipe_details("a")
+        assert not self.client.cached_recipe_details("b")
+        assert self.client.cached_recipe_details("c")
+        assert mock_make_request.call_count == 3
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_writes_invalidate_details(self, mock_make_request):
+        """Testa se escritas em receitas descartam os detalhes e a lista resumida"""
+        mock_make_request.return_value = [{"id": 1, "name": "Bolo"}]
+        self.client.get_recipe_summaries()
+        self.client.get_recipe_details("Bolo")
+
+        self.client.delete_recipe(1)
+        assert not self.client.cached_recipe_details("Bolo")
+        assert self.client._cache == {}
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_concurrent_details_share_load(self, mock_make_request):
+        """Testa a busca em andamento compartilhada (clique durante o prefetch)"""
+        release = threading.Event()
+        mock_make_request.side_effect = lambda *args: release.wait(5) and {"id": 1}
+        prefetch = threading.Thread(target=self.client.get_recipe_details, args=("a",))
+        prefetch.start()
+        time.sleep(0.05)
+        assert self.client.cached_recipe_details("a")
+
+        release.set()
+        assert self.client.get_recipe_details("a") == {"id": 1}
+        prefetch.join(5)
+        assert mock_make_request.call_count == 1
+
+    @patch.object(MenuMVPAPIClient, "_make_request")
+    def test_details_without_cache(self, mock_make_request):
+        """Testa o cliente sem cache: cada pedido vai à API"""
+        client = MenuMVPAPIClient("https://test-api.com")
+        mock_make_request.return_value = {"id": 1}
+        client.get_recipe_details("a")
+        client.get_recipe_details("a")
+        assert mock_make_request.call_count == 2
+
+
+class TestSessionPool:
+    """Testes para o pool de sessões HTTP compartilhado pelas threads"""
+
+    def test_reuses_last_returned_session(self):
+        """Testa a reutilização da sessão devolvida"""
+        pool = SessionPool(size=2)
+        with pool.session() as first:
+            pass
+        with pool.session() as second:
+            assert second is first
+        assert pool.stats()["created"] == 1
+
+    def test_exclusive_sessions_up_to_size(self):
+        """Testa sessões distintas para requisições simultâneas, até o limite"""
+        pool = SessionPool(size=2, timeout=0.05)
+        with pool.session() as first, pool.session() as second:
+            assert first is not second
+            with pytest.raises(requests.exceptions.ConnectionError):
+                with pool.session():
+                    pass
+        stats = pool.stats()
+        assert (stats["created"], stats["peak_in_use"], stats["in_use"]) == (2, 2, 0)
+
+    def test_waits_for_free_session(self):
+        """Testa a espera por uma sessão devolvida por outra thread"""
+        pool = SessionPool(size=1, timeout=5)
+        release = threading.Event()
+
+        def hold():
+            with pool.session():
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        time.sleep(0.02)
+        threading.Timer(0.05, release.set).start()
+        with pool.session():
+            pass
+        holder.join(5)
+
+        stats = pool.stats()
+        assert stats["waits"] == 1
+        assert stats["wait_time"] > 0
+        assert stats["requests"] == 2
+
+    def test_close(self):
+        """Testa o encerramento: sessões livres e devolvidas são fechadas"""
+        pool = SessionPool(size=2)
+        busy = pool._acquire()
+        idle = pool._acquire()
+        pool._release(idle)
+
+        with (
+            patch.object(idle, "close") as idle_close,
+            patch.object(busy, "close") as busy_close,
+        ):
+            pool.close()
+            idle_close.assert_called_once()
+            busy_close.assert_not_called()
+            pool._release(busy)
+            busy_close.assert_called_once()
+
+        assert pool.stats()["created"] == 0
+        with pytest.raises(requests.exceptions.ConnectionError):
+            with pool.session():
+                pass
+
+    @patch("requests.Session.get")
+    def test_client_uses_pool(self, mock_get):
+        """Testa as requisições do cliente passando pelo pool"""
+        mock_get.return_value.json.return_value = {"status": "ok"}
+        client = MenuMVPAPIClient("https://test-api.com", pool_size=3)
+        client.health_check()
+        client.health_check()
+
+        stats = client.pool_stats()
+        assert (stats["size"], stats["requests"], stats["created"]) == (3, 2, 1)
+        client.close()
+        assert client.pool_stats()["closed"]
+
+    def test_client_with_session_has_no_pool(self):
+        """Testa o cliente com sessão fornecida, sem pool"""
+        client = MenuMVPAPIClient("https://test-api.com", session=requests.Session())
+        assert client.pool is None
+        assert client.pool_stats() is None
+
+
 class TestAPIClientGlobal:
     """Testes para a instância global do cliente"""
 
@@ -220,6 +582,12 @@ class TestAPIClientGlobal:
 
         assert isinstance(api_client, MenuMVPAPIClient)
 
+    def test_global_instance_caches_listings(self):
+        """Testa se a instância global usa o cache das listagens"""
+        from api_client import HARD_TTL, SOFT_TTL, api_client
+
+        assert (api_client.soft_ttl, api_client.hard_ttl) == (SOFT_TTL, HARD_TTL)
+
     def test_global_instance_default_url(self):
         """Testa se a instância global usa a URL padrão"""
         from api_client import api_client
@@ -0,0 +1,95 @@
+import json
+
+from benchmark_suite import BENCHMARKS, compare, format_report, main, measure, run
+
+
+def report(**timings):
+    return {"results": {name: {"min": value} for name, value in timings.items()}}
+
+
+class TestMeasure:
+    """Testes para a medição de tempo"""
+
+    def test_measure(self):
+        """Testa se a medição repete a chamada e retorna tempos por chamada"""
+        calls = []
+        result = measure(lambda: calls.append(1), repeat=3, min_time=0.001)
+
+        assert result["loops"] >= 1
+        assert len(calls) >= 3 * result["loops"]
+        assert 0 <= result["min"] <= result["median"]
+
+
+class TestRun:
+    """Testes para a execução dos benchmarks"""
+
+    def test_registry_covers_hot_paths(self):
+        """Testa se os caminhos críticos estão cobertos"""
+        for name in [
+            "client.get_recipes",
+            "json.decode_recipes",
+            "ingredients.search",
+            "recipes.dataframe",
+            "planning.get_week_days",
+            "planning.shopping_list",
+            "export.csv",
+        ]:
+            assert name in BENCHMARKS
+
+    def test_run_filters_and_sizes(self):
+        """Testa filtro por nome e benchmarks independentes do tamanho"""
+        result = run([10, 20], only="planning", repeat=1, min_time=0.0)
+
+        assert set(result["results"]) == {
+            "planning.get_week_days",
+            "planning.shopping_list[10]",
+            "planning.shopping_list[20]",
+        }
+        assert result["meta"]["sizes"] == [10, 20]
+
+    def test_run_client_round_trip(self):
+        """Testa o benchmark de ida e volta contra a API simulada"""
+        result = run([10], only="client.get_recipes", repeat=1, min_time=0.0)
+        assert result["results"]["client.get_recipes[10]"]["min"] > 0
+
+
+class TestCompare:
+    """Testes para a comparação com a baseline"""
+
+    def test_statuses(self):
+        """Testa regressão, melhoria, estável, novo e removido"""
+        rows = compare(
+            report(lento=1.0, rapido=1.0, igual=1.0, antigo=1.0),
+            report(lento=1.5, rapido=0.5, igual=1.1, novo=1.0),
+            threshold=0.25,
+        )
+        status = {row["name"]: row["status"] for row in rows}
+
+        assert status == {
+            "lento": "regressão",
+            "rapido": "melhoria",
+            "igual": "ok",
+            "antigo": "removido",
+            "novo": "novo",
+        }
+        assert "1 regressão(ões) em 5 benchmarks" in format_report(rows)
+
+    def test_main_exit_code(self, tmp_path, capsys):
+        """Testa o código de saída do comando compare"""
+        baseline = tmp_path / "baseline.json"
+        current = tmp_path / "current.json"
+        baseline.write_text(json.dumps(report(a=1.0)))
+        current.write_text(json.dumps(report(a=2.0)))
+
+        assert main(["compare", str(baseline), str(current)]) == 1
+        assert "regressão" in capsys.readouterr().out
+        assert main(["compare", str(baseline), str(baseline)]) == 0
+
+    def test_main_run_writes_report(self, tmp_path):
+        """Testa gravação do relatório em JSON"""
+        output = tmp_path / "bench" / "current.json"
+        assert (
+            main(["run", "--sizes", "10", "--only", "week", "--output", str(output)])
+            == 0
+        )
+        assert "planning.get_week_days" in json.loads(output.read_text())["results"]
@@ -0,0 +1,92 @@
+from unittest.mock import patch
+
+from catalog import normalize_name
+from chat_cache import ChatResponseCache, normalize_prompt
+
+
+class TestNormalizePrompt:
+    """Testes para a normalização das perguntas"""
+
+    def test_folds_case_accents_and_spaces(self):
+        """Testa se variações da mesma pergunta geram a mesma chave"""
+        assert normalize_prompt("  Sugira uma receita FÁCIL   para iniciantes?") == (
+            normalize_prompt('"sugira uma receita facil para iniciantes"')
+        )
+
+    def test_keeps_distinct_questions(self):
+        """Testa se perguntas diferentes continuam diferentes"""
+        assert normalize_prompt("Receita de bolo") != normalize_prompt("Receita de pão")
+
+    def test_does_not_fill_name_cache(self):
+        """Testa se as perguntas não ficam no cache dos nomes do catálogo"""
+        normalize_name.cache_clear()
+        normalize_prompt("Sugira uma receita com o que tenho na despensa")
+        assert normalize_name.cache_info().currsize == 0
+
+
+class TestChatResponseCache:
+    """Testes para o cache de respostas do chat"""
+
+    def test_hit_and_miss_metrics(self):
+        """Testa acertos, falhas e taxa de acerto"""
+        cache = ChatResponseCache(path="")
+        assert cache.get("Olá") is None
+        cache.put("Olá", "Oi!")
+
+        assert cache.get("olá!") == "Oi!"
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_ttl(self):
+        """Testa expiração das respostas"""
+        cache = ChatResponseCache(path="", ttl=10)
+        with patch("chat_cache.time.time", return_value=1000):
+            cache.put("Olá", "Oi!")
+        with patch("chat_cache.time.time", return_value=1011):
+            assert cache.get("Olá") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_entries(self):
+        """Testa descarte da resposta menos usada"""
+        cache = ChatResponseCache(path="", max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+    def test_eviction_by_bytes(self):
+        """Testa limite de memória"""
+        cache = ChatResponseCache(path="", max_bytes=20)
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["bytes"] <= 20
+
+    def test_persists_on_disk(self, tmp_path):
+        """Testa se as respostas sobrevivem a uma nova instância"""
+        path = str(tmp_path / "cache.json")
+        ChatResponseCache(path=path).put("Olá", "Oi!")
+
+        assert ChatResponseCache(path=path).get("OLÁ") == "Oi!"
+
+    def test_ignores_corrupted_file(self, tmp_path):
+        """Testa arquivo inválido no disco"""
+        path = tmp_path / "cache.json"
+        path.write_text("{nada")
+
+        assert ChatResponseCache(path=str(path)).get("Olá") is None
+
+    def test_clear(self, tmp_path):
+        """Testa limpeza do cache"""
+        path = str(tmp_path / "cache.json")
+        cache = ChatResponseCache(path=path)
+        cache.put("Olá", "Oi!")
+        cache.clear()
+
+        assert ChatResponseCache(path=path).get("Olá") is None
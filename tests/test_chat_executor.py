@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from api_client import MenuMVPAPIClient
+from chat_executor import ChatBusyError, ChatExecutor
+
+
+class _SlowChatHandler(BaseHTTPRequestHandler):
+    """Responde ao chat depois de `delay` segundos"""
+
+    delay = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay)
+        body = json.dumps({"output": {"content": "Oi!"}}).encode()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Servidor HTTP local para a API de chat"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _SlowChatHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    _SlowChatHandler.delay = 0.0
+
+
+@pytest.fixture
+def client(server):
+    """Cliente apontando para o servidor local"""
+    return MenuMVPAPIClient(f"http://127.0.0.1:{server.server_address[1]}")
+
+
+@pytest.fixture
+def executor():
+    """Executor com poucas vagas"""
+    chat = ChatExecutor(max_workers=2, max_pending=2)
+    yield chat
+    chat.shutdown()
+
+
+class TestChatExecutor:
+    """Testes para as requisições de chat em segundo plano"""
+
+    def test_result(self, executor, client):
+        """Testa resposta recebida em segundo plano"""
+        request = executor.submit(client, "Olá", "t1", prompt="Olá")
+        request.future.result(timeout=5)
+
+        assert request.done()
+        assert request.result() == {"output": {"content": "Oi!"}}
+        assert request.metadata == {"prompt": "Olá"}
+        assert request.elapsed() >= 0
+
+    def test_submit_does_not_block(self, executor, client):
+        """Testa se o envio retorna antes da resposta chegar"""
+        _SlowChatHandler.delay = 1.0
+        started = time.monotonic()
+        request = executor.submit(client, "Olá", "t1")
+
+        assert time.monotonic() - started < 0.5
+        assert not request.done()
+        request.cancel()
+
+    def test_cancel_unblocks_request(self, executor, client):
+        """Testa se o cancelamento interrompe a requisição em andamento"""
+        _SlowChatHandler.delay = 5.0
+        request = executor.submit(client, "Olá", "t1")
+        time.sleep(0.2)
+
+        started = time.monotonic()
+        request.cancel()
+        with pytest.raises(Exception):
+            request.future.result(timeout=2)
+
+        assert request.cancelled
+        assert time.monotonic() - started < 1.0
+
+    def test_busy_when_all_slots_taken(self, executor, client):
+        """Testa recusa de novas requisições quando não há vagas"""
+        _SlowChatHandler.delay = 5.0
+        requests = [executor.submit(client, "Olá", f"t{i}") for i in range(2)]
+
+        with pytest.raises(ChatBusyError):
+            executor.submit(client, "Olá", "t3")
+
+        for request in requests:
+            request.cancel()
+
+    def test_slots_released_after_cancel(self, executor, client):
+        """Testa se as vagas voltam a ficar livres após o cancelamento"""
+        _SlowChatHandler.delay = 5.0
+        for request in [executor.submit(client, "Olá", f"t{i}") for i in range(2)]:
+            request.cancel()
+            with pytest.raises(Exception):
+                request.future.result(timeout=2)
+
+        _SlowChatHandler.delay = 0.0
+        request = executor.submit(client, "Olá", "t3")
+        assert request.future.result(timeout=5) == {"output": {"content": "Oi!"}}
+
+    def test_prepare_runs_before_sending(self, executor, client):
+        """Testa se a preparação reescreve a mensagem na thread de trabalho"""
+        sent = []
+        with patch.object(
+            MenuMVPAPIClient,
+            "chat",
+            lambda self, message, thread_id: sent.append(message),
+        ):
+            request = executor.submit(
+                client, "Olá", "t1", prepare=lambda message: f"Contexto\n\n{message}"
+            )
+            request.future.result(timeout=5)
+
+        assert sent == ["Contexto\n\nOlá"]
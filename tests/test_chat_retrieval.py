@@ -0,0 +1,146 @@
+from chat_retrieval import CatalogRetriever, estimate_tokens, tokenize
+
+RECIPES = [
+    {
+        "id": 1,
+        "name": "Bolo de Cenoura",
+        "instructions": "Bata a cenoura com os ovos e asse por 40 minutos.",
+        "ingredients": [
+            {"name": "Cenoura", "quantity": "3", "unit": "unidades"},
+            {"name": "Ovo"},
+            {"name": "Farinha de trigo"},
+        ],
+    },
+    {
+        "id": 2,
+        "name": "Frango Grelhado",
+        "instructions": "Tempere o frango e grelhe.",
+        "ingredients": [{"name": "Frango"}, {"name": "Limão"}],
+    },
+    {
+        "id": 3,
+        "name": "Sopa de Legumes",
+        "instructions": "Cozinhe tudo.",
+        "ingredients": [{"name": "Batata"}, {"name": "Cenoura"}],
+    },
+]
+INGREDIENTS = [{"id": 10, "name": "Açafrão"}, {"id": 11, "name": "Limão"}]
+
+
+def make_retriever():
+    retriever = CatalogRetriever()
+    retriever.update(RECIPES, INGREDIENTS)
+    return retriever
+
+
+class TestTokenize:
+    """Testes para a quebra em termos"""
+
+    def test_normalizes_and_drops_stopwords(self):
+        """Testa acentos, caixa e palavras vazias"""
+        assert tokenize("Quero uma receita com LIMÃO e açafrão!") == [
+            "limao",
+            "acafrao",
+        ]
+
+    def test_estimate_tokens(self):
+        """Testa estimativa de tokens"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcdefgh") == 2
+
+
+class TestCatalogRetriever:
+    """Testes para o índice lexical do catálogo"""
+
+    def test_search_ranks_relevant_items(self):
+        """Testa se o item mais relevante vem primeiro"""
+        results = make_retriever().search("o que faço com cenoura?")
+
+        assert results[0][1].startswith("- Receita: Bolo de Cenoura")
+        assert any("Sopa de Legumes" in line for _, line in results)
+        assert not any("Frango" in line for _, line in results)
+
+    def test_search_includes_ingredients(self):
+        """Testa recuperação de ingredientes do catálogo"""
+        lines = [line for _, line in make_retriever().search("açafrão")]
+        assert lines == ["- Ingrediente: Açafrão"]
+
+    def test_no_match(self):
+        """Testa consulta sem termos conhecidos"""
+        retriever = make_retriever()
+        assert retriever.search("chocolate") == []
+        assert retriever.context_block("chocolate") == ""
+        assert retriever.augment("chocolate") == "chocolate"
+        assert CatalogRetriever().search("cenoura") == []
+
+    def test_context_block_respects_budget(self):
+        """Testa o orçamento de tokens do bloco de contexto"""
+        retriever = make_retriever()
+        block = retriever.context_block("cenoura frango limão", token_budget=40)
+
+        assert block.startswith("Itens relevantes do catálogo do usuário:")
+        assert estimate_tokens(block) <= 40
+        assert retriever.context_block("cenoura", token_budget=5) == ""
+
+    def test_context_block_includes_quantities(self):
+        """Testa se a linha da receita traz quantidades e preparo"""
+        block = make_retriever().context_block("bolo")
+        assert "3 unidades Cenoura" in block
+        assert "preparo: Bata a cenoura" in block
+
+    def test_augment_uses_query(self):
+        """Testa se o contexto é buscado pela pergunta original"""
+        message = make_retriever().augment("Contexto anterior\n\nE frango?", "frango")
+
+        assert "Frango Grelhado" in message
+        assert message.endswith("Contexto anterior\n\nE frango?")
+
+    def test_incremental_update(self):
+        """Testa se apenas itens alterados são reindexados"""
+        retriever = make_retriever()
+        assert len(retriever) == 5
+        assert retriever.update(RECIPES, INGREDIENTS) == 0
+
+        changed = [dict(RECIPES[0], name="Bolo de Fubá"), *RECIPES[1:]]
+        assert retriever.update(changed, INGREDIENTS[:1]) == 2
+        assert len(retriever) == 4
+        assert retriever.search("limão")[0][1].startswith("- Receita: Frango")
+        assert "Bolo de Fubá" in retriever.search("fubá")[0][1]
+
+    def test_sync(self):
+        """Testa a atualização com o catálogo lido por uma sessão"""
+        retriever = CatalogRetriever()
+
+        assert retriever.sync(RECIPES, INGREDIENTS, fetched_at=10.0) == 5
+        assert retriever.sync(RECIPES, INGREDIENTS, fetched_at=10.0) == 0
+        assert retriever.synced_at == 10.0
+        assert len(retriever) == 5
+
+        changed = [dict(RECIPES[0], name="Bolo de Fubá"), *RECIPES[1:]]
+        assert retriever.sync(changed, INGREDIENTS, fetched_at=20.0) == 1
+        assert "Bolo de Fubá" in retriever.search("fubá")[0][1]
+
+    def test_sync_ignores_older_data(self):
+        """Testa se a cópia mais antiga de outra sessão não desfaz a atualização"""
+        retriever = CatalogRetriever()
+        retriever.sync(RECIPES, INGREDIENTS, fetched_at=20.0)
+
+        assert retriever.sync(RECIPES[:1], [], fetched_at=15.0) == 0
+        assert len(retriever) == 5
+        assert retriever.synced_at == 20.0
+
+    def test_stale_after_write(self):
+        """Testa o índice desatualizado por uma escrita até o próximo sync"""
+        retriever = CatalogRetriever()
+        assert not retriever.stale
+
+        retriever.written(("recipe_summaries",))
+        assert not retriever.stale
+        retriever.written(("recipes", "recipe_summaries"))
+        assert retriever.stale
+
+        # Dados buscados antes da escrita não resolvem
+        retriever.sync(RECIPES, INGREDIENTS, fetched_at=retriever.written_at - 1)
+        assert retriever.stale
+        retriever.sync(RECIPES, INGREDIENTS, fetched_at=retriever.written_at + 1)
+        assert not retriever.stale
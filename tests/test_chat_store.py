@@ -0,0 +1,151 @@
+import sqlite3
+
+import pytest
+
+from chat_store import ChatHistoryStore, trim_messages
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Histórico gravado em um diretório temporário"""
+    history = ChatHistoryStore(str(tmp_path / "chat.sqlite3"))
+    yield history
+    history.close()
+
+
+class TestChatHistoryStore:
+    """Testes para o histórico de conversas"""
+
+    def test_append_and_load(self, store):
+        """Testa gravação e leitura de mensagens"""
+        store.append("a", "t1", "user", "Olá")
+        message = store.append("a", "t1", "assistant", "Oi!")
+
+        assert message["seq"] == 1
+        assert isinstance(message["timestamp"], float)
+        assert [m["content"] for m in store.load_window("a", "t1")] == ["Olá", "Oi!"]
+        assert store.count("a", "t1") == 2
+
+    def test_load_window_paging(self, store):
+        """Testa carregamento da janela mais recente e paginação"""
+        for i in range(10):
+            store.append("a", "t1", "user", f"m{i}")
+
+        window = store.load_window("a", "t1", limit=3)
+        assert [m["content"] for m in window] == ["m7", "m8", "m9"]
+
+        earlier = store.load_window("a", "t1", limit=3, before=window[0]["seq"])
+        assert [m["content"] for m in earlier] == ["m4", "m5", "m6"]
+
+    def test_threads_are_isolated(self, store):
+        """Testa se cada thread tem seu próprio histórico"""
+        store.append("a", "t1", "user", "primeira conversa")
+        store.append("a", "t2", "user", "segunda   conversa")
+
+        assert store.count("a", "t1") == 1
+        assert store.load_window("a", "t2")[0]["content"] == "segunda   conversa"
+        titles = {t["thread_id"]: t["title"] for t in store.list_threads("a")}
+        assert titles == {"t1": "primeira conversa", "t2": "segunda conversa"}
+
+    def test_persists_on_disk(self, tmp_path):
+        """Testa se o histórico sobrevive a uma nova instância"""
+        path = str(tmp_path / "chat.sqlite3")
+        ChatHistoryStore(path).append("a", "t1", "user", "Olá")
+
+        assert ChatHistoryStore(path).count("a", "t1") == 1
+
+    def test_delete_thread(self, store):
+        """Testa remoção de conversa"""
+        store.append("a", "t1", "user", "Olá")
+        store.delete_thread("a", "t1")
+
+        assert store.count("a", "t1") == 0
+        assert store.list_threads("a") == []
+
+    def test_owners_are_isolated(self, store):
+        """Testa se uma sessão não lista nem lê as conversas de outra"""
+        store.append("a", "t1", "user", "conversa da sessão a")
+        store.append("b", "t2", "user", "conversa da sessão b")
+
+        assert [t["thread_id"] for t in store.list_threads("a")] == ["t1"]
+        assert [t["thread_id"] for t in store.list_threads("b")] == ["t2"]
+        assert store.load_window("b", "t1") == []
+        assert store.count("b", "t1") == 0
+        with pytest.raises(PermissionError):
+            store.append("b", "t1", "user", "intrusa")
+
+        store.delete_thread("b", "t1")
+        assert store.count("a", "t1") == 1
+
+    def test_legacy_database(self, tmp_path):
+        """Testa um banco sem a coluna do dono: as conversas antigas somem"""
+        path = str(tmp_path / "chat.sqlite3")
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "CREATE TABLE threads (thread_id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, message_count INTEGER NOT NULL DEFAULT 0);"
+            "INSERT INTO threads VALUES ('t0', 'antiga', 0, 1);"
+        )
+        connection.close()
+
+        store = ChatHistoryStore(path)
+        assert store.list_threads("a") == []
+        store.append("a", "t1", "user", "Olá")
+        assert [t["thread_id"] for t in store.list_threads("a")] == ["t1"]
+        store.close()
+
+    def test_prune_old_threads(self, tmp_path):
+        """Testa a limpeza das conversas paradas há mais que a idade máxima"""
+        store = ChatHistoryStore(str(tmp_path / "chat.sqlite3"), max_age=3600)
+        store.append("a", "velha", "user", "Olá")
+        store.append("b", "nova", "user", "Oi")
+        connection = sqlite3.connect(store.path)
+        with connection:
+            connection.execute(
+                "UPDATE threads SET updated_at = updated_at - 7200 "
+                "WHERE thread_id = 'velha'"
+            )
+        connection.close()
+
+        assert store.prune() == 1
+        assert store.list_threads("a") == []
+        assert store.load_window("a", "velha") == []
+        assert [t["thread_id"] for t in store.list_threads("b")] == ["nova"]
+        assert store.prune(max_age=0) == 1
+        store.close()
+
+    def test_prune_on_new_thread(self, tmp_path):
+        """Testa a limpeza automática ao criar uma conversa"""
+        path = str(tmp_path / "chat.sqlite3")
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "CREATE TABLE threads (thread_id TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+            "title TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "message_count INTEGER NOT NULL DEFAULT 0);"
+            "INSERT INTO threads VALUES ('t0', 'a', 'antiga', 0, 1);"
+        )
+        connection.close()
+
+        store = ChatHistoryStore(path)
+        store.append("a", "t1", "user", "Olá")
+        assert [t["thread_id"] for t in store.list_threads("a")] == ["t1"]
+        store.close()
+
+    def test_unknown_thread(self, store):
+        """Testa thread sem mensagens"""
+        assert store.load_window("a", "nada") == []
+        assert store.count("a", "nada") == 0
+
+
+class TestTrimMessages:
+    """Testes para o limite de memória da sessão"""
+
+    def test_trim_by_count(self):
+        """Testa descarte das mensagens mais antigas"""
+        messages = [{"content": str(i)} for i in range(10)]
+        assert trim_messages(messages, max_messages=3) == messages[-3:]
+
+    def test_trim_by_chars(self):
+        """Testa limite de caracteres, mantendo ao menos a última mensagem"""
+        messages = [{"content": "a" * 10}, {"content": "b" * 10}, {"content": "c" * 50}]
+        assert trim_messages(messages, max_chars=25) == messages[-1:]
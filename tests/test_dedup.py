@@ -0,0 +1,195 @@
+import threading
+import time
+from unittest.mock import Mock
+
+from api_client import MenuMVPAPIClient
+from dedup import (
+    Cluster,
+    MergePlan,
+    apply_merges,
+    find_duplicates,
+    phonetic_key,
+    plan_merges,
+    recipe_usage,
+    skip_used,
+)
+from rate_limiter import current_session
+from stub_server import StubAPI, StubServer
+from synthetic_data import generate_ingredients
+
+CATALOG = [
+    {"id": 1, "name": "tomates"},
+    {"id": 2, "name": "Tomate"},
+    {"id": 3, "name": "Tomatte"},
+    {"id": 4, "name": "Cebola"},
+    {"id": 5, "name": "Sebola"},
+    {"id": 6, "name": "Leite fresco"},
+    {"id": 7, "name": "Azeite fresco"},
+    {"id": 8, "name": "Pimenta"},
+    {"id": 9, "name": "Pimentão"},
+    {"id": 10, "name": "Queijo"},
+    {"id": 11, "name": "Queijo minas"},
+    {"id": 12, "name": "Alho picado 12"},
+    {"id": 13, "name": "Alho picado 7"},
+    {"id": 14, "name": "Farinha de trigo"},
+    {"id": 15, "name": "farinha trigo"},
+]
+RECIPES = [
+    {"name": "Molho", "ingredients": [{"name": "tomates"}, {"name": "Cebola"}]},
+    {"name": "Sopa", "ingredients": [{"name": "Tomates"}]},
+    {"name": "Salada", "ingredients": [{"name": "Tomate"}]},
+]
+
+
+def cluster_ids(clusters):
+    """Ids de cada grupo, com o mantido primeiro"""
+    return [[item["id"] for item in cluster.members] for cluster in clusters]
+
+
+class TestFindDuplicates:
+    """Testes para a busca de duplicados"""
+
+    def test_phonetic_key(self):
+        """Testa grafias diferentes com o mesmo som"""
+        assert phonetic_key("cebola") == phonetic_key("sebola")
+        assert phonetic_key("tomatte") == phonetic_key("tomate")
+        assert phonetic_key("pimentao") != phonetic_key("pimenta")
+
+    def test_clusters(self):
+        """Testa os grupos encontrados e os pares parecidos que não são duplicados"""
+        clusters = find_duplicates(CATALOG)
+        groups = sorted(sorted(ids) for ids in cluster_ids(clusters))
+
+        assert groups == [[1, 2, 3], [4, 5], [14, 15]]
+        # Sem o uso nas receitas, fica o nome mais curto
+        assert clusters[0].keep["id"] == 2
+        assert clusters[0].score < 1.0
+
+    def test_keep_most_used(self):
+        """Testa a escolha do ingrediente mais usado nas receitas"""
+        usage = recipe_usage(RECIPES)
+        assert usage == {"tomates": 2, "cebola": 1, "tomate": 1}
+
+        clusters = find_duplicates(CATALOG, usage)
+        assert [cluster.keep["id"] for cluster in clusters] == [1, 4, 15]
+
+    def test_threshold(self):
+        """Testa o limite da nota"""
+        clusters = find_duplicates(CATALOG, threshold=1.0, phonetic=1.0)
+        assert sorted(sorted(ids) for ids in cluster_ids(clusters)) == [
+            [1, 2],
+            [14, 15],
+        ]
+        assert find_duplicates([]) == []
+
+    def test_large_catalog(self):
+        """Testa a busca em 50 mil ingredientes com duplicados inseridos"""
+        ingredients = generate_ingredients(50_000, seed=1)
+        copies = [
+            {"id": 100_000 + i, "name": item["name"].upper() + " "}
+            for i, item in enumerate(ingredients[:100])
+        ]
+
+        started = time.perf_counter()
+        clusters = find_duplicates(ingredients + copies)
+        elapsed = time.perf_counter() - started
+
+        found = {item["id"] for cluster in clusters for item in cluster.members}
+        assert all(copy["id"] in found for copy in copies)
+        # Folga para máquinas de CI lentas; localmente fica em ~2 s
+        assert elapsed < 30
+
+
+class TestMerge:
+    """Testes para o plano e a execução da mesclagem"""
+
+    def setup_method(self):
+        self.usage = recipe_usage(RECIPES)
+        self.clusters = find_duplicates(CATALOG, self.usage)
+
+    def test_plan_skips_used(self):
+        """Testa se os duplicados usados em receitas ficam de fora"""
+        plan = plan_merges(self.clusters, self.usage)
+
+        assert sorted(item["id"] for item in plan.deletes) == [3, 5, 14]
+        assert [item["id"] for item in plan.skipped] == [2]
+        assert plan.renames == []
+        assert len(plan) == 3
+
+        plan = plan_merges(self.clusters, self.usage, include_used=True)
+        assert sorted(item["id"] for item in plan.deletes) == [2, 3, 5, 14]
+
+    def test_skip_used(self):
+        """Testa a conferência do plano com o uso atual nas receitas"""
+        # Plano montado sem as receitas (página que não chegou a carregá-las)
+        plan = plan_merges(self.clusters, {})
+        assert sorted(item["id"] for item in plan.deletes) == [2, 3, 5, 14]
+
+        checked = skip_used(plan, self.usage)
+        assert sorted(item["id"] for item in checked.deletes) == [3, 5, 14]
+        assert [item["id"] for item in checked.skipped] == [2]
+
+        plan = plan_merges(self.clusters, {}, include_used=True)
+        assert skip_used(plan, self.usage) is plan
+
+    def test_plan_rename(self):
+        """Testa o renome do ingrediente mantido"""
+        cluster = Cluster({"id": 1, "name": "tomates"}, [{"id": 2, "name": "x"}], 1.0)
+        cluster.name = "  Tomate  "
+        plan = plan_merges([cluster])
+        assert plan.renames == [({"id": 1, "name": "tomates"}, "Tomate")]
+
+    def test_dry_run(self):
+        """Testa a simulação sem chamadas à API"""
+        client = Mock()
+        plan = plan_merges(self.clusters, self.usage)
+        report = apply_merges(client, plan)
+
+        assert report.dry_run and report.ok
+        assert report.deleted == plan.deletes
+        assert client.method_calls == []
+
+    def test_apply(self):
+        """Testa remoções e renomes na API simulada, em lotes concorrentes"""
+        with StubServer(StubAPI(ingredients=CATALOG)) as server:
+            client = MenuMVPAPIClient(server.url)
+            cluster = find_duplicates(CATALOG)[0]
+            cluster.name = "Tomate italiano"
+            plan = plan_merges([cluster])
+            calls = []
+
+            report = apply_merges(
+                client,
+                plan,
+                dry_run=False,
+                batch_size=1,
+                workers=2,
+                progress=lambda done, total: calls.append((done, total)),
+            )
+
+            assert report.ok and not report.dry_run
+            assert len(report.deleted) == 2 and len(report.renamed) == 1
+            assert calls[-1] == (3, 3)
+            names = {item["id"]: item["name"] for item in client.get_ingredients()}
+            assert names[2] == "Tomate italiano"
+            assert 1 not in names and 3 not in names
+
+    def test_errors_and_session(self):
+        """Testa se as falhas são registradas e as chamadas levam a sessão"""
+        sessions = []
+        client = Mock()
+
+        def delete(ingredient_id):
+            sessions.append((current_session(), threading.current_thread()))
+            if ingredient_id == 3:
+                raise Exception("Erro na requisição")
+
+        client.delete_ingredient.side_effect = delete
+        plan = MergePlan(deletes=[{"id": 1}, {"id": 3}])
+        report = apply_merges(client, plan, dry_run=False, session="s1")
+
+        assert not report.ok
+        assert report.deleted == [{"id": 1}]
+        assert report.errors == [("delete", {"id": 3}, "Erro na requisição")]
+        assert all(session == "s1" for session, _ in sessions)
+        assert all(thread is not threading.current_thread() for _, thread in sessions)
@@ -0,0 +1,131 @@
+import io
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from export_service import ExportCache, available_formats, data_fingerprint, serialize
+
+RECORDS = [
+    {"id": 1, "name": "Bolo", "ingredients": [{"name": "Farinha"}]},
+    {"id": 2, "name": "Açaí", "extra": None},
+    {"id": 3, "name": "Sopa", "ingredients": []},
+]
+
+
+def export_page():
+    """Página mínima com o widget de exportação"""
+    import streamlit as st
+
+    from export_service import export_widget
+
+    records = st.session_state.setdefault("records", [{"id": 1, "name": "Sal"}])
+    export_widget(records, "itens", key="export")
+
+
+class TestSerialize:
+    """Testes para a serialização dos arquivos exportados"""
+
+    def test_csv_in_chunks(self):
+        """Testa se o CSV gerado em blocos tem um único cabeçalho"""
+        data = serialize(RECORDS, "CSV", chunk_size=1)
+        df = pd.read_csv(io.BytesIO(data))
+
+        assert list(df.columns) == ["id", "name", "ingredients", "extra"]
+        assert df["name"].tolist() == ["Bolo", "Açaí", "Sopa"]
+        assert df["ingredients"][0] == '[{"name": "Farinha"}]'
+
+    def test_csv_with_columns(self):
+        """Testa seleção de colunas"""
+        data = serialize(RECORDS, "CSV", columns=["name"])
+        assert data.decode().splitlines() == ["name", "Bolo", "Açaí", "Sopa"]
+
+    def test_csv_empty(self):
+        """Testa exportação sem registros"""
+        assert serialize([], "CSV", columns=["id"]).decode().strip() == "id"
+
+    def test_parquet_in_chunks(self):
+        """Testa Parquet gerado em blocos"""
+        pytest.importorskip("pyarrow")
+        data = serialize(RECORDS, "Parquet", chunk_size=2)
+        df = pd.read_parquet(io.BytesIO(data))
+        assert df["id"].tolist() == [1, 2, 3]
+
+    def test_excel(self):
+        """Testa exportação para Excel"""
+        pytest.importorskip("openpyxl")
+        data = serialize(RECORDS, "Excel", chunk_size=2)
+        df = pd.read_excel(io.BytesIO(data))
+        assert df["name"].tolist() == ["Bolo", "Açaí", "Sopa"]
+
+    def test_invalid_format(self):
+        """Testa formato não suportado"""
+        with pytest.raises(ValueError) as exc_info:
+            serialize(RECORDS, "PDF")
+
+        assert "Formato de exportação não suportado" in str(exc_info.value)
+
+    def test_available_formats(self):
+        """Testa se CSV está sempre disponível"""
+        assert available_formats()[0] == "CSV"
+
+
+class TestExportCache:
+    """Testes para o cache de arquivos exportados"""
+
+    def test_fingerprint_changes_with_data(self):
+        """Testa se o hash muda quando os dados mudam"""
+        changed = RECORDS[:2] + [{"id": 3, "name": "Sopa de legumes"}]
+        assert data_fingerprint(RECORDS) == data_fingerprint(list(RECORDS))
+        assert data_fingerprint(RECORDS) != data_fingerprint(changed)
+
+    def test_reuses_serialized_bytes(self):
+        """Testa se a serialização só acontece uma vez para os mesmos dados"""
+        cache = ExportCache()
+        with patch("export_service.serialize", return_value=b"dados") as mock_serialize:
+            assert cache.get_or_create(RECORDS, "CSV") == b"dados"
+            assert cache.get_or_create(list(RECORDS), "CSV") == b"dados"
+            cache.get_or_create(RECORDS, "Parquet")
+
+        assert mock_serialize.call_count == 2
+
+    def test_evicts_by_size(self):
+        """Testa se o cache respeita o limite de bytes"""
+        cache = ExportCache(max_bytes=10)
+        with patch("export_service.serialize", return_value=b"123456"):
+            cache.get_or_create(RECORDS[:1], "CSV")
+            cache.get_or_create(RECORDS[:2], "CSV")
+
+        assert cache.total_bytes == 6
+        assert len(cache._entries) == 1
+
+
+class TestExportWidget:
+    """Testes para o widget de exportação"""
+
+    def test_single_click_download(self):
+        """Testa o download em um clique, com o arquivo já em bytes"""
+        at = AppTest.from_function(export_page).run()
+        assert not at.exception
+        assert len(at.get("download_button")) == 1
+        _, export_format, file_name, data = at.session_state["export_file"]
+        assert export_format == "CSV" and file_name.startswith("itens_")
+        assert data.decode().splitlines()[1] == "1,Sal"
+
+    def test_reuses_file_between_runs(self):
+        """Testa se as execuções seguintes não serializam de novo"""
+        at = AppTest.from_function(export_page).run()
+        with patch("export_service.data_fingerprint") as fingerprint:
+            at.run()
+        fingerprint.assert_not_called()
+
+    def test_regenerates_when_records_change(self):
+        """Testa se o arquivo é refeito quando os registros mudam"""
+        at = AppTest.from_function(export_page).run()
+
+        at.session_state["records"] = [{"id": 2, "name": "Açúcar"}]
+        at.run()
+        assert len(at.get("download_button")) == 1
+        data = at.session_state["export_file"][3]
+        assert data.decode().splitlines()[1] == "2,Açúcar"
@@ -0,0 +1,108 @@
+import ast
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Adiciona o diretório raiz ao path
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+ENTRY_SCRIPTS = [
+    "app.py",
+    "pages/1_ingredients.py",
+    "pages/2_recipes.py",
+    "pages/3_planning.py",
+    "pages/4_chat_ai.py",
+    "pages/5_pantry.py",
+]
+
+# Módulos pesados que só devem ser importados quando usados
+HEAVY_MODULES = ["pandas", "pyarrow", "openpyxl"]
+
+
+def script_imports(script: str) -> List[str]:
+    """Módulos importados no topo de um script do app, na ordem do arquivo"""
+    with open(os.path.join(ROOT, script), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append(node.module)
+    return modules
+
+
+def import_profile(modules: List[str]) -> Dict[str, int]:
+    """Tempo acumulado de importação (µs) de cada módulo, via `python -X importtime`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def slowest(profile: Dict[str, int], limit: int = 10) -> str:
+    """Resumo dos módulos mais lentos, usado nas mensagens de falha"""
+    top = sorted(profile.items(), key=lambda item: -item[1])[:limit]
+    return ", ".join(f"{name} {cumulative / 1000:.0f} ms" for name, cumulative in top)
+
+
+def assert_light(script: str) -> None:
+    profile = import_profile(script_imports(script))
+    heavy = [module for module in HEAVY_MODULES if module in profile]
+    assert not heavy, f"{script} importa {heavy} na subida: {slowest(profile)}"
+
+
+class TestImportTime:
+    """Perfil de importação dos scripts do app"""
+
+    def test_script_imports(self):
+        """Testa a leitura dos imports de um script"""
+        assert script_imports("pages/5_pantry.py") == [
+            "pandas",
+            "streamlit",
+            "page_profiler",
+            "pantry",
+            "repository",
+        ]
+
+    def test_entry_scripts_import_from_app_directory(self):
+        """Testa se os imports funcionam a partir da pasta do app, sem ajustes no sys.path"""
+        modules = {
+            module for script in ENTRY_SCRIPTS for module in script_imports(script)
+        }
+        profile = import_profile(sorted(modules))
+        assert "streamlit" in profile
+        assert "repository" in profile
+
+    def test_app_does_not_import_pandas(self):
+        """Testa a página inicial sem módulos pesados"""
+        assert_light("app.py")
+
+    def test_tables_defer_pandas(self):
+        """Testa ingredientes e receitas: o DataFrame vem do repositório"""
+        assert_light("pages/1_ingredients.py")
+        assert_light("pages/2_recipes.py")
+
+    def test_planning_does_not_import_pandas(self):
+        """Testa o planejamento: o pandas só é usado ao exportar"""
+        assert_light("pages/3_planning.py")
+
+    def test_chat_does_not_import_pandas(self):
+        """Testa o chat sem módulos pesados"""
+        assert_light("pages/4_chat_ai.py")
+
+    def test_export_service_defers_pandas(self):
+        """Testa se o pandas é importado apenas ao gerar o arquivo"""
+        profile = import_profile(["export_service"])
+        assert "pandas" not in profile, slowest(profile)
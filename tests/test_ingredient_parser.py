@@ -0,0 +1,209 @@
+import pytest
+
+from ingredient_parser import (
+    IngredientParseError,
+    ParsedIngredient,
+    canonical_unit,
+    decode_file,
+    parse_line,
+    parse_lines,
+    parse_quantity,
+    parse_recipe_file,
+    parse_text,
+)
+
+
+def parsed(text):
+    """(nome, quantidade, unidade) lidos de uma linha"""
+    item = parse_line(text)
+    return item.name, item.quantity, item.unit
+
+
+class TestQuantities:
+    """Testes para a leitura das quantidades"""
+
+    def test_numbers(self):
+        """Testa inteiros, vírgula e ponto decimal"""
+        assert parse_quantity("200") == 200
+        assert parse_quantity("1,5") == 1.5
+        assert parse_quantity("0.25") == 0.25
+
+    def test_fractions(self):
+        """Testa frações simples, mistas e os caracteres de fração"""
+        assert parse_quantity("1/2") == 0.5
+        assert parse_quantity("1 1/2") == 1.5
+        assert parse_quantity("2 e 1/4") == 2.25
+        assert parse_quantity("½") == 0.5
+        assert parse_quantity("1¾") == 1.75
+
+    def test_thousands(self):
+        """Testa o ponto como separador de milhar"""
+        assert parse_quantity("1.000") == 1000
+        assert parse_quantity("12.500") == 12500
+        assert parse_quantity("2.500,75") == 2500.75
+        assert parse_quantity("0.250") == 0.25
+        assert parse_quantity("1.2345") == 1.2345
+
+    def test_words(self):
+        """Testa os números por extenso"""
+        assert parse_quantity("uma") == 1
+        assert parse_quantity("Três") == 3
+        assert parse_quantity("meia") == 0.5
+
+
+class TestUnits:
+    """Testes para os sinônimos das unidades"""
+
+    def test_synonyms(self):
+        """Testa plurais, abreviações, maiúsculas e acentos"""
+        assert canonical_unit("Colheres de Sopa") == "colher de sopa"
+        assert canonical_unit("c. sopa") == "colher de sopa"
+        assert canonical_unit("colher (chá)") == "colher de chá"
+        assert canonical_unit("xic") == "xícara"
+        assert canonical_unit("xícaras de chá") == "xícara"
+        assert canonical_unit("gramas") == "g"
+        assert canonical_unit("LITROS") == "l"
+        assert canonical_unit("Dúzias") == "dúzia"
+        assert canonical_unit("cabeça") == "cabeça"
+        assert canonical_unit("tomate") is None
+
+
+class TestParseLine:
+    """Testes para a leitura de uma linha"""
+
+    def test_request_examples(self):
+        """Testa as linhas que a leitura por espaços errava"""
+        assert parsed("1/2 xícara de açúcar") == ("açúcar", 0.5, "xícara")
+        assert parsed("1,5 kg carne") == ("carne", 1.5, "kg")
+        assert parsed("sal a gosto") == ("sal", None, "a gosto")
+        assert parsed("2 colheres de sopa de manteiga") == (
+            "manteiga",
+            2,
+            "colher de sopa",
+        )
+
+    def test_formats(self):
+        """Testa marcadores, unidades de várias palavras e nomes compostos"""
+        assert parsed("- 2 dentes de alho") == ("alho", 2, "dente")
+        assert parsed("1 1/2 xic. de leite") == ("leite", 1.5, "xícara")
+        assert parsed("2 Colheres (sopa) de azeite") == ("azeite", 2, "colher de sopa")
+        assert parsed("1½ copo americano de leite") == ("leite", 1.5, "copo")
+        assert parsed("uma pitada de sal") == ("sal", 1, "pitada")
+        assert parsed("1 lata de leite condensado") == ("leite condensado", 1, "lata")
+        assert parsed("200 g macarrão") == ("macarrão", 200, "g")
+        assert parsed("1.000 g de farinha") == ("farinha", 1000, "g")
+        assert parsed("1,5 kg carne") == ("carne", 1.5, "kg")
+
+    def test_count_words(self):
+        """Testa dúzia e outras unidades de contagem"""
+        assert parsed("1 dúzia de ovos") == ("ovos", 1, "dúzia")
+        assert parsed("meia duzia de ovos") == ("ovos", 0.5, "dúzia")
+        assert parsed("1 cabeça de alho") == ("alho", 1, "cabeça")
+        assert parsed("2 tabletes de caldo de galinha") == (
+            "caldo de galinha",
+            2,
+            "tablete",
+        )
+
+    def test_without_unit(self):
+        """Testa linhas sem unidade e nomes que começam como unidades"""
+        assert parsed("3 ovos") == ("ovos", 3, None)
+        assert parsed("2 limões") == ("limões", 2, None)
+        assert parsed("doce de leite") == ("doce de leite", None, None)
+        assert parsed("  Sal   grosso ") == ("Sal grosso", None, None)
+
+    def test_to_taste(self):
+        """Testa "a gosto" e variações no fim da linha"""
+        assert parsed("Sal e pimenta-do-reino a gosto.") == (
+            "Sal e pimenta-do-reino",
+            None,
+            "a gosto",
+        )
+        assert parsed("Azeite q.b.") == ("Azeite", None, "a gosto")
+        assert parsed("Cheiro-verde, quanto baste") == ("Cheiro-verde", None, "a gosto")
+
+    def test_errors(self):
+        """Testa linhas sem nome e quantidades inválidas"""
+        for text, message in (
+            ("200 g", "nome do ingrediente ausente"),
+            ("200", "nome do ingrediente ausente"),
+            ("!!!", "nome do ingrediente ausente"),
+            ("0 g de sal", "maior que zero"),
+            ("1/0 xícara de sal", "denominador zero"),
+        ):
+            with pytest.raises(IngredientParseError, match=message):
+                parse_line(text)
+
+    def test_to_api(self):
+        """Testa o formato enviado à API"""
+        assert ParsedIngredient("açúcar", 0.5, "xícara").to_api() == {
+            "ingredient_name": "açúcar",
+            "quantity": "0.5",
+            "unit": "xícara",
+        }
+        assert ParsedIngredient("sal", unit="a gosto").to_api()["quantity"] is None
+
+
+class TestBatch:
+    """Testes para a leitura em lote"""
+
+    def test_errors_per_line(self):
+        """Testa se a leitura segue após as linhas inválidas"""
+        result = parse_text("200 g de farinha\n\n200 g\n3 ovos\n0 kg sal\n")
+
+        assert [item.name for item in result.items] == ["farinha", "ovos"]
+        assert [item.line for item in result.items] == [1, 4]
+        assert [(error.line, error.text) for error in result.errors] == [
+            (3, "200 g"),
+            (5, "0 kg sal"),
+        ]
+        assert not result.ok
+        assert str(result.errors[0]) == "Linha 3: nome do ingrediente ausente ('200 g')"
+
+    def test_start(self):
+        """Testa a numeração a partir de outra linha"""
+        result = parse_lines(["1 ovo", "x 1"], start=10)
+        assert result.ok
+        assert [item.line for item in result.items] == [10, 11]
+        assert parse_text("").items == []
+
+    def test_recipe_file(self):
+        """Testa o arquivo com várias receitas, instruções e erros"""
+        recipes, errors = parse_recipe_file(
+            "linha solta\n"
+            "# Bolo de Cenoura\n"
+            "3 cenouras\n"
+            "2 xícaras de farinha\n"
+            "> Bata tudo.\n"
+            "> Asse por 40 minutos.\n"
+            "\n"
+            "# Pão\n"
+            "1 kg de farinha\n"
+            "200 g\n"
+            "#\n"
+            "1 ovo\n"
+        )
+
+        assert recipes == [
+            {
+                "name": "Bolo de Cenoura",
+                "instructions": "Bata tudo.\nAsse por 40 minutos.",
+                "ingredients": [
+                    {"ingredient_name": "cenouras", "quantity": "3", "unit": None},
+                    {"ingredient_name": "farinha", "quantity": "2", "unit": "xícara"},
+                ],
+            }
+        ]
+        assert [error.line for error in errors] == [1, 10, 11]
+
+    def test_decode_file(self):
+        """Testa arquivos em UTF-8, com BOM e em Windows-1252"""
+        text = "# Pão de Açúcar\n2 xícaras de farinha\n"
+        assert decode_file(text.encode("utf-8")) == text
+        assert decode_file(text.encode("utf-8-sig")) == text
+        assert decode_file(text.encode("cp1252")) == text
+        assert decode_file("“Maçã”".encode("cp1252")) == "“Maçã”"
+        assert decode_file(b"\x81x") == "\x81x"
+
+        recipes, errors = parse_recipe_file(decode_file(text.encode("latin-1")))
+        assert recipes[0]["name"] == "Pão de Açúcar" and errors == []
@@ -0,0 +1,179 @@
+import time
+
+from ingredient_resolver import (
+    IngredientResolver,
+    Resolution,
+    apply_resolutions,
+    fuzzy_key,
+    resolver_key,
+)
+from synthetic_data import generate_ingredients
+
+CATALOG = [
+    {"id": 1, "name": "Tomate"},
+    {"id": 2, "name": "Farinha de trigo"},
+    {"id": 3, "name": "Pimentão"},
+    {"id": 4, "name": "Tomate cereja"},
+    {"id": 5, "name": "Alho picado 12"},
+    {"id": 6, "name": "Alho picado"},
+]
+
+
+class TestKeys:
+    """Testes para as chaves de comparação"""
+
+    def test_resolver_key(self):
+        """Testa acentos, maiúsculas, conectivos, hífens e plurais"""
+        assert resolver_key("Farinhas de Trigo") == "farinha trigo"
+        assert resolver_key("pimentões") == "pimentao"
+        assert resolver_key("Pães") == "pao"
+        assert resolver_key("tomate-cereja") == "tomate cereja"
+        assert resolver_key("Nozes") == "noz"
+        assert resolver_key("Arroz") == "arroz"
+        assert resolver_key("  ") == ""
+
+    def test_fuzzy_key(self):
+        """Testa a chave aproximada sem as palavras numéricas"""
+        assert fuzzy_key("alho picado 12") == "alho picado"
+        assert fuzzy_key("leite 2x") == "leite 2x"
+
+
+class TestResolve:
+    """Testes para a busca de um nome no catálogo"""
+
+    def setup_method(self):
+        self.resolver = IngredientResolver(CATALOG)
+
+    def test_exact_key_auto_maps(self):
+        """Testa a troca automática pelo nome do catálogo"""
+        resolution = self.resolver.resolve("tomates")
+        assert resolution.match["id"] == 1
+        assert resolution.score == 1.0
+        assert resolution.name == "Tomate"
+        assert self.resolver.resolve("FARINHAS DE TRIGO").name == "Farinha de trigo"
+
+    def test_candidates(self):
+        """Testa as sugestões ordenadas pela nota"""
+        resolution = self.resolver.resolve("tomates", limit=3)
+        assert [item["id"] for item, _ in resolution.candidates] == [1, 4]
+        assert resolution.candidates[1][1] < 1.0
+
+    def test_suggestion(self):
+        """Testa nomes só parecidos: sugeridos, mas mantidos como digitados"""
+        for name in ("Tomate italiano", "tomatte"):
+            resolution = self.resolver.resolve(name)
+            assert resolution.match is None
+            assert resolution.suggestion["id"] == 1
+            assert resolution.name == name
+
+    def test_no_match(self):
+        """Testa nomes sem nada parecido no catálogo"""
+        resolution = self.resolver.resolve("Chocolate")
+        assert resolution.candidates == []
+        assert resolution.match is None and resolution.suggestion is None
+        assert resolution.name == "Chocolate"
+        assert self.resolver.resolve("").candidates == []
+
+    def test_numbered_names(self):
+        """Testa nomes que diferem só por números"""
+        assert self.resolver.resolve("Alho picado 12").match["id"] == 5
+        assert self.resolver.resolve("alhos picados").match["id"] == 6
+        # Números diferentes nunca são trocados automaticamente
+        resolution = self.resolver.resolve("Alho picado 99")
+        assert resolution.match is None
+        assert resolution.suggestion["id"] == 6
+        assert resolution.name == "Alho picado 99"
+
+    def test_different_numbers_only_suggested(self):
+        """Testa os nomes que só diferem pelo número de um item do catálogo"""
+        resolver = IngredientResolver(
+            [{"id": 1, "name": "Alho picado 7"}, {"id": 2, "name": "Molho 1"}]
+        )
+        for name, expected in (("Alho picado 9", 1), ("Molho 2", 2)):
+            resolution = resolver.resolve(name)
+            assert resolution.match is None
+            assert resolution.suggestion["id"] == expected
+            assert resolution.name == name
+            assert resolution.score < resolver.auto_map
+
+    def test_numbered_variant(self):
+        """Testa a escolha do ingrediente com os mesmos números no grupo"""
+        resolver = IngredientResolver(
+            [{"id": 1, "name": "Alho picado 7"}, {"id": 2, "name": "Alho picado 12"}]
+        )
+        assert resolver.resolve("Alhos picados 12").match["id"] == 2
+        resolution = resolver.resolve("alho picadinho 12", limit=2)
+        assert resolution.candidates[0][0]["id"] == 2
+
+    def test_contradictory_words_only_suggested(self):
+        """Testa "com"/"sem" e palavras trocadas de lugar"""
+        resolver = IngredientResolver(
+            [{"id": 1, "name": "Manteiga sem sal"}, {"id": 2, "name": "Creme de leite"}]
+        )
+        assert resolver_key("Manteiga com sal") == "manteiga com sal"
+        for name, expected in (("Manteiga com sal", 1), ("Leite de creme", 2)):
+            resolution = resolver.resolve(name)
+            assert resolution.match is None
+            assert resolution.suggestion["id"] == expected
+            assert resolution.name == name
+        assert resolver.resolve("manteigas sem sal").match["id"] == 1
+        assert resolver.resolve("Creme de leitte").match["id"] == 2
+
+    def test_thresholds(self):
+        """Testa os limites configurados no resolver"""
+        strict = IngredientResolver(CATALOG, auto_map=0.95, suggest=0.7)
+        assert strict.resolve("tomatte").suggestion["id"] == 1
+        assert strict.resolve("Tomate italiano").candidates == []
+        loose = IngredientResolver(CATALOG, auto_map=0.75)
+        assert loose.resolve("tomatte").name == "Tomate"
+
+    def test_empty_catalog(self):
+        """Testa o catálogo vazio"""
+        resolver = IngredientResolver([])
+        assert len(resolver) == 0
+        assert resolver.resolve("Tomate").candidates == []
+
+
+class TestBatch:
+    """Testes para a resolução em lote"""
+
+    def test_resolve_many(self):
+        """Testa o lote com nomes repetidos e a troca nos itens da API"""
+        resolver = IngredientResolver(CATALOG)
+        names = ["tomates", "Tomates", "Chocolate", "tomates"]
+        resolutions = resolver.resolve_many(names, limit=1)
+
+        assert [resolution.query for resolution in resolutions] == names
+        assert [resolution.name for resolution in resolutions] == [
+            "Tomate",
+            "Tomate",
+            "Chocolate",
+            "Tomate",
+        ]
+        items = [{"ingredient_name": name, "quantity": "1"} for name in names]
+        assert apply_resolutions(items, resolutions)[1] == {
+            "ingredient_name": "Tomate",
+            "quantity": "1",
+        }
+        assert items[1]["ingredient_name"] == "Tomates"
+
+    def test_resolution_defaults(self):
+        """Testa a resolução sem candidatos"""
+        assert Resolution("x").score == 0.0
+
+    def test_large_catalog(self):
+        """Testa a busca em um catálogo de 100 mil ingredientes"""
+        ingredients = generate_ingredients(100_000, seed=1)
+        resolver = IngredientResolver(ingredients)
+        names = [item["name"] for item in ingredients[:200]]
+        queries = [f"{name.lower()}s" for name in names] + [
+            name[:-1] + name[-1] * 2 for name in names
+        ]
+
+        started = time.perf_counter()
+        resolutions = resolver.resolve_many(queries, limit=1)
+        elapsed = (time.perf_counter() - started) / len(queries)
+
+        assert all(resolution.candidates for resolution in resolutions)
+        # Folga para máquinas de CI lentas; a média local fica em ~0,1 ms
+        assert elapsed < 0.005
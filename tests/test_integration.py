@@ -1,8 +1,8 @@
 import os
 import sys
+import warnings
 from datetime import datetime
 from unittest.mock import Mock, patch
-import warnings
 
 import pytest
 
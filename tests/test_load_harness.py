@@ -0,0 +1,66 @@
+import pytest
+
+from api_client import MenuMVPAPIClient, api_client
+from load_harness import ApiCallCounter, percentile, run_load
+from stub_server import StubAPI, StubServer
+from synthetic_data import generate_catalog
+
+
+@pytest.fixture
+def server():
+    """API simulada com um catálogo pequeno"""
+    ingredients, recipes = generate_catalog(50, 50, seed=1)
+    with StubServer(StubAPI(ingredients, recipes)) as stub:
+        yield stub
+
+
+class TestHelpers:
+    """Testes para as funções auxiliares do teste de carga"""
+
+    def test_percentile(self):
+        """Testa percentis com interpolação"""
+        values = [4.0, 1.0, 3.0, 2.0]
+        assert percentile(values, 0.0) == 1.0
+        assert percentile(values, 0.5) == 2.5
+        assert percentile(values, 1.0) == 4.0
+        assert percentile([], 0.9) == 0.0
+
+    def test_api_call_counter(self, server):
+        """Testa contagem de chamadas por rota e restauração do cliente"""
+        original = MenuMVPAPIClient._make_request
+        counter = ApiCallCounter()
+        counter.install()
+        try:
+            client = MenuMVPAPIClient(server.url)
+            client.get_recipes()
+            client.get_ingredient(1)
+        finally:
+            counter.uninstall()
+
+        assert counter.calls == {"GET /recipes": 1, "GET /ingredients": 1}
+        assert MenuMVPAPIClient._make_request is original
+
+
+class TestRunLoad:
+    """Testes de ponta a ponta do teste de carga"""
+
+    def test_concurrent_sessions(self, server, tmp_path, monkeypatch):
+        """Testa sessões simultâneas percorrendo todas as páginas"""
+        monkeypatch.setattr("chat_store.chat_store.path", str(tmp_path / "chat.db"))
+        monkeypatch.setattr("chat_cache.chat_cache.path", "")
+        previous_url = api_client.base_url
+
+        report = run_load([2], server.url)
+        level = report["levels"][0]
+
+        assert api_client.base_url == previous_url
+        assert level["sessions"] == 2
+        assert level["reruns"] == 2 * 12
+        assert level["errors"] == [], level["errors"]
+        assert {"app.open", "ingredients.add", "chat.reply"} <= set(level["steps"])
+        assert level["api_calls_by_route"]["POST /ingredients"] == 2
+        assert level["api_calls_by_route"]["POST /chat"] == 2
+        assert level["p50"] <= level["p90"] <= level["p99"] <= level["max"]
+        assert level["rss_peak_mb"] > 0
+        assert set(level["queue_wait"]) == {"read", "write", "chat"}
+        assert level["queue_wait_total"] >= 0
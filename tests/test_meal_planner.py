@@ -0,0 +1,150 @@
+from datetime import date, datetime, timedelta
+
+from meal_planner import (
+    MEAL_TYPES,
+    apply_plan,
+    generate_plan,
+    get_week_days,
+    plan_stats,
+    shopping_list,
+)
+from pantry import RecipeIngredientIndex
+
+
+def make_recipe(recipe_id, *ingredients):
+    return {
+        "id": recipe_id,
+        "name": f"Receita {recipe_id}",
+        "ingredients": [{"name": name} for name in ingredients],
+    }
+
+
+RECIPES = [
+    make_recipe(1, "Tomate", "Cebola"),
+    make_recipe(2, "Tomate", "Cebola", "Alho"),
+    make_recipe(3, "Farinha", "Ovo", "Leite", "Açúcar"),
+    make_recipe(4, "Tomate", "Alho"),
+    make_recipe(5),
+]
+WEEK = [date(2024, 1, 1) + timedelta(days=i) for i in range(7)]
+
+
+class TestGeneratePlan:
+    """Testes para o gerador de planejamento"""
+
+    def test_fills_every_slot(self):
+        """Testa se todas as refeições pedidas são preenchidas"""
+        index = RecipeIngredientIndex(RECIPES)
+        result = generate_plan(index, WEEK, ["Almoço", "Jantar"], seed=1)
+        assert len(result["plan"]) == 7
+        assert all(
+            set(meals) == {"Almoço", "Jantar"} for meals in result["plan"].values()
+        )
+
+    def test_minimizes_distinct_ingredients(self):
+        """Testa se receitas que compartilham ingredientes são preferidas"""
+        index = RecipeIngredientIndex(RECIPES)
+        result = generate_plan(index, WEEK[:1], ["Almoço", "Jantar"], seed=1)
+        planned = set(result["plan"]["01/01/2024"].values())
+        assert "Receita 3" not in planned
+        assert result["ingredients"] <= 3
+
+    def test_no_repeat_window(self):
+        """Testa se uma receita não se repete dentro da janela"""
+        index = RecipeIngredientIndex(RECIPES)
+        result = generate_plan(index, WEEK, ["Almoço"], no_repeat_days=3, seed=1)
+        sequence = [result["plan"][day.strftime("%d/%m/%Y")]["Almoço"] for day in WEEK]
+        for i, recipe in enumerate(sequence):
+            assert recipe not in sequence[max(0, i - 2) : i]
+
+    def test_skips_recipes_without_ingredients(self):
+        """Testa se receitas sem ingredientes não são planejadas"""
+        index = RecipeIngredientIndex(RECIPES)
+        result = generate_plan(index, WEEK, MEAL_TYPES, seed=1)
+        planned = {name for meals in result["plan"].values() for name in meals.values()}
+        assert "Receita 5" not in planned
+
+    def test_keeps_existing_meals(self):
+        """Testa se refeições já planejadas são mantidas e reaproveitadas"""
+        index = RecipeIngredientIndex(RECIPES)
+        existing = {
+            "01/01/2024": {
+                "Almoço": [{"recipe": "Receita 3", "notes": "", "added_at": ""}]
+            }
+        }
+        result = generate_plan(
+            index, WEEK[:1], ["Almoço", "Jantar"], existing=existing, seed=1
+        )
+        assert result["plan"] == {"01/01/2024": {"Jantar": "Receita 1"}}
+
+    def test_empty_inputs(self):
+        """Testa catálogo vazio e período vazio"""
+        assert generate_plan(RecipeIngredientIndex([]), WEEK)["plan"] == {}
+        assert generate_plan(RecipeIngredientIndex(RECIPES), [])["plan"] == {}
+
+
+class TestApplyPlan:
+    """Testes para gravação do planejamento gerado"""
+
+    def test_apply_plan(self):
+        """Testa se o plano é gravado no formato do session state"""
+        meal_plan = {"01/01/2024": {"Almoço": [{"recipe": "X"}]}}
+        added = apply_plan(meal_plan, {"01/01/2024": {"Almoço": "Receita 1"}})
+
+        assert added == 1
+        assert [meal["recipe"] for meal in meal_plan["01/01/2024"]["Almoço"]] == [
+            "X",
+            "Receita 1",
+        ]
+        assert meal_plan["01/01/2024"]["Almoço"][1]["notes"]
+
+
+class TestWeekDays:
+    """Testes para os dias da semana corrente"""
+
+    def test_monday_to_sunday(self):
+        """Testa se a semana começa na segunda-feira"""
+        days = get_week_days(datetime(2024, 1, 3))
+        assert days[0] == "01/01/2024"
+        assert days[-1] == "07/01/2024"
+        assert len(days) == 7
+
+
+class TestShoppingList:
+    """Testes para a lista de compras"""
+
+    def test_items_per_planned_meal(self):
+        """Testa um item por ingrediente de cada refeição planejada"""
+        meal_plan = {
+            "01/01/2024": {
+                "Almoço": [{"recipe": "Receita 1"}, {"recipe": "Refeição livre"}],
+                "Jantar": [{"recipe": "Desconhecida"}],
+            }
+        }
+        items = shopping_list(meal_plan, [make_recipe(1, "Tomate", "Cebola")])
+
+        assert [item["ingrediente"] for item in items] == ["Tomate", "Cebola"]
+        assert items[0] == {
+            "ingrediente": "Tomate",
+            "receita": "Receita 1",
+            "data": "01/01/2024",
+            "refeicao": "Almoço",
+        }
+
+    def test_empty(self):
+        """Testa planejamento vazio"""
+        assert shopping_list({}, [make_recipe(1, "Tomate")]) == []
+
+
+class TestPlanStats:
+    """Testes para os totais do planejamento"""
+
+    def test_counts(self):
+        """Testa refeições, dias e itens únicos da lista de compras"""
+        meal_plan = {
+            "01/01/2024": {"Almoço": [{"recipe": "A"}, {"recipe": "B"}]},
+            "02/01/2024": {"Jantar": [{"recipe": "A"}]},
+        }
+        items = [{"ingrediente": "Tomate"}, {"ingrediente": "Tomate"}]
+        assert plan_stats(meal_plan, items) == {"meals": 3, "days": 2, "items": 1}
+        assert plan_stats({}, []) == {"meals": 0, "days": 0, "items": 0}
@@ -0,0 +1,215 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import metrics
+from api_client import MenuMVPAPIClient, api_requests, route_label
+from metrics import (
+    MetricsRegistry,
+    MetricsServer,
+    cache_requests,
+    estimate_size,
+    registry,
+    session_state_sizes,
+    start_metrics_server,
+)
+from page_profiler import PageProfiler, page_runs
+from stub_server import StubAPI, StubServer
+
+
+def parse(text):
+    """Séries do formato texto: 'nome{rótulos}' -> valor"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestRegistry:
+    """Testes para as métricas e o formato texto do Prometheus"""
+
+    def test_counter(self):
+        """Testa o contador com rótulos"""
+        metrics_registry = MetricsRegistry()
+        counter = metrics_registry.counter("app_total", "Eventos", ["kind"])
+        counter.inc(kind="a")
+        counter.inc(2, kind="a")
+        counter.inc(kind='b"c')
+
+        text = metrics_registry.render()
+        assert "# HELP app_total Eventos\n# TYPE app_total counter\n" in text
+        assert parse(text) == {'app_total{kind="a"}': 3, 'app_total{kind="b\\"c"}': 1}
+        assert counter.value(kind="a") == 3
+
+    def test_wrong_labels(self):
+        """Testa o erro com rótulos diferentes dos declarados"""
+        counter = MetricsRegistry().counter("app_total", "Eventos", ["kind"])
+        with pytest.raises(ValueError):
+            counter.inc(other="a")
+
+    def test_histogram(self):
+        """Testa as faixas cumulativas, a soma e a contagem"""
+        metrics_registry = MetricsRegistry()
+        histogram = metrics_registry.histogram(
+            "app_seconds", "Duração", ["page"], buckets=[0.1, 1]
+        )
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value, page="x")
+
+        samples = parse(metrics_registry.render())
+        assert samples['app_seconds_bucket{page="x",le="0.1"}'] == 1
+        assert samples['app_seconds_bucket{page="x",le="1"}'] == 3
+        assert samples['app_seconds_bucket{page="x",le="+Inf"}'] == 4
+        assert samples['app_seconds_sum{page="x"}'] == pytest.approx(4.25)
+        assert samples['app_seconds_count{page="x"}'] == 4
+
+    def test_register_twice(self):
+        """Testa o registro repetido do mesmo nome"""
+        metrics_registry = MetricsRegistry()
+        counter = metrics_registry.counter("app_total", "Eventos", ["kind"])
+        assert metrics_registry.counter("app_total", "Eventos", ["kind"]) is counter
+        with pytest.raises(ValueError):
+            metrics_registry.histogram("app_total", "Eventos", ["kind"])
+
+    def test_failing_callback(self):
+        """Testa se uma coleta com erro não derruba as demais métricas"""
+        metrics_registry = MetricsRegistry()
+
+        def broken():
+            raise RuntimeError("falhou")
+
+        metrics_registry.gauge("app_broken", "Quebrada", broken)
+        metrics_registry.gauge("app_ok", "Ok", lambda: [({}, 1.5)])
+
+        text = metrics_registry.render()
+        assert "app_broken" not in text
+        assert parse(text) == {"app_ok": 1.5}
+
+
+class TestEstimateSize:
+    """Testes para a estimativa de memória do session_state"""
+
+    def test_sampled_list(self):
+        """Testa a extrapolação de listas grandes a partir da amostra"""
+        rows = [{"id": i, "name": f"item {i:05d}"} for i in range(1000)]
+        exact = estimate_size(rows, sample=len(rows))
+        assert estimate_size(rows, sample=50) == pytest.approx(exact, rel=0.05)
+
+    def test_shared_objects_count_once(self):
+        """Testa objetos repetidos dentro do mesmo estado"""
+        rows = [{"id": i} for i in range(100)]
+        single = estimate_size({"a": rows})
+        assert estimate_size({"a": rows, "b": rows}) < single * 1.5
+
+    def test_session_state_sizes(self):
+        """Testa a medição de cada sessão ativa"""
+        sessions = [
+            SimpleNamespace(
+                session=SimpleNamespace(
+                    session_state=SimpleNamespace(filtered_state=state)
+                )
+            )
+            for state in ({}, {"catalog_data": ["x" * 1000]})
+        ]
+        small, large = session_state_sizes(sessions)
+        assert large > small + 1000
+
+    def test_no_runtime(self):
+        """Testa a coleta fora do servidor do Streamlit"""
+        assert session_state_sizes() == []
+        samples = parse(registry.render())
+        assert samples["menu_mvp_streamlit_sessions"] == 0
+        assert samples['menu_mvp_session_state_bytes{aggregate="max"}'] == 0
+
+
+class TestInstrumentation:
+    """Testes para as métricas do cliente, dos caches e das páginas"""
+
+    def test_route_label(self):
+        """Testa as rotas sem ids e nomes"""
+        assert route_label("/") == "/"
+        assert route_label("/recipes/") == "/recipes"
+        assert route_label("/recipes/bolo de cenoura") == "/recipes/*"
+        assert route_label("/recipes/id/12") == "/recipes/id/*"
+        assert route_label("/recipes/bulk") == "/recipes/bulk"
+        assert route_label("/chat/invoke") == "/chat/invoke"
+
+    def test_api_requests(self):
+        """Testa a contagem e a duração das chamadas à API"""
+        labels = {"method": "GET", "route": "/recipes", "status": "200"}
+        before = api_requests.value(**labels)
+        with StubServer(StubAPI(recipes=[{"id": 1, "name": "Bolo"}])) as server:
+            client = MenuMVPAPIClient(server.url)
+            client.get_recipes()
+            with pytest.raises(Exception):
+                client.get_recipe_by_name("inexistente")
+
+        assert api_requests.value(**labels) == before + 1
+        assert api_requests.value(method="GET", route="/recipes/*", status="404") >= 1
+        samples = parse(registry.render())
+        count = (
+            'menu_mvp_api_request_duration_seconds_count{method="GET",route="/recipes"}'
+        )
+        assert samples[count] >= 1
+
+    def test_cache_hit_ratio(self):
+        """Testa as consultas ao cache das listagens e a fração de acertos"""
+        with StubServer(StubAPI(recipes=[{"id": 1, "name": "Bolo"}])) as server:
+            client = MenuMVPAPIClient(server.url, soft_ttl=60)
+            misses = cache_requests.value(cache="api", result="miss")
+            hits = cache_requests.value(cache="api", result="hit")
+            client.get_recipes()
+            client.get_recipes()
+
+        assert cache_requests.value(cache="api", result="miss") == misses + 1
+        assert cache_requests.value(cache="api", result="hit") == hits + 1
+        ratio = parse(registry.render())['menu_mvp_cache_hit_ratio{cache="api"}']
+        assert 0 < ratio < 1
+
+    def test_page_runs(self):
+        """Testa o histograma de duração das execuções das páginas"""
+        before = page_runs.count(page="teste")
+        PageProfiler("teste").stop()
+        assert page_runs.count(page="teste") == before + 1
+
+
+class TestServer:
+    """Testes para o servidor de métricas"""
+
+    def test_scrape(self):
+        """Testa a coleta em /metrics"""
+        metrics_registry = MetricsRegistry()
+        metrics_registry.counter("app_total", "Eventos").inc()
+        with MetricsServer(metrics_registry) as server:
+            response = requests.get(f"{server.url}/metrics")
+            missing = requests.get(f"{server.url}/outra")
+
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert parse(response.text) == {"app_total": 1}
+        assert missing.status_code == 404
+
+    def test_started_once(self, monkeypatch):
+        """Testa se o servidor sobe uma única vez por processo"""
+        monkeypatch.setattr(metrics, "_server", None)
+        monkeypatch.setattr(metrics, "_server_started", False)
+        server = start_metrics_server(port=0, host="127.0.0.1")
+        try:
+            assert server is not None
+            assert start_metrics_server(port=0) is server
+            assert (
+                "menu_mvp_api_requests_total"
+                in requests.get(f"{server.url}/metrics").text
+            )
+        finally:
+            server.stop()
+
+    def test_disabled_without_port(self, monkeypatch):
+        """Testa o processo sem MENU_MVP_METRICS_PORT: nada é servido"""
+        monkeypatch.setattr(metrics, "_server", None)
+        monkeypatch.setattr(metrics, "_server_started", False)
+        monkeypatch.delenv(metrics.PORT_ENV, raising=False)
+        assert start_metrics_server() is None
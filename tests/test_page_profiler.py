@@ -0,0 +1,122 @@
+import cProfile
+import json
+import time
+from unittest.mock import patch
+
+from streamlit.testing.v1 import AppTest
+
+from page_profiler import OTHER_SECTION, PageProfiler, export_report
+
+
+def busy_work():
+    return sum(i * i for i in range(20_000))
+
+
+def profiled_page():
+    """Página mínima usada com o AppTest"""
+    import streamlit as st
+
+    from page_profiler import finish_page, start_page
+
+    profiler = start_page("teste")
+    with profiler.section("fetch"):
+        st.session_state["items"] = list(range(100))
+    finish_page(profiler)
+
+
+class TestPageProfiler:
+    """Testes para a medição de uma execução"""
+
+    def test_sections_and_remaining_time(self):
+        """Testa soma de seções repetidas e o tempo restante"""
+        profiler = PageProfiler("teste")
+        with profiler.section("fetch"):
+            time.sleep(0.01)
+        with profiler.section("fetch"):
+            time.sleep(0.01)
+        time.sleep(0.01)
+        report = profiler.stop()
+
+        assert report["page"] == "teste"
+        assert report["sections"]["fetch"] >= 0.02
+        assert report["sections"][OTHER_SECTION] >= 0.01
+        assert sum(report["sections"].values()) <= report["total"] + 1e-9
+        assert report["profile"] is None
+
+    def test_stop_is_idempotent(self):
+        """Testa se parar de novo retorna o mesmo relatório"""
+        profiler = PageProfiler("teste")
+        assert profiler.stop() is profiler.stop()
+
+    def test_section_records_time_on_error(self):
+        """Testa se a seção é contabilizada mesmo com exceção"""
+        profiler = PageProfiler("teste")
+        try:
+            with profiler.section("transform"):
+                raise ValueError("falha")
+        except ValueError:
+            pass
+        assert "transform" in profiler.stop()["sections"]
+
+    def test_capture_profile(self):
+        """Testa a captura com o cProfile"""
+        profiler = PageProfiler("teste", capture=True)
+        busy_work()
+        report = profiler.stop()
+
+        assert "busy_work" in report["profile"]
+        assert "cumulative" in report["profile"]
+
+    def test_profiler_busy(self):
+        """Testa a volta para só os tempos quando o cProfile já está ativo"""
+        error = ValueError("Another profiling tool is already active")
+        with patch.object(cProfile.Profile, "enable", side_effect=error):
+            profiler = PageProfiler("teste", capture=True)
+        busy_work()
+        report = profiler.stop()
+
+        assert report["profile"] is None
+        assert report["profile_skipped"]
+        assert report["total"] > 0
+
+    def test_export_report(self):
+        """Testa a exportação do histórico em JSON"""
+        report = PageProfiler("teste").stop()
+        exported = json.loads(export_report([report]))
+
+        assert exported["runs"][0]["page"] == "teste"
+        assert "exported_at" in exported
+
+
+class TestProfilePanel:
+    """Testes para o painel na barra lateral"""
+
+    def test_panel_hidden_by_default(self):
+        """Testa se o painel só aparece quando pedido"""
+        at = AppTest.from_function(profiled_page).run()
+
+        assert not at.exception
+        assert not at.sidebar.expander
+        assert len(at.session_state["profile_history"]) == 1
+
+    def test_panel_with_query_param(self):
+        """Testa o painel com ?profile=1 e a escolha mantida na sessão"""
+        at = AppTest.from_function(profiled_page)
+        at.query_params["profile"] = "1"
+        at.run()
+
+        assert not at.exception
+        assert at.sidebar.expander[0].label == "⏱️ Desempenho"
+        assert at.sidebar.code
+        report = at.session_state["profile_history"][-1]
+        assert report["profile"] is not None
+        assert set(report["sections"]) == {"fetch", OTHER_SECTION}
+
+        at.query_params.clear()
+        at.run()
+        assert at.sidebar.expander
+        assert len(at.session_state["profile_history"]) == 2
+
+        at.query_params["profile"] = "0"
+        at.run()
+        assert not at.sidebar.expander
@@ -1,7 +1,7 @@
 import os
 import sys
-from unittest.mock import MagicMock, Mock, patch
 from datetime import datetime
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 import streamlit as st
@@ -50,7 +50,7 @@ def mock_streamlit():
         st.expander.return_value.__exit__ = Mock()
         st.sidebar.__enter__ = Mock()
         st.sidebar.__exit__ = Mock()
-        
+
         yield st
 
 
@@ -122,7 +122,10 @@ class TestPlanningPage:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
             assert "streamlit" in content
-            assert "api_client" in content
+            assert "repository" in content
+            # A lista de compras é gerada com as receitas completas
+            assert 'catalog.load("recipes", wait=True)' in content
+            assert "catalog.set_budget(PAGE_BUDGET)" in content
 
     def test_get_week_days_function(self):
         """Testa função get_week_days"""
@@ -188,6 +191,26 @@ class TestChatAIPage:
             content = f.read()
             assert "streamlit" in content
             assert "api_client" in content
+            assert "repository" in content
+
+
+class TestPantryPage:
+    """Testes para a página de ingredientes disponíveis"""
+
+    def test_pantry_page_file_exists(self):
+        """Testa se o arquivo da página de ingredientes disponíveis existe"""
+        file_path = os.path.join(os.path.dirname(__file__), "..", "pages", "5_pantry.py")
+        assert os.path.exists(
+            file_path
+        ), "Arquivo da página de ingredientes disponíveis não encontrado"
+
+    def test_pantry_page_content(self):
+        """Testa se o arquivo tem conteúdo básico"""
+        file_path = os.path.join(os.path.dirname(__file__), "..", "pages", "5_pantry.py")
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+            assert "streamlit" in content
+            assert "match_pantry" in content
 
 
 class TestMainApp:
@@ -0,0 +1,112 @@
+import numpy as np
+
+from catalog import catalog_fingerprint, normalize_name, recipe_ingredient_names
+from pantry import RecipeIngredientIndex, get_index, match_pantry
+
+RECIPES = [
+    {
+        "id": 1,
+        "name": "Salada",
+        "ingredients": [{"name": "Tomate"}, {"name": "Cebola"}, {"name": "Alface"}],
+    },
+    {"id": 2, "name": "Molho", "ingredients": [{"name": "tomate"}, {"name": "Sal"}]},
+    {"id": 3, "name": "Arroz", "ingredients": [{"ingredient_name": "Arroz"}]},
+    {"id": 4, "name": "Receita vazia", "ingredients": []},
+]
+
+
+class TestCatalogHelpers:
+    """Testes para as funções auxiliares do catálogo"""
+
+    def test_normalize_name(self):
+        """Testa remoção de acentos, caixa e espaços"""
+        assert normalize_name("  Açúcar   Mascavo ") == "acucar mascavo"
+
+    def test_recipe_ingredient_names_formats(self):
+        """Testa leitura dos diferentes formatos de ingrediente"""
+        recipe = {
+            "ingredients": [
+                {"name": "Tomate"},
+                {"ingredient_name": "Cebola"},
+                {"ingredient": {"name": "Alho"}},
+                {"quantity": 1},
+            ]
+        }
+        assert recipe_ingredient_names(recipe) == ["Tomate", "Cebola", "Alho"]
+
+    def test_catalog_fingerprint_changes(self):
+        """Testa se a assinatura muda quando um ingrediente muda"""
+        changed = [dict(RECIPES[0], ingredients=[{"name": "Pepino"}])] + RECIPES[1:]
+        assert catalog_fingerprint(RECIPES) == catalog_fingerprint(list(RECIPES))
+        assert catalog_fingerprint(RECIPES) != catalog_fingerprint(changed)
+
+
+class TestRecipeIngredientIndex:
+    """Testes para o índice de bitsets"""
+
+    def test_vocabulary_is_normalized(self):
+        """Testa se nomes equivalentes compartilham a mesma coluna"""
+        index = RecipeIngredientIndex(RECIPES)
+        assert index.n_ingredients == 5
+        assert index.vocabulary["tomate"] == 0
+
+    def test_sizes(self):
+        """Testa contagem de ingredientes por receita"""
+        index = RecipeIngredientIndex(RECIPES)
+        assert index.sizes.tolist() == [3, 2, 1, 0]
+
+    def test_coverage_is_vectorized(self):
+        """Testa cobertura de todas as receitas"""
+        index = RecipeIngredientIndex(RECIPES)
+        mask = index.encode(["TOMATE", "sal", "desconhecido"])
+        assert index.coverage(mask).tolist() == [1, 2, 0, 0]
+
+    def test_missing(self):
+        """Testa lista de ingredientes faltantes"""
+        index = RecipeIngredientIndex(RECIPES)
+        mask = index.encode(["Tomate"])
+        assert index.missing(0, mask) == ["Cebola", "Alface"]
+
+    def test_many_ingredients(self):
+        """Testa bitsets com mais de um byte por receita"""
+        recipes = [
+            {"id": i, "name": f"R{i}", "ingredients": [{"name": f"ing{i}"}]}
+            for i in range(20)
+        ]
+        index = RecipeIngredientIndex(recipes)
+        coverage = index.coverage(index.encode(["ing17"]))
+        assert np.flatnonzero(coverage).tolist() == [17]
+
+    def test_empty_catalog(self):
+        """Testa índice sem receitas"""
+        index = RecipeIngredientIndex([])
+        assert len(index) == 0
+        assert match_pantry(index, ["Tomate"]) == []
+
+    def test_get_index_is_cached(self):
+        """Testa se o índice é reaproveitado enquanto o catálogo não muda"""
+        assert get_index(RECIPES) is get_index(list(RECIPES))
+        assert get_index(RECIPES) is not get_index(RECIPES[:2])
+
+
+class TestMatchPantry:
+    """Testes para o ranking de receitas"""
+
+    def test_ranking(self):
+        """Testa ordenação por cobertura"""
+        index = RecipeIngredientIndex(RECIPES)
+        matches = match_pantry(index, ["Tomate", "Sal", "Arroz"])
+        assert [match["name"] for match in matches[:3]] == [
+            "Molho",
+            "Arroz",
+            "Salada",
+        ]
+        assert matches[0]["coverage"] == 1.0
+        assert matches[2]["missing"] == ["Cebola", "Alface"]
+
+    def test_min_covered_and_limit(self):
+        """Testa filtros de cobertura mínima e limite"""
+        index = RecipeIngredientIndex(RECIPES)
+        matches = match_pantry(index, ["Tomate"], min_covered=1)
+        assert {match["id"] for match in matches} == {1, 2}
+        assert len(match_pantry(index, ["Tomate"], limit=1)) == 1
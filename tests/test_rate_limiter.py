@@ -0,0 +1,202 @@
+import threading
+import time
+from email.utils import formatdate
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from api_client import MenuMVPAPIClient
+from rate_limiter import (
+    BACKGROUND,
+    FairTokenBucket,
+    RateLimiter,
+    RateLimitError,
+    current_session,
+    parse_retry_after,
+    request_category,
+    session_scope,
+)
+from stub_server import StubAPI, StubConfig, StubServer
+
+
+def response(status, body=None, headers=None):
+    """Resposta simulada do requests"""
+    mock = Mock()
+    mock.status_code = status
+    mock.headers = headers or {}
+    mock.json.return_value = body
+    if status >= 400:
+        mock.raise_for_status.side_effect = requests.HTTPError(str(status))
+    return mock
+
+
+class TestHelpers:
+    """Testes para categorias, sessões e o cabeçalho Retry-After"""
+
+    def test_request_category(self):
+        """Testa a categoria de cada requisição"""
+        assert request_category("GET", "/recipes/") == "read"
+        assert request_category("post", "/ingredients/") == "write"
+        assert request_category("DELETE", "/recipes/id/1") == "write"
+        assert request_category("POST", "/chat/invoke") == "chat"
+
+    def test_session_scope(self):
+        """Testa a sessão atribuída às requisições da thread"""
+        assert current_session() == BACKGROUND
+        with session_scope("sessao-1"):
+            assert current_session() == "sessao-1"
+            with session_scope("sessao-2"):
+                assert current_session() == "sessao-2"
+            assert current_session() == "sessao-1"
+        assert current_session() == BACKGROUND
+
+    def test_parse_retry_after(self):
+        """Testa segundos, data HTTP e valores inválidos"""
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("0.25") == 0.25
+        assert parse_retry_after(None) == 1.0
+        assert parse_retry_after("amanhã", default=2.0) == 2.0
+        assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+        assert parse_retry_after(formatdate(time.time() - 10, usegmt=True)) == 0.0
+
+
+class TestFairTokenBucket:
+    """Testes para o token bucket com fila justa"""
+
+    def test_burst_then_rate(self):
+        """Testa a rajada imediata e a espera pelo próximo token"""
+        bucket = FairTokenBucket(rate=20, burst=3)
+        assert [bucket.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+
+        waited = bucket.acquire("a")
+        assert 0.02 < waited < 0.5
+        stats = bucket.stats()
+        assert (stats["granted"], stats["waited"]) == (4, 1)
+        assert stats["wait_time"] == pytest.approx(waited)
+
+    def test_round_robin_between_sessions(self):
+        """Testa se uma sessão com muitas requisições não atrasa as outras"""
+        bucket = FairTokenBucket(rate=50, burst=1)
+        bucket.acquire("lote")
+        order = []
+        lock = threading.Lock()
+
+        def request(key):
+            bucket.acquire(key)
+            with lock:
+                order.append(key)
+
+        threads = [threading.Thread(target=request, args=("lote",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        other = threading.Thread(target=request, args=("outra",))
+        other.start()
+        for thread in threads + [other]:
+            thread.join(5)
+
+        assert len(order) == 7
+        assert order.index("outra") <= 2
+        assert bucket.stats()["queued"] == 0
+
+    def test_timeout(self):
+        """Testa a desistência após a espera máxima"""
+        bucket = FairTokenBucket(rate=1, burst=1)
+        bucket.acquire("a")
+        with pytest.raises(RateLimitError):
+            bucket.acquire("a", timeout=0.05)
+        stats = bucket.stats()
+        assert (stats["timeouts"], stats["queued"]) == (1, 0)
+
+    def test_pause(self):
+        """Testa a pausa pedida pela API"""
+        bucket = FairTokenBucket(rate=1000, burst=10)
+        bucket.pause(0.1)
+        assert bucket.acquire("a") >= 0.09
+        assert bucket.stats()["throttled"] == 1
+
+
+class TestRateLimiter:
+    """Testes para os limites por categoria"""
+
+    def test_categories_are_independent(self):
+        """Testa se esgotar as leituras não atrasa as escritas"""
+        limiter = RateLimiter({"read": (1, 1), "write": (1, 1)}, max_wait=0.05)
+        limiter.acquire("read")
+        assert limiter.acquire("write") == 0.0
+        with pytest.raises(RateLimitError):
+            limiter.acquire("read")
+        assert limiter.acquire("sem_limite") == 0.0
+
+    def test_stats(self):
+        """Testa as métricas por categoria"""
+        limiter = RateLimiter()
+        limiter.acquire("chat", key="sessao")
+        stats = limiter.stats()
+        assert set(stats) == {"read", "write", "chat"}
+        assert stats["chat"]["granted"] == 1
+        assert stats["read"]["granted"] == 0
+
+
+class TestClientThrottling:
+    """Testes para o cliente com limite e respostas 429"""
+
+    @patch("requests.Session.get")
+    def test_retries_after_429(self, mock_get):
+        """Testa a nova tentativa respeitando Retry-After"""
+        mock_get.side_effect = [
+            response(429, headers={"Retry-After": "0.1"}),
+            response(200, [{"id": 1}]),
+        ]
+        limiter = RateLimiter()
+        client = MenuMVPAPIClient("https://test-api.com", limiter=limiter)
+
+        started = time.monotonic()
+        assert client.get_recipes() == [{"id": 1}]
+        assert time.monotonic() - started >= 0.09
+        assert client.limiter_stats()["read"]["throttled"] == 1
+
+    @patch("requests.Session.get")
+    def test_gives_up_after_retries(self, mock_get):
+        """Testa o erro após esgotar as novas tentativas"""
+        mock_get.side_effect = lambda url: response(429, headers={"Retry-After": "0"})
+        client = MenuMVPAPIClient("https://test-api.com", limiter=RateLimiter())
+
+        with pytest.raises(Exception, match="Erro na requisição"):
+            client.get_recipes()
+        assert mock_get.call_count == 3
+
+    @patch("requests.Session.get")
+    def test_without_limiter(self, mock_get):
+        """Testa o cliente sem limite: a resposta 429 é um erro"""
+        mock_get.return_value = response(429, headers={"Retry-After": "0"})
+        client = MenuMVPAPIClient("https://test-api.com")
+
+        with pytest.raises(Exception, match="429"):
+            client.get_recipes()
+        assert client.limiter_stats() is None
+
+    def test_against_throttling_server(self):
+        """Testa o cliente contra a API simulada que responde 429"""
+        config = StubConfig(rate_limit=20)
+        with StubServer(StubAPI(config=config)) as server:
+            client = MenuMVPAPIClient(server.url, limiter=RateLimiter())
+            errors = []
+
+            def worker():
+                for _ in range(10):
+                    try:
+                        client.health_check()
+                    except Exception as e:
+                        errors.append(e)
+
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(30)
+
+        assert errors == []
+        assert server.api.requests[("GET", "/")] >= 40
+        assert client.limiter_stats()["read"]["granted"] >= 40
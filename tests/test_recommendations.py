@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+
+from recommendations import RecipeRecommender, get_recommender
+
+
+def make_recipe(recipe_id, *ingredients):
+    return {
+        "id": recipe_id,
+        "name": f"Receita {recipe_id}",
+        "ingredients": [{"name": name} for name in ingredients],
+    }
+
+
+RECIPES = [
+    make_recipe(1, "Tomate", "Cebola", "Alho"),
+    make_recipe(2, "Tomate", "Cebola", "Manjericão"),
+    make_recipe(3, "Farinha", "Ovo", "Açúcar"),
+    make_recipe(4, "Farinha", "Ovo", "Chocolate"),
+    make_recipe(5),
+]
+
+
+class TestRecipeRecommender:
+    """Testes para o recomendador de receitas"""
+
+    def test_similar(self):
+        """Testa vizinho mais próximo"""
+        recommender = RecipeRecommender(RECIPES, k=2)
+        similar = recommender.similar(1)
+        assert [item["id"] for item in similar] == [2]
+        assert 0 < similar[0]["score"] < 1
+
+    def test_similar_unknown_and_empty(self):
+        """Testa receita desconhecida e receita sem ingredientes"""
+        recommender = RecipeRecommender(RECIPES)
+        assert recommender.similar(99) == []
+        assert recommender.similar(5) == []
+
+    def test_similar_respects_k(self):
+        """Testa limite de vizinhos por consulta"""
+        recipes = [make_recipe(i, "Sal", f"ing{i}") for i in range(10)]
+        recommender = RecipeRecommender(recipes, k=4)
+        assert recommender.neighbors.shape == (10, 4)
+        assert len(recommender.similar(0, k=2)) == 2
+
+    def test_matches_brute_force(self):
+        """Testa se os vizinhos coincidem com o cálculo denso de cossenos"""
+        rng = random.Random(7)
+        recipes = [
+            make_recipe(i, *{f"ing{rng.randrange(40)}" for _ in range(5)})
+            for i in range(60)
+        ]
+        recommender = RecipeRecommender(recipes, k=3, tfidf=False)
+
+        dense = np.zeros((60, recommender.n_ingredients))
+        for row in range(60):
+            lo, hi = recommender.indptr[row], recommender.indptr[row + 1]
+            dense[row, recommender.indices[lo:hi]] = recommender.data[lo:hi]
+        similarities = dense @ dense.T
+        np.fill_diagonal(similarities, -1)
+
+        for row in range(60):
+            expected = np.sort(similarities[row])[::-1][:3]
+            np.testing.assert_allclose(recommender.scores[row], expected, rtol=1e-5)
+
+    def test_suggest_excludes_planned(self):
+        """Testa sugestões a partir de receitas planejadas"""
+        recommender = RecipeRecommender(RECIPES)
+        suggestions = recommender.suggest(["receita 1", "Receita 3"])
+        assert {item["id"] for item in suggestions} == {2, 4}
+
+    def test_get_recommender_is_cached(self):
+        """Testa se o recomendador só é recalculado quando o catálogo muda"""
+        assert get_recommender(RECIPES) is get_recommender(list(RECIPES))
+        assert get_recommender(RECIPES) is not get_recommender(RECIPES[:3])
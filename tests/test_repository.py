@@ -0,0 +1,578 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from repository import CatalogRepository, CatalogWarmup
+
+RECIPES = [{"id": 1, "name": "Bolo de Cenoura", "ingredients": [{"name": "Cenoura"}]}]
+INGREDIENTS = [{"id": 1, "name": "Cenoura"}, {"id": 2, "name": "Ovo"}]
+SUMMARIES = [{"id": 1, "name": "Bolo de Cenoura"}]
+
+
+def make_client():
+    client = Mock()
+    client.get_recipes.return_value = RECIPES
+    client.get_ingredients.return_value = INGREDIENTS
+    client.get_recipe_summaries.return_value = SUMMARIES
+    client.get_counts.return_value = {}
+    return client
+
+
+def make_repository(**kwargs):
+    client = make_client()
+    return CatalogRepository(client, state={}, **kwargs), client
+
+
+class TestReads:
+    """Testes para as leituras memorizadas"""
+
+    def test_memoizes_per_session(self):
+        """Testa se a segunda leitura não chama a API"""
+        repository, client = make_repository()
+
+        assert repository.load_recipes() == RECIPES
+        assert repository.load_recipes() is repository.load_recipes()
+        assert client.get_recipes.call_count == 1
+
+    def test_sessions_are_isolated(self):
+        """Testa se cada sessão tem sua própria memória"""
+        repository, client = make_repository()
+        other = CatalogRepository(client, state={})
+
+        repository.load_ingredients()
+        other.load_ingredients()
+        assert client.get_ingredients.call_count == 2
+
+    def test_expires_after_max_age(self):
+        """Testa a expiração dos dados memorizados"""
+        repository, client = make_repository(max_age=10)
+
+        with patch("repository.time.monotonic", return_value=100.0):
+            repository.load_recipes()
+        with patch("repository.time.monotonic", return_value=105.0):
+            repository.load_recipes()
+        assert client.get_recipes.call_count == 1
+
+        with patch("repository.time.monotonic", return_value=111.0):
+            repository.load_recipes()
+        assert client.get_recipes.call_count == 2
+
+    def test_force(self):
+        """Testa leitura forçada"""
+        repository, client = make_repository()
+        repository.get("recipes")
+        repository.get("recipes", force=True)
+        assert client.get_recipes.call_count == 2
+
+    @patch("repository.st")
+    def test_load_error(self, mock_st):
+        """Testa erro da API na leitura"""
+        repository, client = make_repository()
+        client.get_recipes.side_effect = Exception("Erro na requisição")
+
+        assert repository.load_recipes() == []
+        mock_st.error.assert_called_once_with(
+            "Erro ao carregar receitas: Erro na requisição"
+        )
+
+        # Falhas não ficam memorizadas
+        client.get_recipes.side_effect = None
+        assert repository.load_recipes() == RECIPES
+
+    def test_peek(self):
+        """Testa a consulta sem busca"""
+        repository, client = make_repository()
+        assert repository.peek("recipes") is None
+        repository.load_recipes()
+        assert repository.peek("recipes") == RECIPES
+        assert client.get_recipes.call_count == 1
+
+    def test_counts(self):
+        """Testa os totais do cliente completados pelos dados da sessão"""
+        repository, client = make_repository()
+        assert repository.counts() == {}
+
+        client.get_counts.return_value = {"recipes": 7}
+        repository.load_ingredients()
+        assert repository.counts() == {"recipes": 7, "ingredients": 2}
+        client.get_counts.assert_called_with(fetch_missing=False)
+        assert client.get_recipes.call_count == 0
+
+    def test_derived(self):
+        """Testa dados derivados memorizados até a próxima busca"""
+        repository, client = make_repository()
+
+        df = repository.derived("recipes", "dataframe")
+        assert list(df["name"]) == ["Bolo de Cenoura"]
+        assert repository.derived("recipes", "dataframe") is df
+        assert repository.derived("recipes", "names") == ["Bolo de Cenoura"]
+        assert repository.derived("recipes", "by_name")["Bolo de Cenoura"] == RECIPES[0]
+
+        # A mesma resposta (cache do cliente) não reconstrói; uma nova, sim
+        repository.get("recipes", force=True)
+        assert repository.derived("recipes", "dataframe") is df
+        client.get_recipes.return_value = list(RECIPES)
+        repository.get("recipes", force=True)
+        assert repository.derived("recipes", "dataframe") is not df
+
+    def test_recommender(self):
+        """Testa o recomendador memorizado sem recalcular a cada leitura"""
+        repository, client = make_repository()
+
+        with patch("recommendations.catalog_fingerprint") as fingerprint:
+            fingerprint.return_value = "catalogo"
+            recommender = repository.derived("recipes", "recommender")
+            assert repository.derived("recipes", "recommender") is recommender
+        assert fingerprint.call_count == 1
+        assert recommender.similar(1) == []
+
+    def test_by_name_keeps_first(self):
+        """Testa nomes repetidos no índice por nome"""
+        repository, client = make_repository()
+        client.get_recipes.return_value = [
+            {"id": 1, "name": "A"},
+            {"id": 2, "name": "A"},
+        ]
+        assert repository.derived("recipes", "by_name")["A"]["id"] == 1
+
+    def test_fetched_at(self):
+        """Testa o momento da busca de cada conjunto da sessão"""
+        repository, client = make_repository()
+        assert repository.fetched_at("recipes") is None
+
+        with patch("repository.time.monotonic", return_value=100.0):
+            repository.load_recipes()
+        assert repository.fetched_at("recipes") == 100.0
+        repository.invalidate("recipes")
+        assert repository.fetched_at("recipes") is None
+
+
+class TestWrites:
+    """Testes para as escritas e a invalidação"""
+
+    def test_create_ingredient_invalidates(self):
+        """Testa se a lista é recarregada após adicionar"""
+        repository, client = make_repository()
+        client.create_ingredient.return_value = {"id": 3, "name": "Sal"}
+        repository.load_ingredients()
+        repository.load_recipes()
+
+        assert repository.create_ingredient("Sal") == {"id": 3, "name": "Sal"}
+        repository.load_ingredients()
+        repository.load_recipes()
+        assert client.get_ingredients.call_count == 2
+        assert client.get_recipes.call_count == 1
+
+    def test_create_recipe_invalidates_both(self):
+        """Testa se receitas e ingredientes são recarregados após nova receita"""
+        repository, client = make_repository()
+        repository.load_recipes()
+        repository.load_ingredients()
+
+        repository.create_recipe("Sopa", "Cozinhe", [{"ingredient_name": "Sal"}])
+        client.create_recipe.assert_called_once_with(
+            "Sopa", "Cozinhe", [{"ingredient_name": "Sal"}]
+        )
+        repository.load_recipes()
+        repository.load_ingredients()
+        assert client.get_recipes.call_count == 2
+        assert client.get_ingredients.call_count == 2
+
+    def test_create_recipes_bulk(self):
+        """Testa a importação em lote e a invalidação das receitas"""
+        repository, client = make_repository()
+        client.create_recipes_bulk.return_value = [{"id": 2}]
+        repository.load_recipe_summaries()
+
+        assert repository.create_recipes_bulk([{"name": "Sopa"}]) == [{"id": 2}]
+        client.create_recipes_bulk.assert_called_once_with([{"name": "Sopa"}])
+        repository.load_recipe_summaries()
+        assert client.get_recipe_summaries.call_count == 2
+
+    def test_merge_ingredients(self):
+        """Testa a simulação sem chamadas e a mesclagem com invalidação"""
+        from dedup import MergePlan
+
+        repository, client = make_repository()
+        repository.load_ingredients()
+        repository.load_recipes()
+        plan = MergePlan(deletes=[{"id": 2, "name": "Ovo"}])
+
+        assert repository.merge_ingredients(plan, dry_run=True).deleted == plan.deletes
+        client.delete_ingredient.assert_not_called()
+        repository.load_ingredients()
+        assert client.get_ingredients.call_count == 1
+
+        report = repository.merge_ingredients(plan)
+        assert report.ok and not report.dry_run
+        client.delete_ingredient.assert_called_once_with(2)
+        repository.load_ingredients()
+        repository.load_recipes()
+        assert client.get_ingredients.call_count == 2
+        assert client.get_recipes.call_count == 2
+
+    def test_merge_keeps_used_ingredients(self):
+        """Testa se a mesclagem confere o uso com as receitas completas
+
+        A página montou o plano sem as receitas (prazo esgotado); o duplicado
+        usado em receita não pode ser removido.
+        """
+        from dedup import Cluster, plan_merges
+
+        release = threading.Event()
+        repository, client = make_repository()
+        client.get_recipes.side_effect = lambda: release.wait(5) and RECIPES
+        repository.set_budget(0.01)
+        assert repository.load_recipes() == []
+
+        cluster = Cluster(INGREDIENTS[1], [INGREDIENTS[0]], 0.9)
+        plan = plan_merges([cluster], {})
+        assert plan.deletes == [INGREDIENTS[0]]
+
+        threading.Timer(0.05, release.set).start()
+        report = repository.merge_ingredients(plan)
+        assert report.deleted == []
+        client.delete_ingredient.assert_not_called()
+
+    def test_merge_without_recipes(self):
+        """Testa se nada é removido quando as receitas não podem ser lidas"""
+        from dedup import MergePlan
+
+        repository, client = make_repository()
+        client.get_recipes.side_effect = Exception("Erro na requisição")
+        plan = MergePlan(deletes=[{"id": 1, "name": "Cenoura"}])
+
+        with pytest.raises(Exception, match="Erro na requisição"):
+            repository.merge_ingredients(plan)
+        client.delete_ingredient.assert_not_called()
+
+    def test_write_listeners(self):
+        """Testa o aviso das escritas aos interessados (uma vez por função)"""
+        import repository as module
+
+        calls = []
+        module.on_write(calls.append)
+        module.on_write(calls.append)
+        try:
+            repository, client = make_repository()
+            repository.create_ingredient("Sal")
+            repository.create_recipe("Sopa", "Cozinhe", [])
+        finally:
+            module._write_listeners.pop(calls.append, None)
+        assert calls == [
+            ("ingredients",),
+            ("recipes", "recipe_summaries", "ingredients"),
+        ]
+
+    @patch("repository.st")
+    def test_write_error(self, mock_st):
+        """Testa erro da API na escrita"""
+        repository, client = make_repository()
+        client.delete_ingredient.side_effect = Exception("Erro na requisição")
+        repository.load_ingredients()
+
+        assert repository.delete_ingredient(1) is None
+        mock_st.error.assert_called_once_with(
+            "Erro ao deletar ingrediente: Erro na requisição"
+        )
+        repository.load_ingredients()
+        assert client.get_ingredients.call_count == 1
+
+
+class TestWarmup:
+    """Testes para a busca feita na subida do processo"""
+
+    def test_sessions_reuse_warmup(self):
+        """Testa se as sessões usam a busca da subida em vez de chamar a API"""
+        client = make_client()
+        warmup = CatalogWarmup(client)
+        warmup.start().join()
+
+        for _ in range(3):
+            repository = CatalogRepository(client, state={}, warmup=warmup)
+            assert repository.load_recipes() == RECIPES
+            assert repository.load_ingredients() == INGREDIENTS
+        assert client.get_recipes.call_count == 1
+        assert client.get_ingredients.call_count == 1
+
+    def test_waits_for_warmup_in_progress(self):
+        """Testa se a leitura espera a busca em andamento, sem duplicar a chamada"""
+        client = make_client()
+        client.get_recipes.side_effect = lambda: time.sleep(0.05) or RECIPES
+        warmup = CatalogWarmup(client)
+        warmup.start()
+
+        repository = CatalogRepository(client, state={}, warmup=warmup)
+        assert repository.load_recipes() == RECIPES
+        assert client.get_recipes.call_count == 1
+
+    def test_not_started(self):
+        """Testa leitura sem a busca da subida"""
+        repository, client = make_repository(warmup=CatalogWarmup(make_client()))
+        repository.load_recipes()
+        assert client.get_recipes.call_count == 1
+
+    def test_expired_or_failed_warmup(self):
+        """Testa dados vencidos e falha da API na subida"""
+        client = make_client()
+        client.get_ingredients.side_effect = Exception("Erro na requisição")
+        warmup = CatalogWarmup(client, max_age=10)
+        with patch("repository.time.monotonic", return_value=100.0):
+            warmup.start().join()
+        with patch("repository.time.monotonic", return_value=111.0):
+            assert warmup.take("recipes") is None
+        assert warmup.take("ingredients") is None
+
+    def test_write_discards_warmup(self):
+        """Testa se uma escrita descarta os dados da subida"""
+        client = make_client()
+        warmup = CatalogWarmup(client)
+        warmup.start().join()
+        repository = CatalogRepository(client, state={}, warmup=warmup)
+
+        repository.create_ingredient("Sal")
+        CatalogRepository(client, state={}, warmup=warmup).load_ingredients()
+        assert client.get_ingredients.call_count == 2
+
+    def test_imports_modules(self):
+        """Testa a importação antecipada de módulos"""
+        warmup = CatalogWarmup(make_client())
+        warmup.start(names=[], modules=["json", "modulo_inexistente"]).join()
+        assert warmup.take("recipes") is None
+
+
+class TestBackgroundPrefetch:
+    """Testes para a busca em segundo plano da sessão"""
+
+    def test_warms_catalog_and_derived(self):
+        """Testa se conjuntos e derivados ficam prontos sem novas chamadas"""
+        repository, client = make_repository()
+        job = repository.start_prefetch()
+        job.join(5)
+
+        assert job.done()
+        assert repository.start_prefetch() is None
+        assert repository.load_recipes() == RECIPES
+        assert list(repository.derived("ingredients", "dataframe")["name"]) == [
+            "Cenoura",
+            "Ovo",
+        ]
+        assert len(repository.derived("recipes", "pantry_index")) == 1
+        assert client.get_recipes.call_count == 1
+        assert client.get_ingredients.call_count == 1
+
+    def test_does_not_block_and_read_waits(self):
+        """Testa se a página segue e a leitura espera a busca em andamento"""
+        repository, client = make_repository()
+        release = threading.Event()
+        client.get_recipes.side_effect = lambda: release.wait(5) and RECIPES
+
+        job = repository.start_prefetch(names=["recipes"], derived=[])
+        assert not job.done()
+        assert repository.start_prefetch() is job
+
+        threading.Timer(0.05, release.set).start()
+        assert repository.load_recipes() == RECIPES
+        assert client.get_recipes.call_count == 1
+
+    def test_cancel(self):
+        """Testa o cancelamento entre etapas"""
+        repository, client = make_repository()
+        release = threading.Event()
+        client.get_recipes.side_effect = lambda: release.wait(5) and RECIPES
+
+        job = repository.start_prefetch()
+        repository.cancel_prefetch()
+        release.set()
+        job.join(5)
+
+        assert job.cancelled
+        assert client.get_ingredients.call_count == 0
+        assert repository.load_recipes() == RECIPES
+        assert client.get_recipes.call_count == 2
+
+    def test_write_cancels_prefetch(self):
+        """Testa se uma escrita descarta a busca em andamento"""
+        repository, client = make_repository()
+        release = threading.Event()
+        client.get_ingredients.side_effect = lambda: release.wait(5) and INGREDIENTS
+
+        job = repository.start_prefetch(names=["ingredients"], derived=[])
+        repository.create_ingredient("Sal")
+        release.set()
+        job.join(5)
+
+        assert job.cancelled
+        repository.load_ingredients()
+        assert client.get_ingredients.call_count == 2
+
+    def test_bounded(self):
+        """Testa o limite de buscas simultâneas do processo"""
+        client = make_client()
+        release = threading.Event()
+        client.get_recipes.side_effect = lambda: release.wait(5) and RECIPES
+        repository = CatalogRepository(client, prefetch_pending=2)
+        sessions = [{}, {}, {}]
+
+        jobs = []
+        for state in sessions:
+            repository._state = state
+            jobs.append(repository.start_prefetch(names=["recipes"]))
+        assert jobs[0] is not None and jobs[1] is not None
+        assert jobs[2] is None
+
+        release.set()
+        jobs[0].join(5)
+        jobs[1].join(5)
+        assert repository.start_prefetch(names=["recipes"]) is not None
+
+    def test_timeout(self):
+        """Testa o tempo máximo da busca"""
+        repository, client = make_repository()
+        job = repository.start_prefetch(timeout=-1)
+        job.join(5)
+
+        assert client.get_recipes.call_count == 0
+        assert repository.load_recipes() == RECIPES
+
+
+class TestRecipeDetails:
+    """Testes para a lista resumida e as receitas completas sob demanda"""
+
+    def test_summaries_and_details(self):
+        """Testa a lista resumida memorizada e a receita pedida ao cliente"""
+        repository, client = make_repository()
+        client.get_recipe_details.return_value = RECIPES[0]
+
+        assert repository.load_recipe_summaries() == SUMMARIES
+        assert len(repository.derived("recipe_summaries", "search_index")) == 1
+        assert repository.recipe_details("Bolo de Cenoura") == RECIPES[0]
+        client.get_recipe_details.assert_called_once_with("Bolo de Cenoura")
+        assert client.get_recipes.call_count == 0
+
+    @patch("repository.st")
+    def test_details_error(self, mock_st):
+        """Testa erro da API ao abrir a receita"""
+        repository, client = make_repository()
+        client.get_recipe_details.side_effect = Exception("404")
+
+        assert repository.recipe_details("Pudim") is None
+        mock_st.error.assert_called_once_with("Erro ao carregar a receita 'Pudim': 404")
+
+    def test_prefetch_skips_cached(self):
+        """Testa se só as receitas fora do cache são buscadas em segundo plano"""
+        repository, client = make_repository()
+        client.cached_recipe_details.side_effect = lambda name: name == "a"
+        fetched = threading.Event()
+        client.get_recipe_details.side_effect = lambda name: fetched.set()
+
+        assert repository.prefetch_details(["a", "b"]) == 1
+        assert fetched.wait(5)
+        client.get_recipe_details.assert_called_once_with("b")
+        assert repository.prefetch_details(["a"]) == 0
+
+    def test_create_recipe_invalidates_summaries(self):
+        """Testa se a lista resumida é recarregada após nova receita"""
+        repository, client = make_repository()
+        repository.load_recipe_summaries()
+        repository.create_recipe("Sopa", "Cozinhe", [])
+        repository.load_recipe_summaries()
+        assert client.get_recipe_summaries.call_count == 2
+
+
+class TestLatencyBudget:
+    """Testes para o limite de espera da página"""
+
+    def slow_repository(self, release, **kwargs):
+        repository, client = make_repository(**kwargs)
+        client.get_recipes.side_effect = lambda: release.wait(5) and RECIPES
+        return repository, client
+
+    def test_within_budget(self):
+        """Testa dados que chegam dentro do prazo"""
+        repository, client = make_repository()
+        repository.set_budget(1.0)
+        assert repository.load_recipes() == RECIPES
+        assert repository.refreshing() == []
+
+    def test_renders_without_data_and_refreshes(self):
+        """Testa a página montada sem os dados e atualizada quando chegam"""
+        release = threading.Event()
+        repository, client = self.slow_repository(release)
+        repository.set_budget(0.05)
+
+        started = time.monotonic()
+        assert repository.load_recipes() == []
+        assert time.monotonic() - started < 1
+        assert repository.refreshing() == ["recipes"]
+
+        release.set()
+        repository._job.join(5)
+        repository.set_budget(0.05)
+        assert repository.load_recipes() == RECIPES
+        assert repository.refreshing() == []
+        assert client.get_recipes.call_count == 1
+
+    def test_returns_stale_data(self):
+        """Testa os dados vencidos da sessão enquanto a busca continua"""
+        repository, client = make_repository(max_age=10)
+        old = [{"id": 9, "name": "Antiga"}]
+        client.get_recipes.return_value = old
+        with patch("repository.time.monotonic", return_value=100.0):
+            repository.load_recipes()
+
+        release = threading.Event()
+        client.get_recipes.side_effect = lambda: release.wait(5) and RECIPES
+        repository.set_budget(0.05)
+        assert repository.load_recipes() is old
+        assert repository.refreshing() == ["recipes"]
+        release.set()
+
+    @patch("repository.st")
+    def test_error_shown_once(self, mock_st):
+        """Testa o erro da busca em segundo plano exibido na execução seguinte"""
+        repository, client = make_repository()
+        client.get_recipes.side_effect = Exception("Erro na requisição")
+        repository.set_budget(1.0)
+
+        assert repository.load_recipes() == []
+        mock_st.error.assert_called_once_with(
+            "Erro ao carregar receitas: Erro na requisição"
+        )
+        assert repository._job.errors == {}
+
+    def test_wait_ignores_budget(self):
+        """Testa a leitura completa (exportação) mesmo com prazo na página"""
+        release = threading.Event()
+        repository, client = self.slow_repository(release)
+        repository.set_budget(0.01)
+
+        threading.Timer(0.05, release.set).start()
+        assert repository.load("recipes", wait=True) == RECIPES
+        assert repository.refreshing() == []
+        assert repository.load_recipes() == RECIPES
+        assert client.get_recipes.call_count == 1
+
+    def test_budget_of_other_page_ignored(self):
+        """Testa se o limite declarado por outra página não vale para esta"""
+        release = threading.Event()
+        repository, client = self.slow_repository(release)
+        with patch("repository._current_page", return_value="outra"):
+            repository.set_budget(0.01)
+
+        threading.Timer(0.05, release.set).start()
+        assert repository.load_recipes() == RECIPES
+        assert repository.refreshing() == []
+
+    def test_write_restarts_fetch(self):
+        """Testa a leitura após uma escrita com busca anterior cancelada"""
+        release = threading.Event()
+        repository, client = self.slow_repository(release)
+        repository.start_prefetch(names=["recipes"], derived=[])
+        repository.create_recipe("Sopa", "Cozinhe", [])
+        release.set()
+
+        repository.set_budget(1.0)
+        assert repository.load_recipes() == RECIPES
@@ -0,0 +1,24 @@
+import sys
+from unittest.mock import patch
+
+import serve
+
+
+class TestServe:
+    """Testes para o script de subida do app"""
+
+    @patch("serve.cli.main", return_value=0)
+    @patch("serve.warmup")
+    def test_starts_warmup_before_streamlit(self, mock_warmup, mock_main, monkeypatch):
+        """Testa se a busca começa antes do Streamlit e as opções são repassadas"""
+        monkeypatch.setattr(sys, "argv", ["serve.py"])
+
+        def check_warmup():
+            mock_warmup.start.assert_called_once_with(modules=serve.WARM_MODULES)
+            return 0
+
+        mock_main.side_effect = check_warmup
+
+        assert serve.main(["--server.port", "8600"]) == 0
+        assert sys.argv == ["streamlit", "run", serve.APP, "--server.port", "8600"]
+        assert serve.APP.endswith("app.py")
@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+
+import pytest
+import requests
+
+from api_client import MenuMVPAPIClient
+from stub_server import StubAPI, StubConfig, StubServer
+from synthetic_data import generate_catalog
+
+
+@pytest.fixture
+def server():
+    """API simulada com um catálogo pequeno"""
+    ingredients, recipes = generate_catalog(100, 50, seed=1)
+    with StubServer(StubAPI(ingredients, recipes)) as stub:
+        yield stub
+
+
+@pytest.fixture
+def client(server):
+    """Cliente apontando para a API simulada"""
+    return MenuMVPAPIClient(server.url)
+
+
+class TestStubServer:
+    """Testes de ponta a ponta do cliente contra a API simulada"""
+
+    def test_health_check(self, client):
+        """Testa a rota raiz"""
+        assert "message" in client.health_check()
+
+    def test_ingredients_crud(self, client):
+        """Testa criação, leitura, atualização e remoção de ingredientes"""
+        assert len(client.get_ingredients()) == 100
+
+        created = client.create_ingredient("Jiló")
+        assert created["id"] == 101
+        assert client.get_ingredient(101) == created
+        assert client.update_ingredient(101, "Quiabo")["name"] == "Quiabo"
+        assert client.get_ingredients()[-1]["name"] == "Quiabo"
+
+        client.delete_ingredient(101)
+        assert len(client.get_ingredients()) == 100
+        with pytest.raises(Exception, match="404"):
+            client.get_ingredient(101)
+
+    def test_duplicate_ingredient(self, client):
+        """Testa recusa de ingrediente repetido"""
+        client.create_ingredient("Jiló")
+        with pytest.raises(Exception, match="400"):
+            client.create_ingredient("Jiló")
+
+    def test_recipes(self, client):
+        """Testa criação em lote, busca por nome e remoção de receitas"""
+        recipe = client.create_recipe(
+            "Bolo de Jiló",
+            "Asse.",
+            [{"ingredient_name": "Jiló", "quantity": "2", "unit": "xícaras"}],
+        )
+        assert recipe["ingredients"][0]["name"] == "Jiló"
+        assert client.get_recipe_by_name("Bolo de Jiló")["id"] == recipe["id"]
+
+        bulk = client.create_recipes_bulk(
+            [
+                {"name": f"Receita {i}", "instructions": "", "ingredients": []}
+                for i in range(3)
+            ]
+        )
+        assert len(bulk) == 3
+        assert len(client.get_recipes()) == 54
+
+        client.delete_recipe(recipe["id"])
+        assert len(client.get_recipes()) == 53
+
+    def test_recipe_summaries(self, server, client):
+        """Testa a lista só com id e nome e a receita completa pelo nome"""
+        summaries = client.get_recipe_summaries()
+        assert len(summaries) == 50
+        assert set(summaries[0]) == {"id", "name"}
+        assert server.api.requests[("GET", "/recipes")] == 1
+
+        details = client.get_recipe_details(summaries[0]["name"])
+        assert details["id"] == summaries[0]["id"]
+        assert "ingredients" in details
+
+    def test_chat(self, client):
+        """Testa as rotas de chat"""
+        response = client.chat("Olá", "t1")
+        assert response["output"]["content"].endswith("Olá")
+        assert client.chat_stream("Olá", "t1")["output"]["thread_id"] == "t1"
+
+    def test_event_stream(self, server):
+        """Testa o chat em streaming quando o cliente pede eventos"""
+        response = requests.post(
+            f"{server.url}/chat/stream-sse",
+            json={"message": "Olá", "thread_id": "t1"},
+            headers={"Accept": "text/event-stream"},
+        )
+        assert response.headers["Content-Type"] == "text/event-stream"
+        assert response.text.startswith("data: ")
+
+    def test_request_counts(self, server, client):
+        """Testa a contagem de requisições por rota"""
+        client.get_recipes()
+        client.get_recipes()
+        client.delete_recipe(1)
+
+        assert server.api.requests[("GET", "/recipes")] == 2
+        assert server.api.requests[("DELETE", "/recipes/id")] == 1
+
+    def test_stats_endpoint(self, server, client):
+        """Testa os totais pelo endpoint de estatísticas, quando habilitado"""
+        response = requests.get(f"{server.url}/stats")
+        assert response.status_code == 404
+
+        server.api.config.stats_endpoint = True
+        assert client.get_stats() == {"ingredients": 100, "recipes": 50}
+
+    def test_counts_without_stats_endpoint(self, server, client):
+        """Testa os totais mantidos pelo cliente sem baixar as listas de novo"""
+        client.get_ingredients()
+        client.get_recipes()
+        client.create_ingredient("Ingrediente novo")
+        client.delete_recipe(1)
+
+        assert client.get_counts() == {"ingredients": 101, "recipes": 49}
+        assert server.api.requests[("GET", "/ingredients")] == 1
+        assert server.api.requests[("GET", "/recipes")] == 1
+
+
+class TestStubBehavior:
+    """Testes para latência, erros e partida a frio simulados"""
+
+    def test_latency(self):
+        """Testa atraso configurado"""
+        config = StubConfig(latency=0.05)
+        with StubServer(StubAPI(config=config)) as server:
+            started = time.monotonic()
+            MenuMVPAPIClient(server.url).get_ingredients()
+            assert time.monotonic() - started >= 0.05
+
+    def test_error_rate(self):
+        """Testa falhas simuladas"""
+        with StubServer(StubAPI(config=StubConfig(error_rate=1.0))) as server:
+            with pytest.raises(Exception, match="500"):
+                MenuMVPAPIClient(server.url).get_ingredients()
+
+    def test_cold_start(self):
+        """Testa atraso apenas na primeira requisição"""
+        config = StubConfig(cold_start=0.2)
+        with StubServer(StubAPI(config=config)) as server:
+            client = MenuMVPAPIClient(server.url)
+            started = time.monotonic()
+            client.health_check()
+            first = time.monotonic() - started
+            started = time.monotonic()
+            client.health_check()
+            second = time.monotonic() - started
+
+        assert first >= 0.2
+        assert second < 0.2
+
+
+class TestConcurrency:
+    """Teste de estresse do cliente global compartilhado por várias threads"""
+
+    def test_shared_client_under_load(self, caplog):
+        """Testa muitas threads em um só cliente: sem erros nem troca de conexões"""
+        ingredients, recipes = generate_catalog(100, 50, seed=1)
+        config = StubConfig(latency=0.002)
+        with StubServer(StubAPI(ingredients, recipes, config)) as server:
+            client = MenuMVPAPIClient(server.url, pool_size=4)
+            errors = []
+
+            def worker():
+                for _ in range(10):
+                    try:
+                        client.get_ingredients()
+                        client.health_check()
+                    except Exception as e:
+                        errors.append(e)
+
+            with caplog.at_level(logging.WARNING, logger="urllib3"):
+                threads = [threading.Thread(target=worker) for _ in range(16)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join(30)
+            stats = client.pool_stats()
+            connections = server.api.connections
+            client.close()
+
+        assert errors == []
+        assert stats["requests"] == 320
+        assert stats["created"] <= 4
+        assert stats["peak_in_use"] <= 4
+        # Cada sessão abre uma conexão e a mantém: nenhuma é descartada ou refeita
+        assert connections == stats["created"]
+        assert "Connection pool is full" not in caplog.text
@@ -0,0 +1,45 @@
+import pytest
+
+from synthetic_data import generate_catalog, generate_recipes, ingredient_names
+
+
+class TestSyntheticData:
+    """Testes para o gerador de dados sintéticos"""
+
+    def test_ingredient_names_are_unique(self):
+        """Testa nomes distintos mesmo além da lista base"""
+        names = ingredient_names(5000)
+        assert len(set(names)) == 5000
+        assert names[0] == "Tomate"
+
+    def test_same_seed_same_catalog(self):
+        """Testa se a semente torna o catálogo reprodutível"""
+        assert generate_catalog(200, 100, seed=7) == generate_catalog(200, 100, seed=7)
+        assert generate_catalog(200, 100, seed=7) != generate_catalog(200, 100, seed=8)
+
+    def test_recipe_format(self):
+        """Testa se as receitas seguem o formato da API"""
+        ingredients, recipes = generate_catalog(50, 300, seed=1, instruction_words=5)
+        names = {ingredient["name"] for ingredient in ingredients}
+
+        assert [recipe["id"] for recipe in recipes] == list(range(1, 301))
+        assert len({recipe["name"] for recipe in recipes}) == 300
+        for recipe in recipes:
+            assert 1 <= len(recipe["ingredients"]) <= 10
+            assert len(recipe["instructions"].split()) == 5
+            for item in recipe["ingredients"]:
+                assert item["name"] in names
+                assert item["quantity"] > 0 and item["unit"]
+
+    def test_payload_size(self):
+        """Testa se o tamanho do preparo controla o payload"""
+        ingredients, small = generate_catalog(20, 10, instruction_words=0)
+        _, large = generate_catalog(20, 10, instruction_words=200)
+
+        assert all(recipe["instructions"] == "" for recipe in small)
+        assert all(len(recipe["instructions"]) > 500 for recipe in large)
+
+    def test_requires_ingredients(self):
+        """Testa geração de receitas sem ingredientes"""
+        with pytest.raises(ValueError):
+            generate_recipes(10, [])
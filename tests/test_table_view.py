@@ -0,0 +1,118 @@
+from streamlit.testing.v1 import AppTest
+
+from table_view import NameIndex
+
+RECORDS = [{"id": i, "name": f"Item {i:03d}"} for i in range(1, 121)] + [
+    {"id": 200, "name": "Pão de Queijo"},
+    {"id": 201, "name": "Queijo Minas"},
+]
+
+
+def table_page():
+    """Página mínima com a tabela paginada e o seletor"""
+    import streamlit as st
+
+    from table_view import NameIndex, paged_table, search_picker
+
+    records = [{"id": i, "name": f"Item {i:03d}"} for i in range(1, 121)]
+    index = NameIndex(records)
+    st.session_state["total"] = paged_table(index, "items", search_label="Buscar")
+    picked = search_picker(index, "Escolher", key="pick", limit=10)
+    st.session_state["picked"] = None if picked is None else picked["id"]
+
+
+def prefetch_page():
+    """Página mínima com o seletor que antecipa os vizinhos"""
+    import streamlit as st
+
+    from table_view import NameIndex, search_picker
+
+    def prefetch(items):
+        st.session_state["prefetched"] = [item["id"] for item in items]
+
+    index = NameIndex([{"id": i, "name": f"Item {i:03d}"} for i in range(1, 121)])
+    search_picker(index, "Abrir", key="open", limit=10, prefetch=prefetch)
+
+
+class TestNameIndex:
+    """Testes para a busca no índice de nomes"""
+
+    def test_matches_without_accents_and_case(self):
+        """Testa a busca por trecho, sem diferenciar acentos e maiúsculas"""
+        index = NameIndex(RECORDS)
+        assert len(index) == 122
+        assert index.count("") == 122
+        assert index.count("QUEIJO") == 2
+        assert [RECORDS[i]["id"] for i in index.matches("pao")] == [200]
+        assert index.count("inexistente") == 0
+
+    def test_page(self):
+        """Testa a fatia de cada página do resultado"""
+        index = NameIndex(RECORDS)
+        assert [row["id"] for row in index.page("", 0, 50)] == list(range(1, 51))
+        assert [row["id"] for row in index.page("", 2, 50)][-2:] == [200, 201]
+        assert [row["id"] for row in index.page("item 11", 0, 5)] == list(
+            range(110, 115)
+        )
+        assert index.page("", 10, 50) == []
+
+    def test_search_prefix_first(self):
+        """Testa se nomes que começam pela busca vêm antes no seletor"""
+        index = NameIndex(RECORDS)
+        positions = index.search("queijo", limit=5)
+        assert [RECORDS[i]["id"] for i in positions] == [201, 200]
+        assert len(index.search("", limit=5)) == 5
+        assert len(index.search("item", limit=7)) == 7
+
+    def test_query_cache(self):
+        """Testa a reutilização da busca repetida a cada rerun"""
+        index = NameIndex(RECORDS)
+        assert index.matches("item 1") is index.matches("Item  1")
+
+
+class TestWidgets:
+    """Testes para a tabela paginada e o seletor com busca"""
+
+    def test_sends_only_current_page(self):
+        """Testa se a tabela recebe só a página visível"""
+        at = AppTest.from_function(table_page).run()
+
+        assert not at.exception
+        assert at.session_state["total"] == 120
+        assert len(at.dataframe[0].value) == 50
+
+        at.number_input(key="items_page").set_value(3).run()
+        assert list(at.dataframe[0].value["id"]) == list(range(101, 121))
+
+    def test_search_resets_page(self):
+        """Testa se uma nova busca volta para a primeira página"""
+        at = AppTest.from_function(table_page).run()
+        at.number_input(key="items_page").set_value(2).run()
+
+        at.text_input(key="items_search").input("item 01").run()
+        assert not at.exception
+        assert at.session_state["total"] == 10
+        assert at.number_input(key="items_page").value == 1
+        assert len(at.dataframe[0].value) == 10
+
+    def test_picker(self):
+        """Testa o seletor limitado aos primeiros resultados da busca"""
+        at = AppTest.from_function(table_page).run()
+        assert len(at.selectbox(key="pick_choice").options) == 10
+        assert at.session_state["picked"] == 1
+
+        at.text_input(key="pick_query").input("item 077").run()
+        assert at.selectbox(key="pick_choice").options == ["77 - Item 077"]
+        assert at.session_state["picked"] == 77
+
+        at.text_input(key="pick_query").input("nada").run()
+        assert not at.selectbox
+        assert at.session_state["picked"] is None
+
+    def test_picker_prefetch(self):
+        """Testa se o item escolhido e seus vizinhos são passados a `prefetch`"""
+        at = AppTest.from_function(prefetch_page).run()
+        assert at.session_state["prefetched"] == [1, 2, 3]
+
+        at.selectbox(key="open_choice").set_value(4).run()
+        assert at.session_state["prefetched"] == [5, 6, 7, 4, 3]